@@ -1,15 +1,28 @@
 """
 API 의존성 관리
 """
+from typing import Optional
+from fastapi import Header, HTTPException
 from sqlmodel import Session
 from app.core import get_session
-from app.services import youtube_service, brand_service, roi_service
+from app.core.profiling import is_admin_token
+from app.services import (
+    youtube_service, brand_service, roi_service, score_service,
+    compare_service, job_service, candidate_service, search_service,
+    ranking_service, channel_stats_service, comment_service
+)
 
 # 데이터베이스 세션 의존성
 def get_db_session():
     """데이터베이스 세션 의존성"""
     yield from get_session()
 
+# 관리자 인증 의존성
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """X-Admin-Token 헤더가 ADMIN_TOKEN과 일치하지 않으면 403"""
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다")
+
 # 서비스 의존성들
 def get_youtube_service():
     """YouTube 서비스 의존성"""
@@ -22,3 +35,35 @@ def get_brand_service():
 def get_roi_service():
     """ROI 서비스 의존성"""
     return roi_service
+
+def get_score_service():
+    """종합 점수 서비스 의존성"""
+    return score_service
+
+def get_compare_service():
+    """채널 비교 서비스 의존성"""
+    return compare_service
+
+def get_job_service():
+    """분석 작업 큐 서비스 의존성"""
+    return job_service
+
+def get_candidate_service():
+    """채널 후보 검색 서비스 의존성"""
+    return candidate_service
+
+def get_search_service():
+    """채널 검색 서비스 의존성"""
+    return search_service
+
+def get_ranking_service():
+    """프로젝트 결과 순위 서비스 의존성"""
+    return ranking_service
+
+def get_channel_stats_service():
+    """채널 영상 집계 서비스 의존성"""
+    return channel_stats_service
+
+def get_comment_service():
+    """댓글 수집/클러스터 서비스 의존성"""
+    return comment_service
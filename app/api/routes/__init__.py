@@ -4,6 +4,7 @@ from .youtuber import router as youtuber_router
 from .analysis import router as analysis_router
 from .compare import router as compare_router
 from .project import router as project_router
+from .debug import router as debug_router
 
 api_router = APIRouter()
 
@@ -13,3 +14,4 @@ api_router.include_router(youtuber_router)
 api_router.include_router(analysis_router)
 api_router.include_router(compare_router)
 api_router.include_router(project_router)
+api_router.include_router(debug_router)
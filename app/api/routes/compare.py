@@ -3,93 +3,91 @@
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
-from typing import List, Dict
-from pydantic import BaseModel
+from typing import List, Dict, Optional
+from pydantic import BaseModel, Field
+import numpy as np
 from app.schemas.roi import WeightConfig
 from app.core.models import Project, Influencer
-from app.api.deps import get_db_session
+from app.core.profiling import ProfiledRoute
+from app.core.responses import ORJSONResponse
+from app.api.deps import get_db_session, get_score_service, get_compare_service
+from app.services.roi_service import roi_service
+from app.services.score_service import ScoreService
+from app.services.compare_service import CompareService
 
-router = APIRouter(prefix="/compare", tags=["Compare"])
+router = APIRouter(prefix="/compare", tags=["Compare"], route_class=ProfiledRoute)
 
 class ChannelCompareRequest(BaseModel):
     project_id: str
     channel_ids: List[str]
+    timeout_seconds: Optional[float] = Field(None, gt=0, description="전체 대기 시간 (기본값: COMPARE_TIMEOUT_SECONDS)")
 
 class WeightCompareRequest(BaseModel):
     project_id: str
     channel_id: str
-    weight_configs: List[WeightConfig]
+    weight_configs: List[WeightConfig] = []
+    simplex_steps: Optional[int] = Field(None, ge=1, le=200, description="가중치 심플렉스 탐색 간격 (1/steps)")
 
 @router.post("/channels")
 def compare_channels(
     req: ChannelCompareRequest,
-    session: Session = Depends(get_db_session)
+    session: Session = Depends(get_db_session),
+    compare_service: CompareService = Depends(get_compare_service)
 ):
-    """여러 채널 비교 분석 (프로젝트 기반)"""
+    """여러 채널 비교 분석 (프로젝트 기반)
+
+    채널별 구성요소 점수를 요청 단위 스레드 풀에서 병렬로 한 번씩만 계산합니다
+    (동시 실행 채널 수는 COMPARE_MAX_WORKERS까지).
+    제한 시간을 넘긴 채널은 제외하고 완료된 채널의 부분 결과를 반환합니다.
+    """
     
     # 프로젝트 존재 확인
     project = session.get(Project, req.project_id)
     if not project:
         raise HTTPException(status_code=404, detail="프로젝트를 찾을 수 없습니다")
     
-    results = []
-    
-    for channel_id in req.channel_ids:
-        try:
-            # 각 채널별 종합 분석 결과 조회
-            from app.api.routes.analysis import (
-                analyze_brand_compatibility, 
-                analyze_sentiment, 
-                estimate_roi, 
-                get_total_score
-            )
-            
-            # 개별 분석 결과
-            brand_result = analyze_brand_compatibility(req.project_id, channel_id, session)
-            sentiment_result = analyze_sentiment(req.project_id, channel_id, session)
-            roi_result = estimate_roi(req.project_id, channel_id, session)
-            total_result = get_total_score(req.project_id, channel_id, session)
-            
-            # 채널 정보
-            influencer = session.get(Influencer, channel_id)
-            
-            channel_result = {
-                "channel_id": channel_id,
-                "channel_name": influencer.title if influencer else "Unknown",
-                "subscriber_count": influencer.subscriber_count if influencer else 0,
-                "brand_score": brand_result.score,
-                "sentiment_score": sentiment_result.score,
-                "roi_score": roi_result.score,
-                "total_score": total_result.total_score,
-                "grade": total_result.grade,
-                "recommendation": total_result.recommendation
-            }
-            results.append(channel_result)
-            
-        except Exception as e:
-            # 분석 실패한 채널은 제외
-            continue
+    weights = WeightConfig()
+    comparison = compare_service.compare_channels(
+        req.project_id,
+        req.channel_ids,
+        weights=weights,
+        timeout=req.timeout_seconds
+    )
+    results = comparison["results"]
     
-    if not results:
+    if not results and not comparison["pending_channels"]:
         raise HTTPException(status_code=404, detail="분석 가능한 채널이 없습니다")
     
-    return {
+    # 결과 행은 서비스가 만든 dict이므로 검증 없이 바로 직렬화
+    return ORJSONResponse({
         "project_id": req.project_id,
         "comparison_results": results,
-        "best_channel": max(results, key=lambda x: x["total_score"]),
+        "best_channel": max(results, key=lambda x: x["total_score"]) if results else None,
+        "failed_channels": comparison["failed_channels"],
+        "pending_channels": comparison["pending_channels"],
+        "partial": bool(comparison["failed_channels"] or comparison["pending_channels"]),
+        "timing": {
+            "total_ms": comparison["elapsed_ms"],
+            "per_channel_ms": {r["channel_id"]: r["elapsed_ms"] for r in results}
+        },
         "analysis_criteria": {
-            "brand_weight": 0.4,
-            "sentiment_weight": 0.3,
-            "roi_weight": 0.3
+            "brand_weight": weights.brand_image_weight,
+            "sentiment_weight": weights.sentiment_weight,
+            "roi_weight": weights.roi_weight
         }
-    }
+    })
 
 @router.post("/weights")
 def compare_weights(
     req: WeightCompareRequest,
-    session: Session = Depends(get_db_session)
+    session: Session = Depends(get_db_session),
+    score_service: ScoreService = Depends(get_score_service)
 ):
-    """가중치별 비교 분석 (프로젝트 기반)"""
+    """가중치별 비교 분석 (프로젝트 기반)
+
+    구성요소 점수는 한 번만 계산하고, 가중치 조합 전체를 행렬곱 한 번으로 평가합니다.
+    simplex_steps를 지정하면 가중치 심플렉스 전체를 탐색해 파레토 최적 조합을 반환합니다.
+    """
     
     # 프로젝트 존재 확인
     project = session.get(Project, req.project_id)
@@ -101,67 +99,81 @@ def compare_weights(
     if not influencer:
         raise HTTPException(status_code=404, detail="채널을 찾을 수 없습니다")
     
-    results = []
+    if not req.weight_configs and not req.simplex_steps:
+        raise HTTPException(status_code=400, detail="weight_configs 또는 simplex_steps가 필요합니다")
     
-    for i, weights in enumerate(req.weight_configs):
-        try:
-            # 개별 분석 점수 조회
-            from app.api.routes.analysis import (
-                analyze_brand_compatibility, 
-                analyze_sentiment, 
-                estimate_roi
-            )
-            
-            brand_result = analyze_brand_compatibility(req.project_id, req.channel_id, session)
-            sentiment_result = analyze_sentiment(req.project_id, req.channel_id, session)
-            roi_result = estimate_roi(req.project_id, req.channel_id, session)
-            
-            # 가중치 적용 계산
-            total_score = (
-                brand_result.score * weights.brand_image_weight +
-                sentiment_result.score * weights.sentiment_weight +
-                roi_result.score * weights.roi_weight
-            )
-            
-            # 등급 계산
-            if total_score >= 90:
-                grade = "S"
-            elif total_score >= 80:
-                grade = "A"
-            elif total_score >= 70:
-                grade = "B"
-            elif total_score >= 60:
-                grade = "C"
-            else:
-                grade = "D"
-            
-            weight_result = {
-                "weight_config": {
-                    "name": f"Config {i+1}",
-                    "brand_weight": weights.brand_image_weight,
-                    "sentiment_weight": weights.sentiment_weight,
-                    "roi_weight": weights.roi_weight
-                },
-                "total_score": round(total_score, 1),
-                "grade": grade,
-                "score_breakdown": {
-                    "brand_score": brand_result.score,
-                    "sentiment_score": sentiment_result.score,
-                    "roi_score": roi_result.score
-                }
-            }
-            results.append(weight_result)
-            
-        except Exception as e:
-            continue
+    # 구성요소 점수는 (프로젝트, 채널)당 한 번만 계산
+    try:
+        components = score_service.compute_components(session, req.project_id, req.channel_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"가중치 분석에 실패했습니다: {str(e)}")
     
-    if not results:
-        raise HTTPException(status_code=500, detail="가중치 분석에 실패했습니다")
+    component_vector = score_service.component_vector(components)
+    score_breakdown = {
+        "brand_score": components.brand.score,
+        "sentiment_score": components.sentiment.score,
+        "roi_score": components.roi.score
+    }
     
-    return {
+    # 1. 요청된 가중치 조합 평가
+    config_weights = score_service.weight_matrix(req.weight_configs)
+    config_totals = score_service.evaluate_weight_grid(component_vector, config_weights)
+    
+    results = [
+        {
+            "weight_config": _weight_config_dict(f"Config {i+1}", config_weights[i]),
+            "total_score": round(float(config_totals[i]), 1),
+            "grade": roi_service.calculate_grade(float(config_totals[i])),
+            "score_breakdown": score_breakdown
+        }
+        for i in range(len(config_totals))
+    ]
+    
+    response = {
         "project_id": req.project_id,
         "channel_id": req.channel_id,
         "channel_name": influencer.title,
-        "weight_comparison": results,
-        "optimal_weights": max(results, key=lambda x: x["total_score"])["weight_config"]
+        "weight_comparison": results
+    }
+    
+    best_config = max(results, key=lambda x: x["total_score"]) if results else None
+    
+    # 2. 가중치 심플렉스 탐색
+    if req.simplex_steps:
+        grid = score_service.simplex_weight_grid(req.simplex_steps)
+        grid_totals = score_service.evaluate_weight_grid(component_vector, grid)
+        front = score_service.pareto_front(grid_totals, grid)
+        
+        def sweep_entry(index: int) -> Dict:
+            total = float(grid_totals[index])
+            return {
+                "weight_config": _weight_config_dict(f"Sweep {index+1}", grid[index]),
+                "total_score": round(total, 1),
+                "grade": roi_service.calculate_grade(total)
+            }
+        
+        sweep_best = sweep_entry(int(np.argmax(grid_totals)))
+        response["weight_sweep"] = {
+            "steps": req.simplex_steps,
+            "grid_size": len(grid),
+            "best": sweep_best,
+            "pareto_optimal": [sweep_entry(int(i)) for i in front],
+            "score_breakdown": score_breakdown
+        }
+        
+        if best_config is None or sweep_best["total_score"] > best_config["total_score"]:
+            best_config = sweep_best
+    
+    response["optimal_weights"] = best_config["weight_config"]
+    return response
+
+def _weight_config_dict(name: str, weights: np.ndarray) -> Dict:
+    """가중치 벡터를 응답용 딕셔너리로 변환"""
+    return {
+        "name": name,
+        "brand_weight": round(float(weights[0]), 4),
+        "sentiment_weight": round(float(weights[1]), 4),
+        "roi_weight": round(float(weights[2]), 4)
     }
@@ -0,0 +1,47 @@
+"""
+디버그 API (관리자 전용) - 요청 프로파일, 느린 트레이스 조회
+"""
+import json
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.core.profiling import ProfiledRoute, list_profiles, load_profile
+from app.core.tracing import recorder
+from app.config import settings
+from app.api.deps import require_admin
+
+router = APIRouter(prefix="/debug", tags=["Debug"], dependencies=[Depends(require_admin)], include_in_schema=False,
+                   route_class=ProfiledRoute)
+
+@router.get("/profiles")
+def get_profiles(limit: int = 50):
+    """최근 요청 프로파일 목록 (최신순)"""
+    return {"profiles": list_profiles(limit)}
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """프로파일 요약 + 모델별 torch 연산 CPU 시간"""
+    content = load_profile(profile_id, "json")
+    if content is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다")
+    return json.loads(content)
+
+@router.get("/profiles/{profile_id}/folded")
+def get_profile_folded(profile_id: str):
+    """flamegraph.pl / speedscope 입력용 folded stack"""
+    content = load_profile(profile_id, "folded")
+    if content is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다")
+    return PlainTextResponse(content)
+
+@router.get("/traces")
+def get_slow_traces():
+    """TRACE_SLOW_MS 이상 걸린 최근 트레이스 목록 (최신순)"""
+    return {"slow_ms": settings.TRACE_SLOW_MS, "traces": recorder.slow_traces()}
+
+@router.get("/traces/{trace_id}")
+def get_trace(trace_id: str):
+    """트레이스의 span 목록 (시작 순, 단계별 소요/자체 시간)"""
+    trace = recorder.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="트레이스를 찾을 수 없습니다")
+    return trace
@@ -1,15 +1,19 @@
 """
 홈페이지 관련 API
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
 from sqlmodel import Session
 from typing import List
 from app.schemas.youtube import HomeYoutuberCard, ChannelWithMetrics, SearchReq
 from app.schemas.common import HealthCheck
+from app.core.profiling import ProfiledRoute
 from app.services.youtube_service import YouTubeService
-from app.api.deps import get_db_session, get_youtube_service
+from app.services.search_service import SearchService
+from app.services.feed_cache import feed_cache
+from app.config import settings
+from app.api.deps import get_db_session, get_youtube_service, get_search_service
 
-router = APIRouter(prefix="/home", tags=["Home"])
+router = APIRouter(prefix="/home", tags=["Home"], route_class=ProfiledRoute)
 
 @router.get("/health", response_model=HealthCheck)
 def health_check():
@@ -18,35 +22,54 @@ def health_check():
 
 @router.get("/youtubers", response_model=List[HomeYoutuberCard])
 def get_home_youtubers(
-    limit: int = 50,
-    session: Session = Depends(get_db_session),
+    request: Request,
+    limit: int = Query(50, ge=1, le=200, description="조회 개수"),
     youtube_service: YouTubeService = Depends(get_youtube_service)
 ):
-    """홈 화면 유튜버 카드 리스트"""
-    return youtube_service.get_home_youtubers(session, limit)
+    """홈 화면 유튜버 카드 리스트 (캐시된 무작위 후보 풀에서 요청마다 limit개 추출, 매번 달라지므로 ETag 없음)"""
+    pool_size = max(limit, settings.HOME_FEED_RANDOM_POOL)
+    return feed_cache.respond(
+        request,
+        ("youtubers", pool_size),
+        lambda session: youtube_service.get_home_youtubers(session, pool_size),
+        sample=limit
+    )
 
 @router.post("/search", response_model=List[ChannelWithMetrics])
 def search_youtubers(
     req: SearchReq,
-    youtube_service: YouTubeService = Depends(get_youtube_service)
+    session: Session = Depends(get_db_session),
+    youtube_service: YouTubeService = Depends(get_youtube_service),
+    search_service: SearchService = Depends(get_search_service)
 ):
-    """키워드로 유튜버 검색"""
+    """키워드/의미 기반 유튜버 검색 (로컬 DB 우선, 첫 페이지 결과가 없을 때만 YouTube API 검색)
+
+    mode: hybrid(BM25 + SBERT 순위 융합), lexical(BM25), semantic(SBERT)
+    """
+    offset = (req.page - 1) * req.top_n
+    influencers = search_service.search(session, req.keyword, req.top_n, offset, req.mode)
+    if influencers or req.page > 1:
+        return [youtube_service.to_channel_with_metrics(inf) for inf in influencers]
     return youtube_service.search_channels(req.keyword, req.top_n)
 
 @router.get("/popular", response_model=List[ChannelWithMetrics])
 def get_popular_youtubers(
-    top_n: int = 50,
-    session: Session = Depends(get_db_session),
+    request: Request,
+    top_n: int = Query(50, ge=1, le=200, description="조회 개수"),
     youtube_service: YouTubeService = Depends(get_youtube_service)
 ):
-    """인기 유튜버 조회 (DB 기반)"""
-    return youtube_service.get_popular_channels_from_db(session, top_n)
+    """인기 유튜버 조회 (DB 기반, 캐시된 응답)"""
+    return feed_cache.respond(
+        request,
+        ("popular", top_n),
+        lambda session: youtube_service.get_popular_channels_from_db(session, top_n)
+    )
 
 @router.get("/youtubers/sorted", response_model=List[HomeYoutuberCard])
 def get_sorted_youtubers(
+    request: Request,
     sort_by: str = "followers",  # followers, engagement, price
-    limit: int = 50,
-    session: Session = Depends(get_db_session),
+    limit: int = Query(50, ge=1, le=200, description="조회 개수"),
     youtube_service: YouTubeService = Depends(get_youtube_service)
 ):
     """유튜버 정렬 조회 API
@@ -54,5 +77,11 @@ def get_sorted_youtubers(
     Args:
         sort_by: 정렬 기준 (followers=팔로워많은순, engagement=참여율높은순, price=가격낮은순)
         limit: 조회 개수
+    
+    캐시된 응답을 반환하며 If-None-Match가 일치하면 304를 반환합니다.
     """
-    return youtube_service.get_sorted_youtubers(session, sort_by, limit)
+    return feed_cache.respond(
+        request,
+        ("sorted", sort_by, limit),
+        lambda session: youtube_service.get_sorted_youtubers(session, sort_by, limit)
+    )
@@ -1,112 +1,44 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, UploadFile, File, Form, BackgroundTasks, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
 from typing import List, Optional
 import uuid
 import json
 import os
-import math
-from app.schemas.project import YoutuberWithROI, ProjectInfo
-from app.core.models import Project, ProjectResult, Influencer
-from app.core.database import engine
+from datetime import datetime
+from app.schemas.project import YoutuberWithROI, ProjectInfo, ProjectStatus, ChannelCandidate
+from app.core.models import Project, ProjectResult, Influencer, AnalysisJob
+from app.config import settings
+from app.core.profiling import ProfiledRoute, run_in_profile
+from app.core.responses import ORJSONResponse, trusted_rows
 from app.api.deps import get_db_session
-from app.services.roi_service import roi_service
 from app.services.brand_service import brand_service
-from app.schemas.roi import WeightConfig
+from app.services.score_service import score_service
+from app.services.job_service import job_service
+from app.services.candidate_service import candidate_service
+from app.services.ranking_service import ranking_service
 
-router = APIRouter(prefix="/project", tags=["Project"])
+router = APIRouter(prefix="/project", tags=["Project"], route_class=ProfiledRoute)
 
-def calculate_roi_score(influencer, project):
-    """유튜버의 종합 ROI + 브랜드적합도 + 감성분석 점수 계산"""
-    try:
-        # 유튜버 썸네일 이미지 로드
-        channel_thumbnails = []
-        if influencer.thumbnail_url:
-            try:
-                from app.ml import load_image_from_url
-                thumbnail_image = load_image_from_url(influencer.thumbnail_url)
-                if thumbnail_image:
-                    channel_thumbnails = [thumbnail_image]
-            except:
-                pass
-        
-        # 브랜드 적합도 분석 (이미지 포함)
-        brand_score = brand_service.analyze_brand_compatibility(
-            channel_id=influencer.channel_id,
-            brand_name=project.company_name,
-            brand_description=project.campaign_goal,
-            brand_tone=project.brand_tone,
-            brand_category=project.brand_categories,
-            brand_image_path=project.brand_image_path,
-            channel_description=influencer.title or "",
-            channel_titles=[influencer.title or ""],
-            channel_thumbnails=channel_thumbnails
-        )
-        
-        # 감성 분석 (샘플 댓글 사용)
-        sample_comments = ["좋아요", "최고예요", "유용한 정보네요"]
-        sentiment_result = roi_service.analyze_sentiment(influencer.channel_id, sample_comments)
-        
-        # ROI 추정
-        roi_result = roi_service.estimate_roi(
-            influencer.channel_id,
-            influencer.subscriber_count or 0,
-            influencer.subscriber_count or 0,  # avg_views 대신 구독자 수 사용
-            influencer.engagement_rate or 0
-        )
-        
-        # 종합 점수 계산
-        weights = WeightConfig()
-        total_score_result = roi_service.calculate_total_score(
-            brand_score.score,
-            sentiment_result.score,
-            roi_result.score,
-            weights
-        )
-        
-        return total_score_result.total_score, total_score_result.grade
-        
-    except Exception as e:
-        # 오류 발생시 기본값 반환
-        return 50.0, "C"
+async def _read_upload(upload: UploadFile, max_bytes: int) -> bytes:
+    """업로드 파일 읽기 (최대 크기 초과 시 413, max_bytes + 1바이트까지만 읽음)
 
-def analyze_project_background(project_id: str):
-    """
-    백그라운드에서 실행되는 프로젝트 분석 작업
-    모든 인플루언서에 대해 점수를 계산하고 DB에 저장합니다.
+    요청 본문 전체는 BodyLimitMiddleware가 수신 중에 REQUEST_BODY_MAX_BYTES로 제한하므로
+    여기까지 온 파일은 이미 그 한도 안에 있습니다.
     """
-    # 백그라운드 작업은 별도의 세션을 열어야 함
-    with Session(engine) as session:
-        # 1. 프로젝트 조회
-        project = session.get(Project, project_id)
-        if not project:
-            return
+    content = await upload.read(max_bytes + 1)
+    if len(content) > max_bytes:
+        from fastapi import HTTPException
+        raise HTTPException(
+            status_code=413,
+            detail=f"브랜드 이미지는 최대 {max_bytes // (1024 * 1024)}MB까지 업로드할 수 있습니다"
+        )
+    return content
 
-        # 2. 분석 대상 인플루언서 전체 조회
-        influencers = session.exec(select(Influencer)).all()
-        
-        results_to_add = []
-        
-        for influencer in influencers:
-            try:
-                # 기존 계산 로직 재사용
-                total_score, grade = calculate_roi_score(influencer, project)
-                
-                # 결과 객체 생성
-                result = ProjectResult(
-                    project_id=project_id,
-                    channel_id=influencer.channel_id,
-                    roi_score=total_score, # 계산된 원점수 저장
-                    roi_grade=grade
-                )
-                results_to_add.append(result)
-            except Exception as e:
-                print(f"Error analyzing influencer {influencer.channel_id}: {e}")
-                continue
-        
-        # 3. DB 일괄 저장
-        if results_to_add:
-            session.add_all(results_to_add)
-            session.commit()
+def _write_file(path: str, content: bytes) -> None:
+    with open(path, "wb") as buffer:
+        buffer.write(content)
 
 @router.post("/create", response_model=ProjectInfo)
 async def create_project(
@@ -118,19 +50,29 @@ async def create_project(
     brand_image: Optional[UploadFile] = File(None),
     session: Session = Depends(get_db_session)
 ):
-    """프로젝트 생성 (백그라운드 분석 적용)"""
+    """프로젝트 생성 (분석 작업 큐 등록)"""
     
     project_id = str(uuid.uuid4())
     
-    # 브랜드 이미지 저장
+    # 브랜드 이미지 저장 + CLIP 임베딩 1회 계산
     brand_image_path = None
+    brand_image_embedding = None
     if brand_image:
-        os.makedirs("uploads", exist_ok=True)
-        brand_image_path = f"uploads/{project_id}_{brand_image.filename}"
+        content = await _read_upload(brand_image, settings.BRAND_IMAGE_MAX_BYTES)
+        
+        # 디코딩/검증/임베딩은 CPU 작업이므로 이벤트 루프 밖에서 실행
+        try:
+            brand_image_embedding = await run_in_threadpool(run_in_profile, brand_service.encode_brand_image, content)
+        except ValueError as e:
+            from fastapi import HTTPException
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            # 모델 로드 실패 등: 임베딩 없이 저장 (분석 시 이미지 파일에서 계산)
+            print(f"[Error] 브랜드 이미지 임베딩 계산 실패: {e}")
         
-        with open(brand_image_path, "wb") as buffer:
-            content = await brand_image.read()
-            buffer.write(content)
+        os.makedirs("uploads", exist_ok=True)
+        brand_image_path = f"uploads/{project_id}_{os.path.basename(brand_image.filename or 'brand_image')}"
+        await run_in_threadpool(run_in_profile, _write_file, brand_image_path, content)
     
     # 프로젝트 DB 저장
     project = Project(
@@ -139,13 +81,16 @@ async def create_project(
         brand_categories=brand_categories,
         brand_tone=brand_tone,
         campaign_goal=campaign_goal,
-        brand_image_path=brand_image_path
+        brand_image_path=brand_image_path,
+        brand_image_embedding=brand_image_embedding
     )
     session.add(project)
     session.commit()
     
-    # 백그라운드 분석 작업 등록
-    background_tasks.add_task(analyze_project_background, project_id)
+    # 분석 작업 큐 등록 (워커 프로세스가 처리, 인라인 모드면 현재 프로세스에서 실행)
+    job = job_service.enqueue(session, project_id)
+    if settings.ANALYSIS_RUN_INLINE:
+        background_tasks.add_task(job_service.run_job, job.job_id)
     
     return ProjectInfo(
         project_id=project_id,
@@ -158,6 +103,161 @@ async def create_project(
         total_youtubers=0
     )
 
+@router.patch("/{project_id}", response_model=ProjectInfo)
+def update_project(
+    project_id: str,
+    company_name: Optional[str] = Form(None),
+    brand_categories: Optional[str] = Form(None),
+    brand_tone: Optional[str] = Form(None),
+    campaign_goal: Optional[str] = Form(None),
+    session: Session = Depends(get_db_session)
+):
+    """프로젝트 브랜드 정보 수정 (캐시된 분석 점수 무효화)"""
+    
+    project = session.get(Project, project_id)
+    if not project:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=404, detail="프로젝트를 찾을 수 없습니다")
+    
+    updates = {
+        "company_name": company_name,
+        "brand_categories": brand_categories,
+        "brand_tone": brand_tone,
+        "campaign_goal": campaign_goal
+    }
+    for field, value in updates.items():
+        if value is not None:
+            setattr(project, field, value)
+    
+    project.updated_at = datetime.now()
+    session.add(project)
+    session.commit()
+    session.refresh(project)
+    
+    # 이전 브랜드 정보로 계산된 점수 무효화
+    score_service.invalidate_project(project_id)
+    
+    return ProjectInfo(
+        project_id=project.project_id,
+        company_name=project.company_name,
+        brand_categories=project.brand_categories,
+        brand_tone=project.brand_tone,
+        campaign_goal=project.campaign_goal,
+        brand_image_path=project.brand_image_path,
+        created_at=project.created_at,
+        total_youtubers=ranking_service.count(session.connection(), project_id)
+    )
+
+@router.get("/{project_id}/status", response_model=ProjectStatus)
+def get_project_status(
+    project_id: str,
+    session: Session = Depends(get_db_session)
+):
+    """프로젝트 분석 진행 상황 (진행률, 처리량, 예상 남은 시간)"""
+    
+    if not session.get(Project, project_id):
+        from fastapi import HTTPException
+        raise HTTPException(status_code=404, detail="프로젝트를 찾을 수 없습니다")
+    
+    job = job_service.get_latest_job(session, project_id)
+    if not job:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=404, detail="분석 작업이 없습니다")
+    
+    return ProjectStatus(**job_service.get_status(job))
+
+@router.get("/{project_id}/candidates", response_model=List[ChannelCandidate])
+def get_project_candidates(
+    project_id: str,
+    k: int = Query(50, ge=1, le=1000, description="후보 채널 수"),
+    session: Session = Depends(get_db_session)
+):
+    """브랜드 임베딩과 유사한 상위 k개 채널 (ANN 인덱스 검색, 전수 분석 없이 후보 선별)"""
+    
+    project = session.get(Project, project_id)
+    if not project:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=404, detail="프로젝트를 찾을 수 없습니다")
+    
+    if not candidate_service.is_ready():
+        from fastapi import HTTPException
+        raise HTTPException(status_code=503, detail="채널 후보 인덱스가 없습니다. scripts/build_ann_index.py를 실행해주세요")
+    
+    candidates = candidate_service.get_candidates(project, k)
+    influencers = {
+        influencer.channel_id: influencer
+        for influencer in session.exec(
+            select(Influencer).where(Influencer.channel_id.in_([c["channel_id"] for c in candidates]))
+        ).all()
+    }
+    
+    return [
+        ChannelCandidate(
+            title=influencers[candidate["channel_id"]].title,
+            thumbnail_url=influencers[candidate["channel_id"]].thumbnail_url,
+            category=influencers[candidate["channel_id"]].category or "미분류",
+            subscriber_count=influencers[candidate["channel_id"]].subscriber_count,
+            **candidate
+        )
+        for candidate in candidates
+        if candidate["channel_id"] in influencers
+    ]
+
+@router.get("/{project_id}/export")
+def export_project_rankings(
+    project_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="내보내기 형식 (ndjson, csv)"),
+    session: Session = Depends(get_db_session)
+):
+    """프로젝트 전체 순위 내보내기 (상대평가 점수/등급 포함, 스트리밍)
+
+    결과를 DB 커서에서 배치 단위로 읽어 바로 전송하므로 채널 수와 관계없이 메모리 사용량이 일정합니다.
+    """
+    
+    if not session.get(Project, project_id):
+        from fastapi import HTTPException
+        raise HTTPException(status_code=404, detail="프로젝트를 찾을 수 없습니다")
+    
+    if format == "csv":
+        return StreamingResponse(
+            ranking_service.export_csv(project_id),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f'attachment; filename="{project_id}_rankings.csv"'}
+        )
+    return StreamingResponse(ranking_service.export_ndjson(project_id), media_type="application/x-ndjson")
+
+@router.post("/{project_id}/analyze", response_model=ProjectStatus)
+def reanalyze_project(
+    project_id: str,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_db_session)
+):
+    """프로젝트 재분석 요청 (진행 중인 작업이 있으면 해당 작업 상태 반환)"""
+    
+    if not session.get(Project, project_id):
+        from fastapi import HTTPException
+        raise HTTPException(status_code=404, detail="프로젝트를 찾을 수 없습니다")
+    
+    job = job_service.enqueue(session, project_id)
+    if settings.ANALYSIS_RUN_INLINE and job.status == "queued":
+        background_tasks.add_task(job_service.run_job, job.job_id)
+    
+    return ProjectStatus(**job_service.get_status(job))
+
+@router.post("/{project_id}/cancel", response_model=ProjectStatus)
+def cancel_project_analysis(
+    project_id: str,
+    session: Session = Depends(get_db_session)
+):
+    """진행 중인 분석 작업 취소 (실행 중이면 현재 청크 커밋 후 중단)"""
+    
+    job = job_service.request_cancel(session, project_id)
+    if not job:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=404, detail="진행 중인 분석 작업이 없습니다")
+    
+    return ProjectStatus(**job_service.get_status(job))
+
 @router.delete("/{project_id}")
 def delete_project(
     project_id: str,
@@ -178,6 +278,13 @@ def delete_project(
     for result in results:
         session.delete(result)
     
+    # 관련 분석 작업 삭제 (실행 중인 작업은 다음 청크 경계에서 프로젝트 없음으로 종료)
+    jobs = session.exec(
+        select(AnalysisJob).where(AnalysisJob.project_id == project_id)
+    ).all()
+    for job in jobs:
+        session.delete(job)
+    
     # 브랜드 이미지 파일 삭제
     if project.brand_image_path and os.path.exists(project.brand_image_path):
         os.remove(project.brand_image_path)
@@ -186,6 +293,9 @@ def delete_project(
     session.delete(project)
     session.commit()
     
+    # 캐시된 분석 점수 제거
+    score_service.invalidate_project(project_id)
+    
     return {"message": "프로젝트가 삭제되었습니다"}
 
 @router.get("/list", response_model=List[ProjectInfo])
@@ -198,11 +308,6 @@ def get_project_list(
     
     result = []
     for project in projects:
-        # 각 프로젝트별 분석된 유튜버 수 계산
-        youtuber_count = session.exec(
-            select(ProjectResult).where(ProjectResult.project_id == project.project_id)
-        ).all()
-        
         result.append(ProjectInfo(
             project_id=project.project_id,
             company_name=project.company_name,
@@ -211,20 +316,24 @@ def get_project_list(
             campaign_goal=project.campaign_goal,
             brand_image_path=project.brand_image_path,
             created_at=project.created_at,
-            total_youtubers=len(youtuber_count)
+            # 각 프로젝트별 분석된 유튜버 수 (결과 행을 읽지 않고 인덱스로 계산)
+            total_youtubers=ranking_service.count(session.connection(), project.project_id)
         ))
     
     return result
 
-# 상단 import에 math가 없으면 추가해주세요
-import math 
-
 @router.get("/youtubers/{project_id}", response_model=List[YoutuberWithROI])
 def get_project_youtubers(
     project_id: str,
+    limit: Optional[int] = Query(None, ge=1, description="상위 N개만 조회 (없으면 전체)"),
+    offset: int = Query(0, ge=0, description="건너뛸 순위 수"),
     session: Session = Depends(get_db_session)
 ):
-    """특정 프로젝트의 유튜버 ROI 결과 조회 (상대평가 적용: S~D 등급 분포)"""
+    """특정 프로젝트의 유튜버 ROI 결과 조회 (상대평가 적용: S~D 등급 분포)
+
+    원점수 순위는 DB 인덱스 순서로 매기고, 최종 점수는 순위와 전체 수만으로 S-Curve를 적용합니다.
+    limit/offset을 주면 해당 구간만 읽으며 전체 결과 수는 X-Total-Count 헤더로 반환합니다.
+    """
     
     # 1. 프로젝트 존재 확인
     project = session.get(Project, project_id)
@@ -232,65 +341,11 @@ def get_project_youtubers(
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="프로젝트를 찾을 수 없습니다")
     
-    # 2. DB 데이터 조회 (이미 계산된 점수 활용)
-    query = select(ProjectResult, Influencer).join(
-        Influencer, ProjectResult.channel_id == Influencer.channel_id
-    ).where(ProjectResult.project_id == project_id)
-    
-    results = session.exec(query).all()
+    # 2. 순위 구간 조회 (상대평가 점수/등급 포함, 점수순 정렬)
+    total_count, youtubers = ranking_service.get_ranked_page(session, project_id, limit, offset)
     
-    # 3. 1차 리스트 생성 (DB에 저장된 점수 사용)
-    raw_youtuber_list = []
-    
-    for result, influencer in results:
-        # DB에 저장된 점수 사용 (없으면 기본값)
-        current_score = result.roi_score if result.roi_score is not None else 50.0
-
-        # YoutuberWithROI 객체 생성
-        youtuber_obj = YoutuberWithROI(
-            channel_id=result.channel_id,
-            title=influencer.title,
-            subscriber_count=influencer.subscriber_count,
-            thumbnail_url=influencer.thumbnail_url,
-            category=influencer.category or "미분류",
-            engagement_rate=influencer.engagement_rate,
-            estimated_price=influencer.estimated_price or "가격 문의",
-            total_score=current_score,  # 저장된 원점수
-            grade="B" # 임시 등급 (아래에서 재계산)
-        )
-        raw_youtuber_list.append(youtuber_obj)
-    
-    # ----------------------------------------------------------------
-    # [핵심 수정] 여기서 49명(전체 목록)을 상대로 '상대평가' 적용
-    # ----------------------------------------------------------------
-    
-    # 4. 원점수 기준 내림차순 정렬 (1등 -> 꼴등 줄세우기)
-    sorted_youtubers = sorted(raw_youtuber_list, key=lambda x: x.total_score, reverse=True)
-    
-    total_count = len(sorted_youtubers)
-    final_youtubers = []
-    
-    # 목표 점수 범위 (1등: 92점 ~ 꼴등: 53점)
-    MAX_SCORE = 92.0
-    MIN_SCORE = 53.0
-    
-    for rank, youtuber in enumerate(sorted_youtubers):
-        # 백분위 계산 (0.0 = 1등, 1.0 = 꼴등)
-        percentile = rank / max(1, total_count - 1)
-        
-        # [S-Curve 분포 공식 적용]
-        # 코사인 함수를 이용해 상위/하위권 변별력을 높이고 중위권을 배치
-        curve_factor = (math.cos(percentile * math.pi) + 1) / 2
-        
-        # 최종 점수 재할당
-        final_score = MIN_SCORE + (curve_factor * (MAX_SCORE - MIN_SCORE))
-        
-        # 객체 업데이트
-        youtuber.total_score = round(final_score, 2)
-        
-        youtuber.grade = roi_service._calculate_grade(final_score)
-            
-        final_youtubers.append(youtuber)
-        
-    # 5. 최종 결과 반환 (이미 점수순으로 정렬되어 있음)
-    return final_youtubers
\ No newline at end of file
+    # 3. 최종 결과 반환 (response_model 재검증 없이 직렬화)
+    return ORJSONResponse(
+        trusted_rows(youtubers, YoutuberWithROI),
+        headers={"X-Total-Count": str(total_count)}
+    )
@@ -1,14 +1,15 @@
 """
 유튜버 상세 페이지 관련 API
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session
 from typing import List, Optional
 from app.schemas.youtube import ChannelDetails, VideoStatsOut, CommentsSummaryOut
 from app.core import Influencer
+from app.core.profiling import ProfiledRoute
 from app.api.deps import get_db_session
 
-router = APIRouter(prefix="/youtuber", tags=["Youtuber Detail"])
+router = APIRouter(prefix="/youtuber", tags=["Youtuber Detail"], route_class=ProfiledRoute)
 
 @router.get("/{channel_id}/profile")
 def get_youtuber_profile(
@@ -72,13 +73,14 @@ def get_youtuber_stats(
     channel_id: str,
     session: Session = Depends(get_db_session)
 ):
-    """유튜버 통계 정보"""
+    """유튜버 통계 정보 (ROI 지표는 크롤러가 갱신하는 채널 영상 집계 기반)"""
+    from app.core.models import ChannelStats
+    
     influencer = session.get(Influencer, channel_id)
     if not influencer:
         raise HTTPException(status_code=404, detail="채널을 찾을 수 없습니다")
     
-    # 기본 통계 + 계산된 ROI 지표
-    avg_views = (influencer.view_count // influencer.video_count) if influencer.video_count else 0
+    stats = session.get(ChannelStats, channel_id)
     
     return {
         "basic_stats": {
@@ -88,12 +90,53 @@ def get_youtuber_stats(
             "engagement_rate": influencer.engagement_rate
         },
         "roi_metrics": {
-            "viral_score": round((influencer.engagement_rate or 0) * 10, 1),
-            "avg_views": avg_views,
-            "estimated_cpm": 1500,  # 기본값
+            "viral_score": influencer.viral_score,
+            "avg_views": influencer.avg_views,
+            "estimated_cpm": influencer.estimated_cpm,
             "brand_safety_score": 85,  # 기본값
             "collab_history": 0  # 기본값
         },
+        "recent_video_stats": {
+            "video_sample": stats.video_sample,
+            "avg_views": stats.avg_views,
+            "avg_likes": stats.avg_likes,
+            "avg_comments": stats.avg_comments,
+            "upload_interval_days": stats.upload_interval_days,
+            "engagement_p25": stats.engagement_p25,
+            "engagement_p50": stats.engagement_p50,
+            "engagement_p75": stats.engagement_p75
+        } if stats else None,
         "estimated_price": influencer.estimated_price,
         "category": influencer.category
     }
+
+@router.get("/{channel_id}/growth")
+def get_youtuber_growth(
+    channel_id: str,
+    days: int = Query(90, ge=1, le=3650, description="조회 기간 (일)"),
+    window: int = Query(7, ge=1, le=365, description="이동평균 구간 (일)"),
+    session: Session = Depends(get_db_session)
+):
+    """유튜버 성장 추이 (지표 스냅샷 기반 7/30/90일 증가율 + 일별 이동평균)"""
+    from datetime import datetime, timezone
+    from app.services.snapshot_service import snapshot_service, DAY_SECONDS
+    
+    influencer = session.get(Influencer, channel_id)
+    if not influencer:
+        raise HTTPException(status_code=404, detail="채널을 찾을 수 없습니다")
+    
+    # 증가율 기간(최대 90일)과 이동평균 구간을 포함하도록 조회
+    lookback_days = max(days, 90) + window + 1
+    since_ts = int(datetime.now(timezone.utc).timestamp()) - lookback_days * DAY_SECONDS
+    values = snapshot_service.load(session, channel_id, since_ts)
+    
+    return {
+        "channel_id": channel_id,
+        "snapshot_count": len(values),
+        "growth": {
+            f"{period}d": snapshot_service.growth(values, period)
+            for period in (7, 30, 90)
+        },
+        "subscriber_growth_30d": snapshot_service.growth_rate_30d(values),
+        "series": snapshot_service.daily_series(values, days, window)
+    }
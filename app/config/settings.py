@@ -18,6 +18,98 @@ class Settings(BaseSettings):
     CLIP_MODEL_NAME: str = "openai/clip-vit-base-patch32"
     SBERT_MODEL: str = "sentence-transformers/xlm-r-100langs-bert-base-nli-stsb-mean-tokens"
     KOBERT_MODEL: str = "monologg/kobert"
+    KOBERT_MAX_LENGTH: int = 128  # 특수 토큰 포함 최대 토큰 수 (댓글은 대부분 이보다 짧음)
+    KOBERT_BATCH_SIZE: int = 32  # 길이순으로 묶어 추론하는 댓글 수
+    MODEL_REVISION: str = "1"  # 점수 로직/모델 변경 시 올려서 캐시된 점수를 무효화
+    
+    # 채널 비교 설정
+    COMPARE_MAX_WORKERS: int = 16  # 비교 요청 하나가 동시에 분석하는 최대 채널 수 (요청마다 채널 수만큼, 이 값까지 스레드 생성)
+    COMPARE_TIMEOUT_SECONDS: float = 60.0  # 채널 비교 전체 대기 시간 (초과분은 부분 결과로 반환)
+    
+    # 점수 캐시 설정
+    SCORE_CACHE_MAX_ENTRIES: int = 10000
+    SCORE_CACHE_TTL_SECONDS: float = 6 * 60 * 60  # 크롤러 주기(6시간)와 동일
+    
+    BRAND_EMBEDDING_CACHE_MAX_ENTRIES: int = 1000  # 프로젝트별 브랜드 텍스트/이미지 임베딩 캐시
+    
+    # 프로젝트 분석 작업 큐 설정
+    ANALYSIS_CHUNK_SIZE: int = 50  # 청크당 채널 수 (청크 단위 커밋/재개)
+    ANALYSIS_RUN_INLINE: bool = False  # True면 워커 없이 API 프로세스에서 바로 실행
+    WORKER_POLL_INTERVAL: float = 2.0  # 워커의 작업 큐 폴링 주기 (초)
+    JOB_STALE_SECONDS: float = 300.0  # heartbeat가 끊긴 실행 작업을 재대기열에 넣는 기준
+    JOB_HEARTBEAT_INTERVAL: float = 30.0  # 실행 중 작업 heartbeat 갱신 주기 (JOB_STALE_SECONDS보다 충분히 짧게)
+    ANALYSIS_WORKERS: int = 1  # 2 이상이면 channel_id 해시 샤딩 멀티 프로세스 모드
+    ANALYSIS_TORCH_THREADS: int = 0  # 샤드 프로세스당 PyTorch 스레드 수 (0이면 코어 수 / 워커 수)
+    
+    # 썸네일 이미지 저장소 설정
+    IMAGE_STORE_DIR: str = "./db/images"  # 224x224로 전처리된 썸네일 저장 위치
+    IMAGE_PREFETCH_CONCURRENCY: int = 16  # 크롤러 prefetch 동시 다운로드 수
+    IMAGE_FETCH_ON_MISS: bool = False  # True면 저장소에 없는 썸네일을 점수 계산 중 직접 다운로드
+    
+    # 브랜드 이미지 업로드 설정
+    BRAND_IMAGE_MAX_BYTES: int = 10 * 1024 * 1024  # 초과 시 413
+    REQUEST_BODY_MAX_BYTES: int = 11 * 1024 * 1024  # 요청 본문 최대 크기 (브랜드 이미지 + 폼 필드), 수신 중 초과하면 413
+    
+    # 채널 후보 ANN 인덱스 설정
+    ANN_INDEX_DIR: str = "./db/ann"  # 채널 SBERT/CLIP 임베딩 인덱스 저장 위치
+    ANN_BACKEND: str = "numpy"  # numpy(IVF) 또는 faiss(HNSW, faiss-cpu 설치 필요)
+    ANN_IVF_MIN_SIZE: int = 4096  # 이보다 적으면 전수 검색
+    ANN_NLIST: int = 0  # IVF 리스트 수 (0이면 sqrt(채널 수))
+    ANN_NPROBE: int = 8  # 검색 시 탐색할 IVF 리스트 수
+    ANN_OVERSAMPLE: int = 4  # 인덱스별로 k * ANN_OVERSAMPLE개 후보를 뽑아 재정렬
+    ANALYSIS_SHORTLIST_SIZE: int = 0  # 0보다 크면 분석 작업은 ANN 후보 상위 N개 채널만 점수 계산
+    
+    # 홈 피드 캐시 설정
+    HOME_FEED_TTL_SECONDS: float = 300.0  # 이 시간이 지나면 이전 응답을 주면서 백그라운드 갱신
+    HOME_FEED_MAX_ENTRIES: int = 256
+    HOME_FEED_RANDOM_POOL: int = 1000  # /home/youtubers 무작위 추출용 캐시 후보 수
+    HOME_FEED_VERSION_FILE: str = "./db/.home_feed_version"  # 크롤러가 커밋 후 갱신하는 데이터 버전 파일
+    
+    # 채널 검색 설정
+    SEARCH_CANDIDATE_POOL: int = 200  # 검색 방식별로 융합에 사용할 상위 후보 수
+    SEARCH_RRF_K: int = 60  # reciprocal rank fusion 상수 (1 / (k + 순위))
+    SEARCH_MIN_SIMILARITY: float = 0.3  # 의미 검색 결과로 인정할 최소 코사인 유사도
+
+    # 지표 설정
+    METRICS_ENABLED: bool = True  # /metrics 노출 및 요청 처리 시간 측정
+
+    # 관리자/프로파일링 설정
+    ADMIN_TOKEN: str = ""  # X-Admin-Token 헤더로 확인하는 관리자 토큰 (비어 있으면 관리자 기능 비활성화)
+    PROFILE_DIR: str = "./db/profiles"  # 요청 프로파일(folded stack, torch 연산 시간) 저장 위치
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0  # 프로파일링 중 스택 샘플링 주기
+
+    # 트레이싱 설정
+    TRACING_ENABLED: bool = True  # 요청/분석 작업별 span 수집 (라우트, 서비스, ML, YouTube API, DB 쿼리)
+    TRACE_SLOW_MS: float = 1000.0  # 이 시간 이상 걸린 트레이스를 /api/debug/traces 링 버퍼에 보관
+    TRACE_BUFFER_SIZE: int = 100  # 보관할 느린 트레이스 수
+    TRACE_MAX_SPANS: int = 2000  # 트레이스당 최대 span 수 (초과분은 버리고 개수만 기록)
+    TRACE_EXPORT: str = ""  # 비어 있으면 내보내지 않음 / jsonl / otlp
+    TRACE_EXPORT_SAMPLE_RATE: float = 1.0  # 내보낼 트레이스 비율 (느린 트레이스는 항상 내보냄)
+    TRACE_EXPORT_PATH: str = "./db/traces.jsonl"  # jsonl 내보내기 파일
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"  # 로컬 OpenTelemetry Collector (OTLP/HTTP JSON)
+
+    # 응답 직렬화 설정
+    TRUST_INTERNAL_ROWS: bool = True  # True면 DB에서 바로 만든 목록 응답 행의 Pydantic 검증 생략 (orjson 직렬화)
+    EXPORT_BATCH_SIZE: int = 1000  # 순위 내보내기 스트리밍 시 커서에서 한 번에 읽는 행 수
+
+    # 채널 영상 집계 설정
+    CHANNEL_STATS_RECENT_VIDEOS: int = 20  # 평균/백분위 계산에 사용하는 최근 영상 수
+
+    # 댓글 중복 제거 설정
+    COMMENT_SIMHASH_MAX_DISTANCE: int = 6  # 64비트 SimHash 해밍 거리가 이 이하면 같은 클러스터
+    COMMENT_SIMHASH_MIN_CHARS: int = 4  # 정규화 후 글자 수(공백 제외)가 이보다 적으면 SimHash 대신 원문이 같을 때만 묶음 (이모지/기호만 있는 댓글 등)
+
+    # 감성 분석 표본 추출 설정
+    COMMENT_SAMPLE_STRATEGY: str = "likes"  # likes(좋아요 가중) / recency(최신 가중) / stratified(영상별 층화)
+    COMMENT_SAMPLE_INITIAL: int = 30  # 처음 분석할 댓글(클러스터) 수
+    COMMENT_SAMPLE_STEP: int = 30  # 신뢰구간이 넓으면 한 번에 추가 분석할 수
+    COMMENT_SAMPLE_MAX: int = 300  # 채널당 최대 분석 수 (추론 비용 상한)
+    COMMENT_SAMPLE_CI_WIDTH: float = 0.2  # 긍정 비율 95% 신뢰구간 폭이 이 이하가 되면 중단
+    COMMENT_SAMPLE_HALF_LIFE_DAYS: float = 30.0  # recency 방식에서 가중치가 절반이 되는 댓글 나이 (일)
+
+    # 채널 지표 스냅샷 설정
+    SNAPSHOT_RAW_MONTHS: int = 3  # 최근 N개월은 수집 주기(6시간) 그대로 보관
+    SNAPSHOT_DAILY_MONTHS: int = 24  # 그 이후 N개월까지는 하루 1개, 이보다 오래된 데이터는 주 1개로 다운샘플링
     
     # YouTube API 설정
     YOUTUBE_API_KEY: str = ""
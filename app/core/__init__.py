@@ -1,4 +1,4 @@
 from .database import create_db_and_tables, get_session, engine
-from .models import Influencer, Video, VideoLink
+from .models import Influencer, Video, VideoLink, AnalysisJob
 
-__all__ = ["create_db_and_tables", "get_session", "engine", "Influencer", "Video", "VideoLink"]
+__all__ = ["create_db_and_tables", "get_session", "engine", "Influencer", "Video", "VideoLink", "AnalysisJob"]
@@ -0,0 +1,65 @@
+"""
+요청 본문 크기 제한 - 본문을 받는 도중에 REQUEST_BODY_MAX_BYTES를 넘으면 413으로 끊는 ASGI 미들웨어
+
+multipart 본문은 엔드포인트가 실행되기 전에 전부 파싱되어 임시 파일로 저장되므로,
+엔드포인트에서 크기를 확인하면 이미 전체 업로드를 받은 뒤입니다.
+Content-Length가 한도를 넘으면 본문을 읽기 전에 거절하고, 헤더가 없거나(chunked) 값과 다르게
+더 보내는 경우에도 수신한 바이트 수를 세어 한도를 넘는 순간 중단합니다.
+"""
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+class BodyLimitMiddleware:
+    """요청 본문 크기 제한 ASGI 미들웨어"""
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > self.max_bytes:
+                    await self._too_large()(scope, receive, send)
+                    return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # 라우트 안에서 발생하면 HTTPException 처리기가 413 응답으로 변환
+                    raise HTTPException(status_code=413, detail=self._detail())
+            return message
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, send_wrapper)
+        except HTTPException as e:
+            # 라우트 밖(다른 미들웨어 등)에서 본문을 읽다 초과한 경우
+            if e.status_code != 413 or response_started:
+                raise
+            await self._too_large()(scope, receive, send)
+
+    def _detail(self) -> str:
+        return f"요청 본문은 최대 {self.max_bytes // (1024 * 1024)}MB까지 보낼 수 있습니다"
+
+    def _too_large(self) -> JSONResponse:
+        return JSONResponse({"detail": self._detail()}, status_code=413)
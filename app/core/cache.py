@@ -0,0 +1,84 @@
+"""
+프로세스 내 캐시 - TTL 만료 + LRU 퇴출을 지원하는 스레드 안전 캐시
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from app.core.metrics import registry
+
+_MISSING = object()
+
+class TTLCache:
+    """TTL/LRU 캐시
+
+    maxsize를 넘으면 가장 오래 사용되지 않은 항목부터 퇴출하고,
+    ttl(초)이 지난 항목은 조회 시점에 만료 처리합니다. ttl=None이면 만료하지 않습니다.
+    name을 주면 /metrics에 적중/미스 수와 적중률이 노출됩니다.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        if name:
+            registry.register_cache(name, self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """캐시 조회 (만료된 항목은 제거 후 default 반환)"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """캐시 저장 (용량 초과 시 LRU 퇴출)"""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """캐시에 없으면 factory 결과를 저장 후 반환"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """조건에 맞는 항목 제거 (predicate가 없으면 전체 제거), 제거된 개수 반환"""
+        with self._lock:
+            if predicate is None:
+                removed = len(self._data)
+                self._data.clear()
+                return removed
+
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,6 +1,9 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import event
 from pathlib import Path
 from app.config import settings
+from app.core.metrics import instrument_engine
+from app.core.tracing import trace_engine
 
 # 데이터베이스 파일 경로 설정
 ROOT_DIR = Path(__file__).resolve().parent.parent.parent
@@ -11,12 +14,29 @@ DB_DIR.mkdir(exist_ok=True)
 engine = create_engine(
     settings.DATABASE_URL,
     echo=False,  # 프로덕션에서는 False
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False, "timeout": 30}
 )
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """API 프로세스와 분석 워커가 동시에 접근할 수 있도록 WAL 모드 사용"""
+    if engine.dialect.name == "sqlite":
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+# 쿼리 실행 시간 지표 (/metrics) + 트레이스 span
+instrument_engine(engine)
+trace_engine(engine)
+
 def create_db_and_tables():
     """데이터베이스와 테이블 생성"""
     SQLModel.metadata.create_all(engine)
+    
+    # 채널 전문 검색 인덱스 (FTS5 + 동기화 트리거)
+    from app.core.search_index import create_search_index
+    create_search_index(engine)
 
 def get_session():
     """데이터베이스 세션 의존성"""
@@ -0,0 +1,303 @@
+"""
+프로세스 내 지표 수집 - Prometheus 텍스트 노출 형식(/metrics)으로 내보내는 카운터/히스토그램/게이지
+
+외부 지표 서비스나 클라이언트 라이브러리 없이 프로세스 메모리에서 집계하며,
+분석 워커처럼 별도 프로세스의 지표는 해당 프로세스에만 남습니다.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 기본 지연 시간 버킷 (초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    """라벨별 값을 보관하는 지표 공통 부분 (라벨은 키워드 인자로 전달)"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 라벨이 맞지 않습니다: {sorted(labels)} != {sorted(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(_Metric):
+    """단조 증가 카운터 (collect가 있으면 노출 시점에 {라벨 값 튜플: 값}을 받아 옴)"""
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = dict(self._values)
+        if self._collect is not None:
+            items.update(self._collect())
+        for key, value in items.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Gauge(Counter):
+    """현재 값 게이지"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램 (_bucket/_sum/_count)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """with 블록 실행 시간(초) 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+class MetricsRegistry:
+    """지표 목록 + 이름 붙은 캐시 (노출 시점에 적중/미스 수를 읽음)"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._caches: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def register_cache(self, name: str, cache) -> None:
+        """TTLCache처럼 hits/misses/__len__이 있는 캐시 등록"""
+        with self._lock:
+            self._caches[name] = cache
+
+    def cache_values(self, attribute: str) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            caches = list(self._caches.items())
+        if attribute == "entries":
+            return {(name,): len(cache) for name, cache in caches}
+        return {(name,): getattr(cache, attribute) for name, cache in caches}
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+registry = MetricsRegistry()
+
+def batch_size_label(size: int) -> str:
+    """배치 크기 라벨 (2의 거듭제곱으로 올림해 라벨 종류를 제한)"""
+    return str(1 << max(0, size - 1).bit_length()) if size > 0 else "0"
+
+# HTTP 요청
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간 (라우트 템플릿 기준)", ("method", "route", "status")
+))
+
+# 모델 로딩/추론
+MODEL_LOAD_DURATION = registry.register(Histogram(
+    "model_load_duration_seconds", "모델 로딩 시간", ("model",), buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+))
+MODEL_INFERENCE_DURATION = registry.register(Histogram(
+    "model_inference_duration_seconds", "모델 추론 1회(배치) 시간", ("model", "batch_size")
+))
+MODEL_INFERENCE_ITEMS = registry.register(Counter(
+    "model_inference_items_total", "모델 추론 입력 수", ("model",)
+))
+
+# 캐시
+CACHE_HITS = registry.register(Counter(
+    "cache_hits_total", "캐시 적중 수", ("cache",), collect=lambda: registry.cache_values("hits")
+))
+CACHE_MISSES = registry.register(Counter(
+    "cache_misses_total", "캐시 미스 수", ("cache",), collect=lambda: registry.cache_values("misses")
+))
+CACHE_HIT_RATIO = registry.register(Gauge(
+    "cache_hit_ratio", "캐시 적중률", ("cache",), collect=lambda: registry.cache_values("hit_ratio")
+))
+CACHE_ENTRIES = registry.register(Gauge(
+    "cache_entries", "캐시 항목 수", ("cache",), collect=lambda: registry.cache_values("entries")
+))
+
+# YouTube Data API
+YOUTUBE_REQUESTS = registry.register(Counter(
+    "youtube_api_requests_total", "YouTube API 호출 수", ("endpoint", "status")
+))
+YOUTUBE_QUOTA_UNITS = registry.register(Counter(
+    "youtube_api_quota_units_total", "YouTube API 할당량 사용량 (추정 단위)", ("endpoint",)
+))
+YOUTUBE_REQUEST_DURATION = registry.register(Histogram(
+    "youtube_api_request_duration_seconds", "YouTube API 응답 시간", ("endpoint",)
+))
+
+# DB
+DB_QUERY_DURATION = registry.register(Histogram(
+    "db_query_duration_seconds", "DB 쿼리 실행 시간 (문장 종류별)", ("operation",),
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+))
+
+# YouTube Data API v3 엔드포인트별 할당량 단가 (목록 조회 1, 검색 100)
+YOUTUBE_QUOTA_COST = {"search": 100}
+
+def record_youtube_call(endpoint: str, seconds: float, status: object) -> None:
+    YOUTUBE_REQUESTS.inc(endpoint=endpoint, status=status)
+    YOUTUBE_QUOTA_UNITS.inc(YOUTUBE_QUOTA_COST.get(endpoint, 1), endpoint=endpoint)
+    YOUTUBE_REQUEST_DURATION.observe(seconds, endpoint=endpoint)
+
+def instrument_engine(engine) -> None:
+    """SQLAlchemy 커서 실행 이벤트로 쿼리 시간 기록 (executemany도 1회로 기록)"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_DURATION.observe(time.perf_counter() - started, operation=operation)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        # 실패한 쿼리는 after_cursor_execute가 호출되지 않으므로 시작 시각만 정리
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+def route_template(scope) -> str:
+    """매칭된 라우트 경로 템플릿 (매칭되지 않았으면 "unmatched")
+
+    include_router로 포함된 라우트의 path에는 바깥 라우터 prefix(/api)가 빠져 있으므로,
+    요청 경로에서 라우트 패턴이 매칭되는 위치 앞부분을 prefix로 붙입니다.
+    """
+    route = scope.get("route")
+    if getattr(route, "path", None) is None:
+        return "unmatched"
+    path = scope["path"]
+    regex = getattr(route, "path_regex", None)
+    if regex is not None and not regex.match(path):
+        for index, char in enumerate(path):
+            if char == "/" and regex.match(path[index:]):
+                return path[:index] + route.path
+    return route.path
+
+class MetricsMiddleware:
+    """요청 처리 시간을 라우트 템플릿(/api/youtuber/{channel_id})별로 기록하는 ASGI 미들웨어
+
+    응답 본문 전송이 끝날 때까지를 측정하므로 스트리밍 응답도 전체 시간이 기록됩니다.
+    라우트가 매칭되지 않은 요청은 경로 대신 "unmatched"로 묶어 라벨 종류가 늘지 않게 합니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route_template(scope),
+                status=status
+            )
+
+def render_metrics() -> str:
+    return registry.render()
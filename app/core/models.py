@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from typing import List, Optional
 from datetime import datetime
 
@@ -23,12 +24,33 @@ class Video(SQLModel, table=True):
 
 # Comment 테이블 정의
 class Comment(SQLModel, table=True):
+    __table_args__ = (
+        # YouTube 댓글 ID 기준 중복 수집 방지 (ID 없는 샘플 댓글은 NULL 허용)
+        Index("ux_comment_comment_id", "comment_id", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
+    comment_id: Optional[str] = None  # YouTube 댓글 ID
     video_id: str = Field(foreign_key="video.video_id")
     channel_id: str = Field(foreign_key="influencer.channel_id")
     comment_text: str
     like_count: Optional[int] = None
     published_at: Optional[datetime] = None
+    author_name: Optional[str] = None
+    token_ids: Optional[bytes] = None  # 수집 시 KoBERT 토큰 ID (토크나이저 태그 + uint16 배열, 특수 토큰 제외)
+    cluster_id: Optional[int] = Field(default=None, foreign_key="commentcluster.id", index=True)
+
+# 채널 내 유사 댓글 클러스터 (복사/스팸 댓글은 하나로 묶고 개수만 유지)
+class CommentCluster(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    channel_id: str = Field(foreign_key="influencer.channel_id", index=True)
+    simhash: int  # 정규화 텍스트 64비트 SimHash (부호 있는 정수)
+    representative_text: str  # 클러스터 첫 댓글 원문 (감성 분석 입력)
+    token_ids: Optional[bytes] = None  # 대표 댓글 KoBERT 토큰 ID
+    size: int = 1  # 클러스터에 속한 댓글 수 (감성 비율 가중치)
+    like_count: int = 0  # 클러스터 댓글 좋아요 합
+    first_published_at: Optional[datetime] = None
+    last_published_at: Optional[datetime] = None
 
 # Influencer 테이블 정의
 class Influencer(SQLModel, table=True):
@@ -58,6 +80,31 @@ class Influencer(SQLModel, table=True):
     # Video와의 관계
     videos: List[Video] = Relationship(back_populates="channel")
 
+# 채널별 최근 영상 집계 (크롤러가 수집 시 증분 갱신, 점수 계산은 Video 대신 이 테이블을 읽음)
+class ChannelStats(SQLModel, table=True):
+    channel_id: str = Field(foreign_key="influencer.channel_id", primary_key=True)
+    video_sample: int = 0  # 집계에 사용된 최근 영상 수 (최대 CHANNEL_STATS_RECENT_VIDEOS)
+    avg_views: Optional[float] = None
+    avg_likes: Optional[float] = None
+    avg_comments: Optional[float] = None
+    upload_interval_days: Optional[float] = None  # 업로드 간격 중앙값 (일)
+    engagement_p25: Optional[float] = None  # 영상별 참여율 (좋아요+댓글)/조회수(%) 백분위
+    engagement_p50: Optional[float] = None
+    engagement_p75: Optional[float] = None
+    recent_videos: Optional[str] = None  # 최근 영상 창 JSON [[video_id, 게시일, 조회수, 좋아요, 댓글], ...]
+    subscriber_growth_30d: Optional[float] = None  # 스냅샷 기반 30일 환산 구독자 증가율 (%)
+    updated_at: Optional[datetime] = None
+
+# 채널 지표 스냅샷 (채널 x 월 단위 블록, 컬럼별 정수 델타 인코딩 + zlib 압축)
+class ChannelSnapshotBlock(SQLModel, table=True):
+    channel_id: str = Field(foreign_key="influencer.channel_id", primary_key=True)
+    month: str = Field(primary_key=True)  # "YYYY-MM" (UTC)
+    resolution: str = "raw"  # raw(수집마다), daily(하루 1개), weekly(주 1개)
+    count: int = 0  # 블록 내 스냅샷 수
+    first_ts: int = 0  # 첫/마지막 스냅샷 시각 (epoch 초)
+    last_ts: int = 0
+    data: bytes = b""  # [ts, 구독자, 조회수, 영상 수, 참여율*1000] int64 델타 열
+
 # 프로젝트 테이블 (브랜드 정보)
 class Project(SQLModel, table=True):
     project_id: str = Field(primary_key=True)
@@ -66,12 +113,56 @@ class Project(SQLModel, table=True):
     brand_tone: str  # "친화적", "프리미엄", "럭셔리"
     campaign_goal: str  # 캠페인 목표
     brand_image_path: Optional[str] = None  # 브랜드 이미지 파일 경로
+    brand_image_embedding: Optional[bytes] = None  # 브랜드 이미지 CLIP 임베딩 (CLIP 모델 이름 헤더 + 정규화된 float32, 생성 시 1회 계산)
     created_at: Optional[datetime] = Field(default_factory=datetime.now)
+    updated_at: Optional[datetime] = None  # 브랜드 정보 수정 시각 (점수 캐시 버전)
 
-# 프로젝트별 유튜버 총합점수 결과
+# 프로젝트별 유튜버 총합점수 결과 (구성요소 점수 materialized)
 class ProjectResult(SQLModel, table=True):
+    __table_args__ = (
+        Index("ux_projectresult_project_channel", "project_id", "channel_id", unique=True),
+        # 프로젝트별 원점수 순위 조회 (동점은 rowid 순으로 이어져 정렬 없이 상위 k개/구간 조회)
+        Index("ix_projectresult_project_score", "project_id", text("roi_score DESC")),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     project_id: str = Field(foreign_key="project.project_id")
     channel_id: str = Field(foreign_key="influencer.channel_id")
     roi_score: float  # 0-100 점수
     roi_grade: str   # S, A, B, C, D
+
+    # 구성요소 점수
+    brand_score: Optional[float] = None
+    text_score: Optional[float] = None
+    image_score: Optional[float] = None
+    sentiment_score: Optional[float] = None
+    roi_estimate_score: Optional[float] = None
+    breakdown: Optional[str] = None  # ComponentScores JSON (상세 분석 결과 전체)
+
+    # 입력 버전 스탬프 (일치할 때만 분석 API가 이 행을 재사용)
+    project_version: Optional[str] = None
+    channel_version: Optional[str] = None
+    model_version: Optional[str] = None
+    computed_at: Optional[datetime] = None
+
+
+# 프로젝트 분석 작업 큐 (워커 프로세스가 청크 단위로 처리)
+class AnalysisJob(SQLModel, table=True):
+    job_id: str = Field(primary_key=True)
+    project_id: str = Field(foreign_key="project.project_id", index=True)
+    status: str = Field(default="queued", index=True)  # queued, running, completed, failed, cancelled
+    total: int = 0  # 분석 대상 채널 수
+    processed: int = 0  # 처리 완료 채널 수
+    failed: int = 0  # 분석 실패 채널 수
+    cursor: Optional[str] = None  # 마지막으로 커밋된 청크의 channel_id (재개 지점)
+    chunk_size: int = 50
+    cancel_requested: bool = False
+    worker_id: Optional[str] = None
+    run_processed_start: int = 0  # 현재 실행 시작 시점의 processed (처리량 계산용)
+    shard_state: Optional[str] = None  # 멀티 프로세스 모드의 샤드별 cursor/지표 JSON
+    channel_ids: Optional[str] = None  # ANN 후보 shortlist JSON (None이면 전체 채널)
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None  # 현재 실행(재개 포함) 시작 시각
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,296 @@
+"""
+요청 단위 프로파일링 - 관리자가 요청한 호출만 스택 샘플링해 flamegraph용 folded stack으로 저장
+
+X-Profile: 1 헤더(또는 ?profile=1 쿼리)와 X-Admin-Token 헤더(ADMIN_TOKEN)가 함께 있을 때만 동작합니다.
+프로파일링 중에는 CLIP/SBERT/KoBERT 추론 구간을 torch profiler로 감싸 연산별 CPU 시간도 함께 남깁니다.
+요청하지 않은 호출은 헤더 확인 한 번과 ContextVar 조회만 거치므로 추가 비용이 거의 없습니다.
+
+샘플링 대상은 이 요청의 컨텍스트에서 run_in_profile로 들어간 스레드뿐입니다 (ProfiledRoute가 동기 엔드포인트를,
+실행기/스레드 풀에 작업을 넘기는 쪽이 해당 작업을 감쌈). 같은 엔드포인트를 처리하는 다른 요청의 스레드는 섞이지 않습니다.
+
+결과는 PROFILE_DIR/<id>.folded (flamegraph.pl, speedscope 입력)와 <id>.json (요약 + torch 연산)으로 저장되고,
+응답의 X-Profile-Id 헤더로 id를 알려 줍니다.
+"""
+import hmac
+import inspect
+import json
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qs
+from fastapi.routing import APIRoute
+from app.config import settings
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+MAX_STACK_DEPTH = 200
+TOP_TORCH_OPS = 30
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+# torch profiler는 프로세스에 하나만 켤 수 있으므로 동시에 프로파일링되는 추론은 먼저 잡은 쪽만 기록
+_torch_lock = threading.Lock()
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """ADMIN_TOKEN과 일치하는지 확인 (토큰이 설정되지 않았으면 항상 거부)"""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), settings.ADMIN_TOKEN.encode("utf-8"))
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", Path(code.co_filename).stem)
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+class RequestProfile:
+    """한 요청의 스택 샘플과 torch 연산 시간"""
+
+    def __init__(self, method: str, path: str):
+        self.profile_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(4)}"
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc)
+        self.duration = 0.0
+        self.status = 500
+        self.samples: Counter = Counter()
+        # 이 요청의 작업을 실행 중인 스레드 {스레드 id: run_in_profile 프레임 (스택 기준점)}
+        self.threads: Dict[int, object] = {}
+        # 모델별 {연산 이름: [호출 수, 전체 CPU 시간(us), 자체 CPU 시간(us)]}
+        self.torch_ops: Dict[str, Dict[str, List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def enter_thread(self, thread_id: int, root_frame) -> bool:
+        """스레드를 샘플링 대상에 등록 (이미 등록된 스레드면 False)"""
+        with self._lock:
+            if thread_id in self.threads:
+                return False
+            self.threads[thread_id] = root_frame
+            return True
+
+    def exit_thread(self, thread_id: int) -> None:
+        with self._lock:
+            self.threads.pop(thread_id, None)
+
+    def thread_roots(self) -> List:
+        with self._lock:
+            return list(self.threads.items())
+
+    def add_stack(self, frame, root_frame) -> bool:
+        """root_frame(run_in_profile)부터 현재 프레임까지를 샘플 1개로 기록 (root_frame을 벗어났으면 기록 안 함)"""
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            stack.append(frame)
+            if frame is root_frame:
+                break
+            frame = frame.f_back
+        else:
+            return False
+        with self._lock:
+            self.samples[";".join(_frame_label(f) for f in reversed(stack))] += 1
+        return True
+
+    def add_torch_ops(self, model: str, events) -> None:
+        with self._lock:
+            ops = self.torch_ops.setdefault(model, {})
+            for event in events:
+                entry = ops.setdefault(event.key, [0, 0.0, 0.0])
+                entry[0] += event.count
+                entry[1] += event.cpu_time_total
+                entry[2] += event.self_cpu_time_total
+
+    def folded(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def summary(self) -> Dict:
+        with self._lock:
+            torch_ops = {
+                model: [
+                    {"op": name, "calls": int(calls), "cpu_ms": round(total / 1000, 3), "self_cpu_ms": round(own / 1000, 3)}
+                    for name, (calls, total, own) in sorted(ops.items(), key=lambda item: -item[1][2])[:TOP_TORCH_OPS]
+                ]
+                for model, ops in self.torch_ops.items()
+            }
+            sample_count = sum(self.samples.values())
+        return {
+            "profile_id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3),
+            "sample_interval_ms": settings.PROFILE_SAMPLE_INTERVAL_MS,
+            "samples": sample_count,
+            "torch_ops": torch_ops
+        }
+
+    def save(self, directory: str) -> None:
+        root = Path(directory)
+        root.mkdir(parents=True, exist_ok=True)
+        (root / f"{self.profile_id}.folded").write_text(self.folded(), encoding="utf-8")
+        (root / f"{self.profile_id}.json").write_text(
+            json.dumps(self.summary(), ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+def run_in_profile(func, *args, **kwargs):
+    """프로파일링 중인 요청이면 현재 스레드를 샘플링 대상으로 등록한 채 func 실행
+
+    스레드 풀/실행기 스레드는 여러 요청이 번갈아 쓰므로 이 호출이 끝나면 바로 등록을 해제합니다.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return func(*args, **kwargs)
+
+    thread_id = threading.get_ident()
+    registered = profile.enter_thread(thread_id, sys._getframe())
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if registered:
+            profile.exit_thread(thread_id)
+
+class ProfiledRoute(APIRoute):
+    """동기 엔드포인트를 run_in_profile로 감싸는 라우트 (스레드 풀 스레드가 요청 컨텍스트에서 자신을 등록)
+
+    비동기 엔드포인트는 이벤트 루프 스레드를 다른 요청과 공유하므로 등록하지 않고,
+    엔드포인트가 스레드 풀에 넘기는 작업을 run_in_profile로 감쌉니다.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if inspect.isfunction(endpoint) and not inspect.iscoroutinefunction(endpoint):
+            endpoint = self._profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _profiled(endpoint):
+        @wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            return run_in_profile(endpoint, *args, **kwargs)
+        return wrapper
+
+class StackSampler(threading.Thread):
+    """주기적으로 요청에 등록된 스레드의 스택만 읽어 run_in_profile 아래 구간을 기록"""
+
+    def __init__(self, profile: RequestProfile, interval: float):
+        super().__init__(name=f"profiler-{profile.profile_id}", daemon=True)
+        self.profile = profile
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            roots = self.profile.thread_roots()
+            if not roots:
+                continue
+            frames = sys._current_frames()
+            for thread_id, root_frame in roots:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.profile.add_stack(frame, root_frame)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+@contextmanager
+def torch_profile(model: str) -> Iterator[None]:
+    """프로파일링 중인 요청이면 with 블록의 torch 연산별 CPU 시간을 기록 (아니면 아무것도 하지 않음)"""
+    profile = _current_profile.get()
+    if profile is None or not _torch_lock.acquire(blocking=False):
+        yield
+        return
+
+    try:
+        from torch.profiler import ProfilerActivity, profile as profile_torch, record_function
+        with profile_torch(activities=[ProfilerActivity.CPU]) as torch_profiler:
+            with record_function(f"{model}.inference"):
+                yield
+        profile.add_torch_ops(model, torch_profiler.key_averages())
+    finally:
+        _torch_lock.release()
+
+def load_profile(profile_id: str, kind: str = "json") -> Optional[str]:
+    """저장된 프로파일 파일 내용 (kind: json 또는 folded)"""
+    if not PROFILE_ID_PATTERN.match(profile_id) or kind not in ("json", "folded"):
+        return None
+    path = Path(settings.PROFILE_DIR) / f"{profile_id}.{kind}"
+    return path.read_text(encoding="utf-8") if path.exists() else None
+
+def list_profiles(limit: int = 50) -> List[Dict]:
+    """최근 프로파일 요약 (최신순)"""
+    root = Path(settings.PROFILE_DIR)
+    if not root.exists():
+        return []
+    summaries = []
+    for path in sorted(root.glob("*.json"), reverse=True)[:limit]:
+        try:
+            summary = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"[Error] 프로파일 요약 로드 실패 ({path}): {e}")
+            continue
+        summary.pop("torch_ops", None)
+        summaries.append(summary)
+    return summaries
+
+class ProfilingMiddleware:
+    """관리자가 요청한 호출을 프로파일링하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        sampler = StackSampler(profile, settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.profile_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            profile.duration = time.perf_counter() - started
+            _current_profile.reset(token)
+            try:
+                profile.save(settings.PROFILE_DIR)
+            except Exception as e:
+                print(f"[Error] 프로파일 저장 실패 ({profile.profile_id}): {e}")
+
+    @staticmethod
+    def _requested(scope) -> bool:
+        """프로파일링 요청 여부 (X-Profile 헤더 또는 profile 쿼리 + 관리자 토큰)"""
+        requested = False
+        admin_token = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                requested = value not in (b"", b"0", b"false")
+            elif name == b"x-admin-token":
+                admin_token = value.decode("latin-1")
+
+        query_string = scope.get("query_string", b"")
+        if not requested and b"profile=" in query_string:
+            values = parse_qs(query_string.decode("latin-1")).get("profile", [])
+            requested = any(value not in ("", "0", "false") for value in values)
+
+        return requested and is_admin_token(admin_token)
@@ -0,0 +1,36 @@
+"""
+목록 응답 고속 경로 - SQL 결과로 바로 만든 dict 행을 orjson으로 직렬화
+
+response_model 검증/재직렬화를 거치지 않도록 라우트는 ORJSONResponse를 직접 반환합니다.
+TRUST_INTERNAL_ROWS=false면 행마다 스키마 검증을 한 번 거친 뒤 직렬화합니다.
+"""
+from typing import Any, Dict, List, Sequence, Type
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.config import settings
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _default(value: Any) -> Any:
+    """orjson이 직접 처리하지 못하는 값 (Pydantic 모델 등)"""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    return jsonable_encoder(value)
+
+def dumps(content: Any) -> bytes:
+    """UTF-8 JSON 직렬화 (한글 이스케이프 없음)"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+class ORJSONResponse(JSONResponse):
+    """orjson 직렬화 JSON 응답"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def trusted_rows(rows: Sequence[Dict[str, Any]], model: Type[BaseModel]) -> List[Dict[str, Any]]:
+    """내부 데이터로 만든 응답 행 (TRUST_INTERNAL_ROWS=false면 스키마 검증 후 반환)"""
+    if settings.TRUST_INTERNAL_ROWS:
+        return list(rows)
+    return [model.model_validate(row).model_dump() for row in rows]
@@ -0,0 +1,105 @@
+"""
+채널 전문 검색 인덱스 - SQLite FTS5 (trigram 토크나이저) + 동기화 트리거
+
+channel_fts의 rowid는 influencer의 rowid와 같고, 채널 제목/설명/카테고리와
+해당 채널 영상 제목 전체를 색인합니다. influencer/video 변경 시 트리거가 해당 채널 행을 다시 씁니다.
+(influencer는 INTEGER PRIMARY KEY가 없어 VACUUM 시 rowid가 바뀔 수 있으므로 VACUUM 후에는 재구축)
+
+trigram은 3글자 미만 검색어에 색인을 쓰지 못하므로(뷰티, 요리, 게임 등) 같은 내용을 단어 단위(unicode61)로
+색인하고 2글자 접두어 색인을 둔 channel_words를 함께 유지합니다. 본문은 channel_fts에만 저장하고
+channel_words는 contentless이므로, 행을 지울 때는 channel_fts에 남아 있는 이전 값으로 'delete' 명령을 보냅니다.
+"""
+from sqlalchemy.engine import Engine
+
+# 한 채널의 색인 행을 다시 쓰는 SQL (:channel_id 자리에 트리거의 NEW/OLD 컬럼 사용)
+_REFRESH_CHANNEL = """
+    INSERT INTO channel_words(channel_words, rowid, title, description, category, video_titles)
+    SELECT 'delete', rowid, title, description, category, video_titles FROM channel_fts
+    WHERE rowid = (SELECT rowid FROM influencer WHERE channel_id = {channel_id});
+    DELETE FROM channel_fts WHERE rowid = (SELECT rowid FROM influencer WHERE channel_id = {channel_id});
+    INSERT INTO channel_fts(rowid, title, description, category, video_titles)
+    SELECT i.rowid, i.title, i.description, i.category,
+           (SELECT group_concat(v.video_title, ' ') FROM video v WHERE v.channel_id = i.channel_id)
+    FROM influencer i WHERE i.channel_id = {channel_id};
+    INSERT INTO channel_words(rowid, title, description, category, video_titles)
+    SELECT rowid, title, description, category, video_titles FROM channel_fts
+    WHERE rowid = (SELECT rowid FROM influencer WHERE channel_id = {channel_id});
+"""
+
+# 트리거 이름 -> (조건, 본문): 본문이 바뀌어도 기존 DB에 반영되도록 매번 다시 만듦
+_TRIGGERS = {
+    "influencer_fts_insert": ("AFTER INSERT ON influencer", _REFRESH_CHANNEL.format(channel_id="NEW.channel_id")),
+    "influencer_fts_update": (
+        "AFTER UPDATE OF title, description, category ON influencer",
+        _REFRESH_CHANNEL.format(channel_id="NEW.channel_id")
+    ),
+    "influencer_fts_delete": ("AFTER DELETE ON influencer", """
+        INSERT INTO channel_words(channel_words, rowid, title, description, category, video_titles)
+        SELECT 'delete', rowid, title, description, category, video_titles FROM channel_fts WHERE rowid = OLD.rowid;
+        DELETE FROM channel_fts WHERE rowid = OLD.rowid;
+    """),
+    "video_fts_insert": ("AFTER INSERT ON video", _REFRESH_CHANNEL.format(channel_id="NEW.channel_id")),
+    "video_fts_update": (
+        "AFTER UPDATE OF video_title, channel_id ON video",
+        _REFRESH_CHANNEL.format(channel_id="OLD.channel_id") + _REFRESH_CHANNEL.format(channel_id="NEW.channel_id")
+    ),
+    "video_fts_delete": ("AFTER DELETE ON video", _REFRESH_CHANNEL.format(channel_id="OLD.channel_id")),
+}
+
+SEARCH_INDEX_DDL = [
+    # 한국어는 공백 단위 토큰화가 맞지 않으므로 부분 문자열 검색이 되는 trigram 사용
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS channel_fts USING fts5(
+        title, description, category, video_titles,
+        tokenize = 'trigram'
+    )
+    """,
+    # 3글자 미만 검색어용 단어 색인: 단어 접두어(2글자 이상)로 검색
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS channel_words USING fts5(
+        title, description, category, video_titles,
+        content = '', tokenize = 'unicode61', prefix = '2', detail = 'column'
+    )
+    """,
+    *(
+        statement
+        for name, (event, body) in _TRIGGERS.items()
+        for statement in (
+            f"DROP TRIGGER IF EXISTS {name}",
+            f"CREATE TRIGGER {name} {event} BEGIN {body} END",
+        )
+    ),
+]
+
+REBUILD_SEARCH_INDEX = [
+    "DELETE FROM channel_fts",
+    """
+    INSERT INTO channel_fts(rowid, title, description, category, video_titles)
+    SELECT i.rowid, i.title, i.description, i.category,
+           (SELECT group_concat(v.video_title, ' ') FROM video v WHERE v.channel_id = i.channel_id)
+    FROM influencer i
+    """,
+    "INSERT INTO channel_words(channel_words) VALUES('delete-all')",
+    """
+    INSERT INTO channel_words(rowid, title, description, category, video_titles)
+    SELECT rowid, title, description, category, video_titles FROM channel_fts
+    """,
+]
+
+def create_search_index(engine: Engine) -> None:
+    """FTS5 테이블/트리거 생성 (색인이 채널 수와 다르거나 단어 색인이 새로 생기면 전체 색인)"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as connection:
+        words_missing = connection.exec_driver_sql(
+            "SELECT count(*) FROM sqlite_master WHERE name = 'channel_words'"
+        ).scalar() == 0
+        for statement in SEARCH_INDEX_DDL:
+            connection.exec_driver_sql(statement)
+
+        indexed = connection.exec_driver_sql("SELECT count(*) FROM channel_fts").scalar()
+        channels = connection.exec_driver_sql("SELECT count(*) FROM influencer").scalar()
+        if indexed != channels or words_missing:
+            for statement in REBUILD_SEARCH_INDEX:
+                connection.exec_driver_sql(statement)
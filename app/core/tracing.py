@@ -0,0 +1,421 @@
+"""
+요청 단위 트레이싱 - ContextVar로 전파되는 span을 라우트/서비스/ML/YouTube 호출/DB 쿼리에 기록
+
+외부 SDK 없이 프로세스 안에서 span을 모으고, 트레이스(루트 span)가 끝나면
+- TRACE_SLOW_MS 이상 걸린 트레이스는 최근 TRACE_BUFFER_SIZE개를 링 버퍼에 보관 (/api/debug/traces)
+- TRACE_EXPORT가 jsonl이면 TRACE_EXPORT_PATH에 span을 한 줄씩, otlp면 TRACE_OTLP_ENDPOINT로 OTLP/HTTP JSON 전송
+내보내기는 백그라운드 스레드가 모아서 처리하므로 요청 경로에서는 큐에 넣기만 합니다.
+
+진행 중인 트레이스가 없으면 span/traced는 아무것도 기록하지 않으므로,
+트레이스는 HTTP 요청(TracingMiddleware)과 분석 작업 청크(trace_root)에서만 시작됩니다.
+"""
+import functools
+import json
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from app.config import settings
+
+# OTLP span 종류
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+STATEMENT_MAX_LENGTH = 300
+EXPORT_BATCH_SIZE = 512
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class Trace:
+    """한 트레이스에 속한 span 목록 (여러 스레드에서 추가될 수 있음)"""
+
+    def __init__(self, trace_id: Optional[str] = None, remote_parent_id: Optional[str] = None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.remote_parent_id = remote_parent_id
+        self.spans: List["Span"] = []
+        self.dropped = 0
+        self.root: Optional["Span"] = None
+        self._lock = threading.Lock()
+
+    def add(self, span: "Span") -> bool:
+        with self._lock:
+            if len(self.spans) >= settings.TRACE_MAX_SPANS:
+                self.dropped += 1
+                return False
+            self.spans.append(span)
+            return True
+
+    def snapshot(self) -> List["Span"]:
+        with self._lock:
+            return list(self.spans)
+
+class Span:
+    """시작/종료 시각과 속성을 가진 작업 구간"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], kind: int, attributes: Dict):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        if self is self.trace.root:
+            recorder.record(self.trace)
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": datetime.fromtimestamp(self.start_ns / 1e9, timezone.utc).isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def start_span(name: str, kind: int = KIND_INTERNAL, **attributes) -> Optional[Span]:
+    """현재 span의 자식 span 생성 (현재 span으로 설정하지 않음, 트레이스가 없으면 None)
+
+    DB 커서 이벤트나 httpx 이벤트 훅처럼 시작/종료가 다른 콜백에서 일어나는 구간에 사용합니다.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    span = Span(parent.trace, name, parent.span_id, kind, attributes)
+    return span if parent.trace.add(span) else None
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes) -> Iterator[Optional[Span]]:
+    """with 블록을 현재 span의 자식 span으로 기록 (트레이스가 없으면 None을 넘기고 그대로 실행)"""
+    child = start_span(name, kind, **attributes)
+    if child is None:
+        yield None
+        return
+
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.end(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+@contextmanager
+def trace_root(
+    name: str,
+    kind: int = KIND_INTERNAL,
+    traceparent: Optional[str] = None,
+    **attributes
+) -> Iterator[Optional[Span]]:
+    """새 트레이스를 시작하고 with 블록을 루트 span으로 기록 (TRACING_ENABLED=false면 None)"""
+    if not settings.TRACING_ENABLED:
+        yield None
+        return
+
+    trace_id, remote_parent_id = parse_traceparent(traceparent)
+    trace = Trace(trace_id, remote_parent_id)
+    root = trace.root = Span(trace, name, remote_parent_id, kind, attributes)
+    trace.add(root)
+
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.end(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        root.end()
+
+def traced(name: Optional[str] = None):
+    """함수 호출을 span으로 기록하는 데코레이터 (기본 이름: 모듈.함수)"""
+    def decorator(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def parse_traceparent(value: Optional[str]):
+    """W3C traceparent 헤더 -> (trace_id, parent span_id), 형식이 맞지 않으면 (None, None)"""
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None, None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None, None
+    return parts[1].lower(), parts[2].lower()
+
+class TraceRecorder:
+    """끝난 트레이스 처리 - 느린 트레이스 링 버퍼 + 백그라운드 내보내기"""
+
+    def __init__(self):
+        self._slow: deque = deque(maxlen=max(1, settings.TRACE_BUFFER_SIZE))
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[List[Span]]" = queue.Queue(maxsize=1000)
+        self._exporter: Optional[threading.Thread] = None
+
+    def record(self, trace: Trace) -> None:
+        slow = trace.root.duration_ms >= settings.TRACE_SLOW_MS
+        if slow:
+            with self._lock:
+                self._slow.append(trace)
+
+        if settings.TRACE_EXPORT and (slow or self._sampled(trace.trace_id)):
+            self._ensure_exporter()
+            try:
+                self._queue.put_nowait(trace.snapshot())
+            except queue.Full:
+                print(f"[Error] 트레이스 내보내기 큐가 가득 차 버림: {trace.trace_id}")
+
+    @staticmethod
+    def _sampled(trace_id: str) -> bool:
+        # trace_id 기준으로 결정하므로 같은 트레이스를 이어받은 다른 서비스와 결과가 같음
+        return int(trace_id[:8], 16) / 0xFFFFFFFF < settings.TRACE_EXPORT_SAMPLE_RATE
+
+    def slow_traces(self) -> List[Dict]:
+        """보관 중인 느린 트레이스 요약 (최신순)"""
+        with self._lock:
+            traces = list(self._slow)
+        return [
+            {
+                "trace_id": trace.trace_id,
+                "name": trace.root.name,
+                "start": datetime.fromtimestamp(trace.root.start_ns / 1e9, timezone.utc).isoformat(),
+                "duration_ms": round(trace.root.duration_ms, 3),
+                "span_count": len(trace.spans),
+                "dropped_spans": trace.dropped,
+                "error": trace.root.error
+            }
+            for trace in reversed(traces)
+        ]
+
+    def get(self, trace_id: str) -> Optional[Dict]:
+        """보관 중인 트레이스의 span 목록 (부모 아래 자식이 시작 순으로 오는 트리 순서, 깊이/시작 오프셋/자체 시간 포함)"""
+        with self._lock:
+            trace = next((trace for trace in self._slow if trace.trace_id == trace_id), None)
+        if trace is None:
+            return None
+
+        spans = sorted(trace.snapshot(), key=lambda span: span.start_ns)
+        by_id = {span.span_id: span for span in spans}
+        children: Dict[Optional[str], List[Span]] = {}
+        for span in spans:
+            children.setdefault(span.parent_id if span.parent_id in by_id else None, []).append(span)
+
+        # 병렬로 실행된 자식(채널 비교 등)이 섞이지 않도록 깊이 우선으로 나열
+        ordered = []
+        stack = [(span, 0) for span in reversed(children.get(None, []))]
+        while stack:
+            span, depth = stack.pop()
+            ordered.append((span, depth))
+            stack.extend((child, depth + 1) for child in reversed(children.get(span.span_id, [])))
+
+        root_start = trace.root.start_ns
+        return {
+            "trace_id": trace.trace_id,
+            "duration_ms": round(trace.root.duration_ms, 3),
+            "dropped_spans": trace.dropped,
+            "spans": [
+                {
+                    **span.to_dict(),
+                    "depth": depth,
+                    "offset_ms": round((span.start_ns - root_start) / 1e6, 3),
+                    # 병렬로 실행된 자식이 있으면 합이 구간보다 길 수 있으므로 0 아래는 자름
+                    "self_ms": round(max(0.0, span.duration_ms - sum(
+                        child.duration_ms for child in children.get(span.span_id, [])
+                    )), 3)
+                }
+                for span, depth in ordered
+            ]
+        }
+
+    def _ensure_exporter(self) -> None:
+        if self._exporter is not None:
+            return
+        with self._lock:
+            if self._exporter is None:
+                self._exporter = threading.Thread(target=self._export_loop, name="trace-exporter", daemon=True)
+                self._exporter.start()
+
+    def _export_loop(self) -> None:
+        while True:
+            batch = self._queue.get()
+            while len(batch) < EXPORT_BATCH_SIZE:
+                try:
+                    batch.extend(self._queue.get(timeout=0.5))
+                except queue.Empty:
+                    break
+            try:
+                if settings.TRACE_EXPORT == "otlp":
+                    export_otlp(batch)
+                else:
+                    export_jsonl(batch)
+            except Exception as e:
+                print(f"[Error] 트레이스 내보내기 실패 ({settings.TRACE_EXPORT}): {e}")
+
+def export_jsonl(spans: List[Span]) -> None:
+    path = Path(settings.TRACE_EXPORT_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        for span in spans:
+            f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_span(span: Span) -> Dict:
+    payload = {
+        "traceId": span.trace.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns or time.time_ns()),
+        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+    }
+    if span.parent_id:
+        payload["parentSpanId"] = span.parent_id
+    return payload
+
+def export_otlp(spans: List[Span]) -> None:
+    """OTLP/HTTP JSON 인코딩으로 collector에 전송"""
+    import httpx
+
+    body = {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": settings.PROJECT_NAME}},
+                {"key": "service.version", "value": {"stringValue": settings.VERSION}}
+            ]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [_otlp_span(span) for span in spans]}]
+        }]
+    }
+    response = httpx.post(settings.TRACE_OTLP_ENDPOINT, json=body, timeout=5)
+    response.raise_for_status()
+
+recorder = TraceRecorder()
+
+def trace_engine(engine) -> None:
+    """SQLAlchemy 커서 실행마다 현재 트레이스에 db.<문장 종류> span 추가"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        query_span = start_span(
+            f"db.{operation.lower()}",
+            KIND_CLIENT,
+            **{"db.system": engine.dialect.name, "db.statement": statement[:STATEMENT_MAX_LENGTH]}
+        )
+        if query_span is not None and executemany:
+            query_span.set_attribute("db.executemany", True)
+        conn.info.setdefault("trace_spans", []).append(query_span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        query_span = conn.info["trace_spans"].pop()
+        if query_span is not None:
+            query_span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        spans = context.connection.info.get("trace_spans") if context.connection is not None else None
+        if spans:
+            query_span = spans.pop()
+            if query_span is not None:
+                query_span.end(context.original_exception)
+
+class TracingMiddleware:
+    """HTTP 요청마다 루트 span을 만들고 X-Trace-Id 헤더로 트레이스 id를 알려 주는 ASGI 미들웨어
+
+    루트 span 이름은 라우팅이 끝난 뒤 "GET /api/youtuber/{channel_id}" 형태의 라우트 템플릿으로 정합니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from app.core.metrics import route_template
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        with trace_root(
+            scope["method"], KIND_SERVER, traceparent,
+            **{"http.method": scope["method"], "http.target": scope["path"]}
+        ) as root:
+            if root is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.status_code", message["status"])
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-trace-id", root.trace.trace_id.encode("latin-1"))
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                root.name = f"{scope['method']} {route}"
+                root.set_attribute("http.route", route)
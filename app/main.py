@@ -1,7 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.config import settings
 from app.core import create_db_and_tables
+from app.core.body_limit import BodyLimitMiddleware
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware
 from app.api import api_router
 
 def create_application() -> FastAPI:
@@ -23,6 +28,21 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # 요청 본문 크기 제한 (multipart 파싱/임시 파일 저장 전에 수신 단계에서 차단)
+    app.add_middleware(BodyLimitMiddleware, max_bytes=settings.REQUEST_BODY_MAX_BYTES)
+
+    # 요청별 트레이싱 (span 수집, 느린 트레이스 보관/내보내기)
+    if settings.TRACING_ENABLED:
+        app.add_middleware(TracingMiddleware)
+
+    # 관리자 요청 프로파일링 (ADMIN_TOKEN이 설정된 경우만)
+    if settings.ADMIN_TOKEN:
+        app.add_middleware(ProfilingMiddleware)
+
+    # 요청 처리 시간 지표 (가장 바깥에서 측정)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
     # 이벤트 핸들러
     @app.on_event("startup")
     async def startup_event():
@@ -45,6 +65,12 @@ def create_application() -> FastAPI:
             }
         }
 
+    # 지표 (Prometheus 텍스트 노출 형식)
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", include_in_schema=False)
+        def metrics():
+            return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
     # API 라우터 등록
     app.include_router(api_router, prefix=settings.API_V1_STR)
 
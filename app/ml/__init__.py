@@ -1,31 +1,51 @@
 from .model_manager import model_manager
+from .image_store import image_store
 from .clip_analyzer import (
     load_image_from_url,
     load_image_from_base64,
+    encode_images,
     calculate_image_similarity,
     calculate_text_image_similarity
 )
 from .sentiment_analyzer import (
     analyze_sentiment_kobert,
     analyze_sentiment_dictionary,
-    calculate_sentiment_score
+    predict_sentiment_kobert,
+    predict_sentiment_dictionary,
+    calculate_sentiment_score,
+    calculate_sentiment_score_stream,
+    tokenize_comments,
+    SentimentAccumulator
 )
 from .embeddings import (
     calculate_text_similarity,
     calculate_brand_channel_compatibility,
+    build_brand_text,
+    build_channel_text,
+    encode_texts,
     extract_keywords
 )
 
 __all__ = [
     "model_manager",
+    "image_store",
     "load_image_from_url",
     "load_image_from_base64", 
+    "encode_images",
     "calculate_image_similarity",
     "calculate_text_image_similarity",
     "analyze_sentiment_kobert",
     "analyze_sentiment_dictionary",
+    "predict_sentiment_kobert",
+    "predict_sentiment_dictionary",
     "calculate_sentiment_score",
+    "calculate_sentiment_score_stream",
+    "tokenize_comments",
+    "SentimentAccumulator",
     "calculate_text_similarity",
     "calculate_brand_channel_compatibility",
+    "build_brand_text",
+    "build_channel_text",
+    "encode_texts",
     "extract_keywords"
 ]
@@ -0,0 +1,291 @@
+"""
+채널 임베딩 근사 최근접 이웃(ANN) 인덱스 - NumPy IVF (선택적으로 FAISS HNSW 검색)
+
+디스크 구조 (<root>/<name>/):
+    CURRENT            : 현재 세대 디렉토리 이름 (원자적 교체)
+    gen-<n>/meta.json  : channel_id 목록, 모델 버전 등
+    gen-<n>/*.npy      : 벡터/생존 마스크/IVF 할당/중심점 (mmap으로 로드)
+
+저장할 때마다 새 세대를 쓰고 CURRENT를 교체하므로, 크롤러가 인덱스를 갱신하는 동안에도
+API 프로세스는 이전 세대를 읽다가 다음 검색 때 새 세대로 넘어갑니다.
+"""
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.config import settings
+
+class VectorIndex:
+    """L2 정규화된 벡터의 내적(코사인) 검색 인덱스
+
+    벡터 수가 ANN_IVF_MIN_SIZE 미만이면 전수 검색, 이상이면 spherical k-means로
+    IVF 리스트를 학습해 ANN_NPROBE개 리스트만 검색합니다.
+    """
+
+    def __init__(self, root: str, name: str, backend: Optional[str] = None):
+        self.path = Path(root) / name
+        self.backend = backend or settings.ANN_BACKEND
+        self.meta: Dict = {}
+        self._lock = threading.RLock()
+        self._generation: Optional[str] = None
+        self._mutable = False
+        self._dirty = False
+        self._faiss = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._assignments: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_size = 0
+        self._faiss = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._alive.sum())
+
+    # ----- 영속화 -----
+
+    def refresh(self) -> None:
+        """다른 프로세스(크롤러)가 새 세대를 저장했으면 다시 로드 (저장 전 변경분이 있으면 유지)"""
+        if self._dirty:
+            return
+        current = self.path / "CURRENT"
+        try:
+            generation = current.read_text().strip()
+        except FileNotFoundError:
+            return
+        if generation != self._generation:
+            with self._lock:
+                self._load(generation)
+
+    def _load(self, generation: str) -> None:
+        directory = self.path / generation
+        with open(directory / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self._reset()
+        self.meta = meta.get("meta", {})
+        self._ids = meta["ids"]
+        self._rows = {channel_id: row for row, channel_id in enumerate(self._ids)}
+        self._trained_size = meta.get("trained_size", 0)
+        if self._ids:
+            self._vectors = np.load(directory / "vectors.npy", mmap_mode="r")
+            self._alive = np.load(directory / "alive.npy")
+            if (directory / "centroids.npy").exists():
+                self._centroids = np.load(directory / "centroids.npy")
+                self._assignments = np.load(directory / "assignments.npy")
+        self._generation = generation
+        self._mutable = False
+
+    def save(self) -> None:
+        """새 세대 디렉토리에 저장 후 CURRENT 교체 (필요 시 압축/재학습)"""
+        with self._lock:
+            self._maybe_rebuild()
+
+            existing = [int(path.name.split("-")[1]) for path in self.path.glob("gen-*")]
+            generation = f"gen-{max(existing, default=0) + 1}"
+            directory = self.path / generation
+            directory.mkdir(parents=True)
+
+            if self._ids:
+                np.save(directory / "vectors.npy", np.ascontiguousarray(self._vectors, dtype=np.float32))
+                np.save(directory / "alive.npy", self._alive)
+                if self._centroids is not None:
+                    np.save(directory / "centroids.npy", self._centroids)
+                    np.save(directory / "assignments.npy", self._assignments)
+            with open(directory / "meta.json", "w", encoding="utf-8") as f:
+                json.dump({"ids": self._ids, "meta": self.meta, "trained_size": self._trained_size}, f)
+
+            tmp_current = self.path / f".CURRENT.{os.getpid()}.tmp"
+            tmp_current.write_text(generation)
+            os.replace(tmp_current, self.path / "CURRENT")
+
+            previous = self._generation
+            self._generation = generation
+            self._dirty = False
+            # 직전 세대는 읽는 중인 프로세스가 있을 수 있으므로 남겨두고 그 이전 세대만 정리
+            for old in self.path.glob("gen-*"):
+                if old.name not in (generation, previous):
+                    shutil.rmtree(old, ignore_errors=True)
+
+    # ----- 변경 -----
+
+    def clear(self, meta: Optional[Dict] = None) -> None:
+        """전체 초기화 (모델 버전 변경 시 재구축용)"""
+        with self._lock:
+            self._reset()
+            self.meta = dict(meta or {})
+            self._mutable = True
+            self._dirty = True
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """벡터 추가 (이미 있는 channel_id는 덮어씀)"""
+        if len(ids) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._ensure_mutable()
+            if self._vectors is None:
+                self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+
+            new_ids = []
+            new_vectors = []
+            for channel_id, vector in zip(ids, vectors):
+                row = self._rows.get(channel_id)
+                if row is None:
+                    new_ids.append(channel_id)
+                    new_vectors.append(vector)
+                else:
+                    self._vectors[row] = vector
+                    self._alive[row] = True
+                    if self._centroids is not None:
+                        self._assignments[row] = self._assign(vector[None, :])[0]
+
+            if new_ids:
+                start = len(self._ids)
+                stacked = np.stack(new_vectors)
+                self._vectors = np.vstack([self._vectors, stacked])
+                self._alive = np.concatenate([self._alive, np.ones(len(new_ids), dtype=bool)])
+                if self._centroids is not None:
+                    self._assignments = np.concatenate([self._assignments, self._assign(stacked)])
+                for offset, channel_id in enumerate(new_ids):
+                    self._rows[channel_id] = start + offset
+                self._ids.extend(new_ids)
+            self._faiss = None
+            self._dirty = True
+
+    def remove(self, ids: Sequence[str]) -> None:
+        """벡터 삭제 (저장 시 압축)"""
+        with self._lock:
+            rows = [self._rows[channel_id] for channel_id in ids if channel_id in self._rows]
+            if not rows:
+                return
+            self._ensure_mutable()
+            self._alive[rows] = False
+            self._faiss = None
+            self._dirty = True
+
+    def _ensure_mutable(self) -> None:
+        """mmap(읽기 전용)으로 로드된 배열을 메모리로 복사"""
+        if not self._mutable:
+            if self._vectors is not None:
+                self._vectors = np.array(self._vectors, dtype=np.float32)
+            self._alive = np.array(self._alive, dtype=bool)
+            if self._assignments is not None:
+                self._assignments = np.array(self._assignments)
+            self._mutable = True
+
+    def _maybe_rebuild(self) -> None:
+        """삭제된 행이 많으면 압축, 학습 이후 크기가 두 배 이상 늘면 IVF 재학습"""
+        if not self._ids:
+            return
+        alive_count = int(self._alive.sum())
+        if alive_count < len(self._ids) * 0.7:
+            self._ensure_mutable()
+            keep = np.flatnonzero(self._alive)
+            self._ids = [self._ids[row] for row in keep]
+            self._rows = {channel_id: row for row, channel_id in enumerate(self._ids)}
+            self._vectors = self._vectors[keep]
+            self._alive = np.ones(len(keep), dtype=bool)
+            if self._assignments is not None:
+                self._assignments = self._assignments[keep]
+
+        if alive_count < settings.ANN_IVF_MIN_SIZE:
+            self._centroids = None
+            self._assignments = None
+            self._trained_size = 0
+        elif self._centroids is None or alive_count >= self._trained_size * 2:
+            self._train()
+
+    def _train(self, iterations: int = 10) -> None:
+        """spherical k-means로 IVF 중심점 학습"""
+        self._ensure_mutable()
+        vectors = self._vectors[self._alive]
+        nlist = settings.ANN_NLIST or int(np.sqrt(len(vectors)))
+        nlist = max(1, min(nlist, len(vectors)))
+
+        rng = np.random.default_rng(0)
+        # 학습은 최대 nlist * 256개 표본으로 수행
+        sample_size = min(len(vectors), nlist * 256)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = sample[labels == cluster]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[cluster] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+        self._centroids = centroids.astype(np.float32)
+        self._assignments = self._assign(self._vectors)
+        self._trained_size = len(vectors)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    # ----- 조회 -----
+
+    def get_vectors(self, ids: Sequence[str]) -> Dict[str, np.ndarray]:
+        """channel_id별 저장된 벡터 (없으면 제외)"""
+        with self._lock:
+            result = {}
+            for channel_id in ids:
+                row = self._rows.get(channel_id)
+                if row is not None and self._alive[row]:
+                    result[channel_id] = np.asarray(self._vectors[row])
+            return result
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """내적 기준 상위 k개 (channel_id, 유사도)"""
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            if self._vectors is None or not self._alive.any():
+                return []
+            if self.backend == "faiss":
+                result = self._search_faiss(query, k)
+                if result is not None:
+                    return result
+
+            candidates = np.flatnonzero(self._alive)
+            if self._centroids is not None:
+                nprobe = min(settings.ANN_NPROBE, len(self._centroids))
+                probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+                probed = np.flatnonzero(self._alive & np.isin(self._assignments, probe))
+                if len(probed) >= k:
+                    candidates = probed
+
+            scores = np.asarray(self._vectors[candidates]) @ query
+            top = min(k, len(candidates))
+            order = np.argpartition(-scores, top - 1)[:top]
+            order = order[np.argsort(-scores[order])]
+            return [(self._ids[candidates[i]], float(scores[i])) for i in order]
+
+    def _search_faiss(self, query: np.ndarray, k: int) -> Optional[List[Tuple[str, float]]]:
+        """FAISS HNSW 검색 (faiss 미설치 시 None → NumPy 경로)"""
+        try:
+            import faiss
+        except ImportError:
+            print("[Error] faiss가 설치되지 않아 NumPy 인덱스로 검색합니다")
+            self.backend = "numpy"
+            return None
+
+        if self._faiss is None:
+            rows = np.flatnonzero(self._alive)
+            index = faiss.IndexHNSWFlat(self._vectors.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+            index.add(np.ascontiguousarray(self._vectors[rows], dtype=np.float32))
+            self._faiss = (index, rows)
+
+        index, rows = self._faiss
+        scores, positions = index.search(query[None, :], min(k, len(rows)))
+        return [
+            (self._ids[rows[position]], float(score))
+            for score, position in zip(scores[0], positions[0]) if position >= 0
+        ]
@@ -2,18 +2,39 @@
 CLIP 기반 이미지 유사도 분석
 """
 import torch
+import numpy as np
 from PIL import Image
 import requests
 from io import BytesIO
 import base64
 from typing import List, Optional
+from app.config import settings
+from app.core.metrics import MODEL_INFERENCE_DURATION, MODEL_INFERENCE_ITEMS, batch_size_label
+from app.core.profiling import torch_profile
+from app.core.tracing import traced
 from .model_manager import model_manager
+from .image_store import image_store
+
+@traced()
+def load_image_from_url(url: str, fetch_on_miss: Optional[bool] = None) -> Optional[Image.Image]:
+    """URL 이미지 로드 (로컬 이미지 저장소 우선)
+
+    저장소에 없으면 fetch_on_miss(기본값: IMAGE_FETCH_ON_MISS)일 때만 내려받아 저장합니다.
+    점수 계산 경로는 기본값을 사용하므로 HTTP 요청으로 막히지 않습니다.
+    """
+    image = image_store.get(url)
+    if image is not None:
+        return image
+
+    if fetch_on_miss is None:
+        fetch_on_miss = settings.IMAGE_FETCH_ON_MISS
+    if not fetch_on_miss:
+        return None
 
-def load_image_from_url(url: str) -> Optional[Image.Image]:
-    """URL에서 이미지 로드"""
     try:
         response = requests.get(url, timeout=10)
         response.raise_for_status()
+        image_store.put(url, response.content)
         image = Image.open(BytesIO(response.content)).convert("RGB")
         return image
     except Exception as e:
@@ -30,38 +51,45 @@ def load_image_from_base64(base64_str: str) -> Optional[Image.Image]:
         print(f"[Error] Base64 이미지 로드 실패: {e}")
         return None
 
+@traced()
+def encode_images(images: List[Image.Image]) -> np.ndarray:
+    """CLIP 이미지 임베딩 (배치 1회 추론, L2 정규화된 float32 행렬)"""
+    clip_model, clip_processor = model_manager.get_clip_model()
+    device = model_manager.device
+    
+    with MODEL_INFERENCE_DURATION.time(model="clip", batch_size=batch_size_label(len(images))), torch_profile("clip"):
+        inputs = clip_processor(images=images, return_tensors="pt").to(device)
+        with torch.no_grad():
+            features = clip_model.get_image_features(**inputs)
+            features = features / features.norm(dim=-1, keepdim=True)
+        features = features.cpu().numpy().astype(np.float32)
+    MODEL_INFERENCE_ITEMS.inc(len(images), model="clip")
+    return features
+
+@traced()
 def calculate_image_similarity(
-    brand_image: Image.Image,
-    channel_thumbnails: List[Image.Image]
+    brand_image: Optional[Image.Image],
+    channel_thumbnails: List[Image.Image],
+    brand_embedding: Optional[np.ndarray] = None
 ) -> float:
-    """CLIP 모델을 사용한 이미지 유사도 계산"""
+    """CLIP 모델을 사용한 이미지 유사도 계산
+
+    brand_embedding이 주어지면 브랜드 이미지를 다시 인코딩하지 않습니다.
+    """
     if not channel_thumbnails:
         return 50.0
     
     try:
-        clip_model, clip_processor = model_manager.get_clip_model()
-        device = model_manager.device
-        
         # 브랜드 이미지 임베딩
-        brand_inputs = clip_processor(images=brand_image, return_tensors="pt").to(device)
-        with torch.no_grad():
-            brand_features = clip_model.get_image_features(**brand_inputs)
-            brand_features = brand_features / brand_features.norm(dim=-1, keepdim=True)
+        if brand_embedding is None:
+            brand_embedding = encode_images([brand_image])[0]
         
-        # 채널 썸네일 임베딩 및 유사도 계산
-        similarities = []
-        for thumbnail in channel_thumbnails:
-            thumb_inputs = clip_processor(images=thumbnail, return_tensors="pt").to(device)
-            with torch.no_grad():
-                thumb_features = clip_model.get_image_features(**thumb_inputs)
-                thumb_features = thumb_features / thumb_features.norm(dim=-1, keepdim=True)
-                
-                # 코사인 유사도 계산
-                similarity = torch.cosine_similarity(brand_features, thumb_features).item()
-                similarities.append(similarity)
+        # 채널 썸네일 임베딩 및 코사인 유사도 계산 (정규화된 벡터의 내적)
+        thumbnail_embeddings = encode_images(channel_thumbnails)
+        similarities = thumbnail_embeddings @ brand_embedding
         
         # 평균 유사도를 0-100 스케일로 변환
-        avg_similarity = sum(similarities) / len(similarities)
+        avg_similarity = float(similarities.mean())
         return max(0, min(100, (avg_similarity + 1) * 50))
         
     except Exception as e:
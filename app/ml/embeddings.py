@@ -3,9 +3,30 @@
 """
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
-from typing import List
+from typing import List, Optional
+from app.core.metrics import MODEL_INFERENCE_DURATION, MODEL_INFERENCE_ITEMS, batch_size_label
+from app.core.profiling import torch_profile
+from app.core.tracing import traced
 from .model_manager import model_manager
 
+def build_brand_text(brand_description: str, brand_tone: str, brand_category: str) -> str:
+    """브랜드 정보 결합 (브랜드 측 임베딩 입력)"""
+    return f"{brand_description} {brand_tone} {brand_category}"
+
+def build_channel_text(channel_description: str, channel_titles: List[str]) -> str:
+    """채널 정보 결합 (설명 + 최근 영상 제목 10개, 채널 측 임베딩 입력)"""
+    return f"{channel_description} " + " ".join(channel_titles[:10])
+
+@traced()
+def encode_texts(texts: List[str]) -> np.ndarray:
+    """SBERT 텍스트 임베딩 (L2 정규화된 float32 행렬)"""
+    sbert_model = model_manager.get_sbert_model()
+    with MODEL_INFERENCE_DURATION.time(model="sbert", batch_size=batch_size_label(len(texts))), torch_profile("sbert"):
+        embeddings = np.asarray(sbert_model.encode(texts), dtype=np.float32)
+    MODEL_INFERENCE_ITEMS.inc(len(texts), model="sbert")
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
 def calculate_text_similarity(text1: str, text2: str) -> float:
     """두 텍스트 간의 유사도 계산"""
     try:
@@ -24,28 +45,32 @@ def calculate_text_similarity(text1: str, text2: str) -> float:
         print(f"[Error] 텍스트 유사도 계산 실패: {e}")
         return 50.0
 
+@traced()
 def calculate_brand_channel_compatibility(
     brand_description: str,
     brand_tone: str,
     brand_category: str,
     channel_description: str,
-    channel_titles: List[str]
+    channel_titles: List[str],
+    brand_embedding: Optional[np.ndarray] = None
 ) -> float:
-    """브랜드와 채널 간의 텍스트 기반 적합도 계산"""
+    """브랜드와 채널 간의 텍스트 기반 적합도 계산
+
+    brand_embedding(정규화된 브랜드 텍스트 임베딩)이 주어지면 채널 텍스트만 인코딩합니다.
+    """
     try:
-        sbert_model = model_manager.get_sbert_model()
-        
-        # 브랜드 정보 결합
-        brand_text = f"{brand_description} {brand_tone} {brand_category}"
-        
         # 채널 정보 결합
-        channel_text = f"{channel_description} " + " ".join(channel_titles[:10])
+        channel_text = build_channel_text(channel_description, channel_titles)
         
-        # 임베딩 생성
-        embeddings = sbert_model.encode([brand_text, channel_text])
+        # 임베딩 생성 (브랜드 측은 캐시된 임베딩 재사용)
+        if brand_embedding is None:
+            brand_text = build_brand_text(brand_description, brand_tone, brand_category)
+            brand_embedding, channel_embedding = encode_texts([brand_text, channel_text])
+        else:
+            channel_embedding = encode_texts([channel_text])[0]
         
-        # 유사도 계산
-        similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
+        # 코사인 유사도 계산 (정규화된 벡터의 내적)
+        similarity = float(np.dot(brand_embedding, channel_embedding))
         
         # 0-100 스케일로 변환
         return max(0, min(100, (similarity + 1) * 50))
@@ -0,0 +1,134 @@
+"""
+로컬 썸네일 이미지 저장소 - 콘텐츠 주소 기반 디스크 캐시 + 비동기 prefetch
+
+이미지는 CLIP 입력 크기(224x224)로 미리 리사이즈/크롭해 저장하므로
+점수 계산 경로는 HTTP 요청 없이 디스크에서 바로 읽습니다.
+"""
+import asyncio
+import hashlib
+import os
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from PIL import Image
+from app.config import settings
+
+CLIP_INPUT_SIZE = 224
+
+def preprocess_for_clip(image: Image.Image, size: int = CLIP_INPUT_SIZE) -> Image.Image:
+    """CLIP 전처리와 동일하게 짧은 변 기준 리사이즈 후 중앙 크롭"""
+    image = image.convert("RGB")
+    width, height = image.size
+    scale = size / min(width, height)
+    resized = image.resize(
+        (max(size, round(width * scale)), max(size, round(height * scale))),
+        Image.BICUBIC
+    )
+    left = (resized.width - size) // 2
+    top = (resized.height - size) // 2
+    return resized.crop((left, top, left + size, top + size))
+
+class ImageStore:
+    """콘텐츠 해시로 주소가 정해지는 디스크 이미지 저장소
+
+    objects/<hash[:2]>/<hash>.jpg : 전처리된 이미지 (동일 이미지는 한 번만 저장)
+    urls/<sha256(url)[:2]>/<sha256(url)> : URL → 콘텐츠 해시 매핑
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def get(self, url: str) -> Optional[Image.Image]:
+        """저장된 이미지 로드 (없으면 None, 네트워크 요청 없음)"""
+        path = self.path_for_url(url)
+        if path is None:
+            return None
+        try:
+            with Image.open(path) as image:
+                return image.convert("RGB")
+        except Exception as e:
+            print(f"[Error] 저장된 이미지 로드 실패 ({path}): {e}")
+            return None
+
+    def contains(self, url: str) -> bool:
+        return self.path_for_url(url) is not None
+
+    def path_for_url(self, url: str) -> Optional[Path]:
+        """URL에 매핑된 이미지 파일 경로"""
+        mapping = self._url_path(url)
+        if not mapping.exists():
+            return None
+        path = self._object_path(mapping.read_text().strip())
+        return path if path.exists() else None
+
+    def put(self, url: str, content: bytes) -> Optional[Path]:
+        """원본 이미지 바이트를 전처리해 저장하고 URL 매핑 기록"""
+        try:
+            with Image.open(BytesIO(content)) as image:
+                processed = preprocess_for_clip(image)
+        except Exception as e:
+            print(f"[Error] 이미지 디코딩 실패 ({url}): {e}")
+            return None
+
+        buffer = BytesIO()
+        processed.save(buffer, format="JPEG", quality=95)
+        data = buffer.getvalue()
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        path = self._object_path(content_hash)
+        if not path.exists():
+            self._atomic_write(path, data)
+        self._atomic_write(self._url_path(url), content_hash.encode("ascii"))
+        return path
+
+    async def prefetch(self, urls: Iterable[str], concurrency: Optional[int] = None) -> Dict[str, int]:
+        """저장되지 않은 URL을 커넥션 풀로 동시에 내려받아 저장"""
+        import httpx
+
+        concurrency = concurrency or settings.IMAGE_PREFETCH_CONCURRENCY
+        pending = [url for url in dict.fromkeys(urls) if url and not self.contains(url)]
+        stats = {"requested": len(pending), "stored": 0, "failed": 0}
+        if not pending:
+            return stats
+
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(limits=limits, timeout=10, follow_redirects=True) as client:
+            async def fetch(url: str):
+                async with semaphore:
+                    try:
+                        response = await client.get(url)
+                        response.raise_for_status()
+                    except Exception as e:
+                        print(f"[Error] 이미지 다운로드 실패 ({url}): {e}")
+                        stats["failed"] += 1
+                        return
+                # 디코딩/리사이즈는 이벤트 루프를 막지 않도록 스레드에서 처리
+                path = await asyncio.to_thread(self.put, url, response.content)
+                stats["stored" if path else "failed"] += 1
+
+            await asyncio.gather(*(fetch(url) for url in pending))
+
+        return stats
+
+    def prefetch_sync(self, urls: Iterable[str], concurrency: Optional[int] = None) -> Dict[str, int]:
+        """동기 코드(크롤러)에서 prefetch 실행"""
+        return asyncio.run(self.prefetch(urls, concurrency))
+
+    def _url_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / "urls" / key[:2] / key
+
+    def _object_path(self, content_hash: str) -> Path:
+        return self.root / "objects" / content_hash[:2] / f"{content_hash}.jpg"
+
+    def _atomic_write(self, path: Path, data: bytes) -> None:
+        """임시 파일에 쓴 뒤 rename (동시 쓰기/중단 시에도 깨진 파일이 남지 않음)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+# 전역 인스턴스
+image_store = ImageStore(settings.IMAGE_STORE_DIR)
@@ -1,10 +1,12 @@
 """
 AI 모델 관리자 - 싱글톤 패턴으로 모델 로딩 및 관리
 """
+import threading
 import torch
 from transformers import CLIPProcessor, CLIPModel
 from sentence_transformers import SentenceTransformer
 from app.config import settings
+from app.core.metrics import MODEL_LOAD_DURATION
 from typing import Optional
 
 class ModelManager:
@@ -25,52 +27,103 @@ class ModelManager:
             self._sbert_model = None
             self._kobert_tokenizer = None
             self._kobert_model = None
+            self._kobert_tokenizer_failed = False
             self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            # 병렬 추론 시 중복 로딩 방지 (모델별 잠금: 한 모델 로딩이 다른 모델 조회를 막지 않음)
+            self._clip_lock = threading.Lock()
+            self._sbert_lock = threading.Lock()
+            self._kobert_lock = threading.Lock()  # KoBERT 모델/토크나이저 공용
             self._initialized = True
     
     @property
     def device(self):
         return self._device
     
+    @property
+    def version(self) -> str:
+        """점수 캐시 키에 사용되는 모델 버전 문자열"""
+        return "|".join([
+            settings.CLIP_MODEL_NAME,
+            settings.SBERT_MODEL,
+            settings.KOBERT_MODEL,
+            settings.MODEL_REVISION
+        ])
+    
     def get_clip_model(self):
-        """CLIP 모델 lazy loading"""
+        """CLIP 모델 lazy loading (로드된 뒤에는 잠금 없이 반환)"""
         if self._clip_model is None:
-            print("[ModelManager] Loading CLIP model...")
-            self._clip_model = CLIPModel.from_pretrained(settings.CLIP_MODEL_NAME)
-            self._clip_processor = CLIPProcessor.from_pretrained(settings.CLIP_MODEL_NAME)
-            self._clip_model = self._clip_model.to(self._device)
-            self._clip_model.eval()
-            print(f"[ModelManager] CLIP model loaded on {self._device}")
+            with self._clip_lock:
+                if self._clip_model is None:
+                    print("[ModelManager] Loading CLIP model...")
+                    with MODEL_LOAD_DURATION.time(model="clip"):
+                        model = CLIPModel.from_pretrained(settings.CLIP_MODEL_NAME).to(self._device)
+                        self._clip_processor = CLIPProcessor.from_pretrained(settings.CLIP_MODEL_NAME)
+                    model.eval()
+                    # 완전히 준비된 뒤에 공개 (잠금 없는 조회가 로딩 중인 모델을 보지 않도록)
+                    self._clip_model = model
+                    print(f"[ModelManager] CLIP model loaded on {self._device}")
         return self._clip_model, self._clip_processor
     
     def get_sbert_model(self):
-        """Sentence-BERT 모델 lazy loading"""
+        """Sentence-BERT 모델 lazy loading (로드된 뒤에는 잠금 없이 반환)"""
         if self._sbert_model is None:
-            print("[ModelManager] Loading Sentence-BERT model...")
-            self._sbert_model = SentenceTransformer(settings.SBERT_MODEL)
-            print("[ModelManager] Sentence-BERT model loaded")
+            with self._sbert_lock:
+                if self._sbert_model is None:
+                    print("[ModelManager] Loading Sentence-BERT model...")
+                    with MODEL_LOAD_DURATION.time(model="sbert"):
+                        self._sbert_model = SentenceTransformer(settings.SBERT_MODEL)
+                    print("[ModelManager] Sentence-BERT model loaded")
         return self._sbert_model
     
     def get_kobert_model(self):
-        """KoBERT 모델 lazy loading"""
+        """KoBERT 모델 lazy loading (로드된 뒤에는 잠금 없이 반환)"""
         if self._kobert_model is None:
+            with self._kobert_lock:
+                if self._kobert_model is None:
+                    try:
+                        print("[ModelManager] Loading KoBERT model...")
+                        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+                        with MODEL_LOAD_DURATION.time(model="kobert"):
+                            if self._kobert_tokenizer is None:
+                                self._kobert_tokenizer = AutoTokenizer.from_pretrained(settings.KOBERT_MODEL, trust_remote_code=True)
+                            # device_map 파라미터로 직접 디바이스 지정 (meta tensor 문제 해결)
+                            model = AutoModelForSequenceClassification.from_pretrained(
+                                settings.KOBERT_MODEL, 
+                                trust_remote_code=True,
+                                device_map=str(self._device),
+                                torch_dtype=torch.float32  # 명시적으로 float32 사용
+                            )
+                        model.eval()
+                        self._kobert_model = model
+                        print(f"[ModelManager] KoBERT model loaded on {self._device}")
+                    except Exception as e:
+                        print(f"[ModelManager] KoBERT loading failed: {e}")
+                        return None, None
+        return self._kobert_model, self._kobert_tokenizer
+
+    def get_kobert_tokenizer(self):
+        """KoBERT 토크나이저만 lazy loading (댓글 수집 시 토큰화용, 모델 가중치는 읽지 않음)
+
+        로딩에 실패하면 다시 시도하지 않아 수집 중 매 배치마다 로딩을 반복하지 않습니다.
+        """
+        if self._kobert_tokenizer is None and not self._kobert_tokenizer_failed:
+            with self._kobert_lock:
+                if self._kobert_tokenizer is None and not self._kobert_tokenizer_failed:
+                    try:
+                        from transformers import AutoTokenizer
+                        self._kobert_tokenizer = AutoTokenizer.from_pretrained(settings.KOBERT_MODEL, trust_remote_code=True)
+                    except Exception as e:
+                        print(f"[ModelManager] KoBERT tokenizer loading failed: {e}")
+                        self._kobert_tokenizer_failed = True
+        return self._kobert_tokenizer
+
+    def warm_up(self):
+        """모든 모델을 미리 로드 (분석 워커 프로세스 시작 시 한 번 호출)"""
+        for loader in (self.get_clip_model, self.get_sbert_model, self.get_kobert_model):
             try:
-                print("[ModelManager] Loading KoBERT model...")
-                from transformers import AutoTokenizer, AutoModelForSequenceClassification
-                self._kobert_tokenizer = AutoTokenizer.from_pretrained(settings.KOBERT_MODEL, trust_remote_code=True)
-                # device_map 파라미터로 직접 디바이스 지정 (meta tensor 문제 해결)
-                self._kobert_model = AutoModelForSequenceClassification.from_pretrained(
-                    settings.KOBERT_MODEL, 
-                    trust_remote_code=True,
-                    device_map=str(self._device),
-                    torch_dtype=torch.float32  # 명시적으로 float32 사용
-                )
-                self._kobert_model.eval()
-                print(f"[ModelManager] KoBERT model loaded on {self._device}")
+                loader()
             except Exception as e:
-                print(f"[ModelManager] KoBERT loading failed: {e}")
-                return None, None
-        return self._kobert_model, self._kobert_tokenizer
+                print(f"[ModelManager] Warm-up failed ({loader.__name__}): {e}")
 
 # 전역 인스턴스
 model_manager = ModelManager()
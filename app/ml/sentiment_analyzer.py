@@ -1,12 +1,21 @@
 """
 감성 분석 모듈 - KoBERT 기반 + 사전 기반 fallback
 """
+import zlib
 import torch
-from typing import List, Dict, Tuple
-from collections import Counter
+import numpy as np
+from typing import Iterable, List, Dict, Optional, Sequence, Tuple
 import re
+from app.config import settings
+from app.core.metrics import MODEL_INFERENCE_DURATION, MODEL_INFERENCE_ITEMS, batch_size_label
+from app.core.profiling import torch_profile
+from app.core.tracing import traced
 from .model_manager import model_manager
 
+# 확률 행렬 열 순서
+SENTIMENT_CLASSES = ("negative", "neutral", "positive")
+NEGATIVE, NEUTRAL, POSITIVE = range(len(SENTIMENT_CLASSES))
+
 # 감성 사전 (fallback용)
 POSITIVE_WORDS = [
     "좋다", "최고", "대박", "완전", "진짜", "정말", "너무", "예쁘다", "멋지다", "훌륭하다",
@@ -18,115 +27,248 @@ NEGATIVE_WORDS = [
     "어렵다", "힘들다", "복잡", "불편", "아쉽다", "부족", "비싸다", "느리다", "답답"
 ]
 
-def analyze_sentiment_kobert(texts: List[str]) -> List[Dict]:
-    """KoBERT를 사용한 감성분석"""
+# 저장된 토큰 ID 헤더: magic + 토크나이저 태그(KOBERT_MODEL/KOBERT_MAX_LENGTH의 CRC32)
+TOKEN_IDS_MAGIC = b"KT"
+
+def _token_ids_header() -> bytes:
+    tag = zlib.crc32(f"{settings.KOBERT_MODEL}:{settings.KOBERT_MAX_LENGTH}".encode("utf-8"))
+    return TOKEN_IDS_MAGIC + tag.to_bytes(4, "little")
+
+def encode_token_ids(ids: Sequence[int]) -> bytes:
+    """토큰 ID 배열 -> 토크나이저 태그 + uint16 바이트 (KoBERT 어휘 8002개, 댓글당 최대 수백 바이트)"""
+    return _token_ids_header() + np.asarray(ids, dtype="<u2").tobytes()
+
+def decode_token_ids(data: Optional[bytes]) -> Optional[np.ndarray]:
+    """저장된 토큰 ID 복원 (다른 KOBERT_MODEL/KOBERT_MAX_LENGTH로 만들었거나 태그 없는 이전 형식이면 None)"""
+    header = _token_ids_header()
+    if not data or not data.startswith(header):
+        return None
+    return np.frombuffer(data, dtype="<u2", offset=len(header)).astype(np.int64)
+
+@traced()
+def tokenize_comments(texts: List[str]) -> List[Optional[bytes]]:
+    """댓글 수집 시 한 번 토큰화해 저장할 토큰 ID (특수 토큰 제외, KOBERT_MAX_LENGTH - 2개까지)
+
+    토크나이저를 쓸 수 없거나 어휘가 uint16 범위를 넘으면 None (추론 시 원문을 토큰화)
+    """
+    tokenizer = model_manager.get_kobert_tokenizer()
+    if tokenizer is None or not texts or len(tokenizer) > 65536:
+        return [None] * len(texts)
+    try:
+        encoded = tokenizer(
+            list(texts),
+            add_special_tokens=False,
+            truncation=True,
+            max_length=settings.KOBERT_MAX_LENGTH - 2
+        )["input_ids"]
+    except Exception as e:
+        print(f"[Error] 댓글 토큰화 실패: {e}")
+        return [None] * len(texts)
+    return [encode_token_ids(ids) for ids in encoded]
+
+def _build_batch(sequences: List[np.ndarray], tokenizer) -> Dict[str, torch.Tensor]:
+    """[CLS] ids [SEP] + 배치 내 최대 길이까지만 패딩 (동적 패딩)"""
+    length = max(len(ids) for ids in sequences) + 2
+    input_ids = np.full((len(sequences), length), tokenizer.pad_token_id, dtype=np.int64)
+    attention_mask = np.zeros((len(sequences), length), dtype=np.int64)
+    for row, ids in enumerate(sequences):
+        input_ids[row, 0] = tokenizer.cls_token_id
+        input_ids[row, 1:len(ids) + 1] = ids
+        input_ids[row, len(ids) + 1] = tokenizer.sep_token_id
+        attention_mask[row, :len(ids) + 2] = 1
+
+    batch = {"input_ids": torch.from_numpy(input_ids), "attention_mask": torch.from_numpy(attention_mask)}
+    if "token_type_ids" in tokenizer.model_input_names:
+        batch["token_type_ids"] = torch.zeros_like(batch["input_ids"])
+    return batch
+
+@traced()
+def predict_sentiment_kobert(texts: List[str], token_ids: Optional[List[Optional[bytes]]] = None) -> np.ndarray:
+    """KoBERT를 사용한 감성분석 -> (N, 3) 확률 행렬 (열 순서는 SENTIMENT_CLASSES)
+
+    token_ids: 수집 시 저장한 토큰 ID (없거나 현재 토크나이저와 태그가 다른 댓글만 여기서 토큰화)
+    토큰 길이순으로 정렬해 KOBERT_BATCH_SIZE개씩 묶고 배치마다 가장 긴 댓글 길이까지만 패딩합니다.
+    어텐션 비용이 길이의 제곱에 비례하므로 짧은 댓글끼리 묶으면 댓글당 추론 시간이 크게 줄어듭니다.
+    """
+    if not texts:
+        return np.empty((0, len(SENTIMENT_CLASSES)), dtype=np.float64)
     try:
         model, tokenizer = model_manager.get_kobert_model()
         if model is None or tokenizer is None:
-            return analyze_sentiment_dictionary(texts)
+            return predict_sentiment_dictionary(texts)
         
         device = model_manager.device
-        results = []
-        
-        for text in texts:
-            # 토큰화
-            inputs = tokenizer(
-                text,
-                return_tensors="pt",
+        max_ids = settings.KOBERT_MAX_LENGTH - 2
+        stored = [decode_token_ids(data) for data in token_ids or [None] * len(texts)]
+        missing = [index for index, ids in enumerate(stored) if ids is None]
+        fresh = {}
+        if missing:
+            encoded = tokenizer(
+                [texts[index] for index in missing],
+                add_special_tokens=False,
                 truncation=True,
-                padding=True,
-                max_length=512
-            ).to(device)
+                max_length=max_ids
+            )["input_ids"]
+            fresh = dict(zip(missing, encoded))
+        sequences = [
+            np.asarray(fresh[index], dtype=np.int64) if ids is None else ids[:max_ids]
+            for index, ids in enumerate(stored)
+        ]
+        
+        # 길이 버킷: 길이순 정렬 후 배치 단위로 동적 패딩
+        order = sorted(range(len(texts)), key=lambda index: len(sequences[index]))
+        # 이진 분류 모델(0: negative, 1: positive)이므로 중립 열은 0
+        probabilities = np.zeros((len(texts), len(SENTIMENT_CLASSES)), dtype=np.float64)
+        for start in range(0, len(order), settings.KOBERT_BATCH_SIZE):
+            indices = order[start:start + settings.KOBERT_BATCH_SIZE]
+            inputs = {
+                name: tensor.to(device)
+                for name, tensor in _build_batch([sequences[index] for index in indices], tokenizer).items()
+            }
             
             # 예측
-            with torch.no_grad():
-                outputs = model(**inputs)
-                predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-                predicted_class = torch.argmax(predictions, dim=-1).item()
-                confidence = predictions[0][predicted_class].item()
-            
-            # 결과 매핑 (0: negative, 1: positive)
-            sentiment_map = {0: "negative", 1: "positive"}
-            
-            results.append({
-                "text": text,
-                "sentiment": sentiment_map[predicted_class],
-                "confidence": confidence,
-                "scores": {
-                    "negative": predictions[0][0].item(),
-                    "neutral": 0.0,  # 중립은 0으로 설정
-                    "positive": predictions[0][1].item()
-                }
-            })
+            with MODEL_INFERENCE_DURATION.time(model="kobert", batch_size=batch_size_label(len(indices))), \
+                    torch_profile("kobert"):
+                with torch.no_grad():
+                    outputs = model(**inputs)
+                    predictions = torch.nn.functional.softmax(outputs.logits, dim=-1).cpu().numpy()
+            MODEL_INFERENCE_ITEMS.inc(len(indices), model="kobert")
+            probabilities[indices, NEGATIVE] = predictions[:, 0]
+            probabilities[indices, POSITIVE] = predictions[:, 1]
         
-        return results
+        return probabilities
         
     except Exception as e:
         print(f"[Error] KoBERT 감성분석 실패: {e}")
-        return analyze_sentiment_dictionary(texts)
+        return predict_sentiment_dictionary(texts)
 
-def analyze_sentiment_dictionary(texts: List[str]) -> List[Dict]:
-    """사전 기반 감성분석 (fallback)"""
-    results = []
-    
-    for text in texts:
+@traced()
+def predict_sentiment_dictionary(texts: List[str]) -> np.ndarray:
+    """사전 기반 감성분석 (fallback) -> (N, 3) 확률 행렬
+
+    긍정/부정 단어 수가 많은 쪽(같으면 중립)에 신뢰도(0.5~0.8)를 주고 나머지를 두 클래스에 나눕니다.
+    """
+    counts = np.zeros((len(texts), 2), dtype=np.int64)
+    for row, text in enumerate(texts):
         text_clean = re.sub(r'[^\w\s]', '', text.lower())
+        counts[row, 0] = sum(1 for word in POSITIVE_WORDS if word in text_clean)
+        counts[row, 1] = sum(1 for word in NEGATIVE_WORDS if word in text_clean)
+    
+    difference = counts[:, 0] - counts[:, 1]
+    labels = np.where(difference > 0, POSITIVE, np.where(difference < 0, NEGATIVE, NEUTRAL))
+    confidence = np.where(difference == 0, 0.5, np.minimum(0.8, 0.5 + np.abs(difference) * 0.1))
+    
+    probabilities = np.repeat(((1 - confidence) / 2)[:, None], len(SENTIMENT_CLASSES), axis=1)
+    probabilities[np.arange(len(texts)), labels] = confidence
+    return probabilities
+
+def to_results(texts: List[str], probabilities: np.ndarray) -> List[Dict]:
+    """확률 행렬 -> 댓글별 결과 dict (API 응답/디버깅용, 집계에는 행렬을 그대로 사용)"""
+    labels = probabilities.argmax(axis=1)
+    return [
+        {
+            "text": text,
+            "sentiment": SENTIMENT_CLASSES[label],
+            "confidence": float(row[label]),
+            "scores": dict(zip(SENTIMENT_CLASSES, map(float, row)))
+        }
+        for text, row, label in zip(texts, probabilities, labels)
+    ]
+
+def analyze_sentiment_kobert(texts: List[str], token_ids: Optional[List[Optional[bytes]]] = None) -> List[Dict]:
+    """KoBERT를 사용한 감성분석 (댓글별 dict)"""
+    return to_results(texts, predict_sentiment_kobert(texts, token_ids))
+
+def analyze_sentiment_dictionary(texts: List[str]) -> List[Dict]:
+    """사전 기반 감성분석 (댓글별 dict)"""
+    return to_results(texts, predict_sentiment_dictionary(texts))
+
+class SentimentAccumulator:
+    """확률 행렬을 청크 단위로 받아 가중 비율/신뢰구간에 필요한 합계만 유지하는 스트리밍 집계기
+
+    댓글 수와 무관하게 메모리는 클래스 수만큼의 합계뿐이므로 대량 댓글도 청크별로 추론하고 버릴 수 있습니다.
+    weights는 행이 대표하는 댓글 수(클러스터 크기), likes는 그 댓글들의 좋아요 합입니다.
+    """
+
+    def __init__(self):
+        self.count = 0  # 분석한 댓글(행) 수
+        self.total_weight = 0.0
+        self.total_weight_squared = 0.0
+        self.label_weights = np.zeros(len(SENTIMENT_CLASSES), dtype=np.float64)  # 예측 클래스별 가중치 합
+        self.probability_weights = np.zeros(len(SENTIMENT_CLASSES), dtype=np.float64)  # 클래스 확률 가중합
+        self.like_label_weights = np.zeros(len(SENTIMENT_CLASSES), dtype=np.float64)  # 좋아요 가중 클래스 합
+
+    def add(
+        self,
+        probabilities: np.ndarray,
+        weights: Optional[Sequence[float]] = None,
+        likes: Optional[Sequence[float]] = None
+    ) -> "SentimentAccumulator":
+        if len(probabilities) == 0:
+            return self
+        weights = np.ones(len(probabilities)) if weights is None else np.asarray(weights, dtype=np.float64)
+        labels = probabilities.argmax(axis=1)
+
+        self.count += len(probabilities)
+        self.total_weight += float(weights.sum())
+        self.total_weight_squared += float(weights @ weights)
+        self.label_weights += np.bincount(labels, weights=weights, minlength=len(SENTIMENT_CLASSES))
+        self.probability_weights += weights @ probabilities
+        if likes is not None:
+            # 댓글마다 작성자 본인 1표 + 좋아요 1개당 공감 1표
+            like_weights = weights + np.asarray(likes, dtype=np.float64)
+            self.like_label_weights += np.bincount(labels, weights=like_weights, minlength=len(SENTIMENT_CLASSES))
+        return self
+
+    @property
+    def ratios(self) -> np.ndarray:
+        """예측 클래스별 가중 비율 (SENTIMENT_CLASSES 순서)"""
+        return self.label_weights / self.total_weight if self.total_weight else np.zeros(len(SENTIMENT_CLASSES))
+
+    @property
+    def effective_count(self) -> float:
+        """가중치 불균등을 반영한 유효 표본 크기 (Kish)"""
+        return self.total_weight ** 2 / self.total_weight_squared if self.total_weight_squared else 0.0
+
+    def summary(self) -> Dict:
+        """종합 감성 점수와 비율 (calculate_sentiment_score 반환 형식)"""
+        if not self.count:
+            return {
+                "score": 50.0,
+                "positive_ratio": 0.33,
+                "negative_ratio": 0.33,
+                "neutral_ratio": 0.34,
+                "total_comments": 0
+            }
         
-        positive_count = sum(1 for word in POSITIVE_WORDS if word in text_clean)
-        negative_count = sum(1 for word in NEGATIVE_WORDS if word in text_clean)
+        negative_ratio, neutral_ratio, positive_ratio = (float(value) for value in self.ratios)
         
-        if positive_count > negative_count:
-            sentiment = "positive"
-            confidence = min(0.8, 0.5 + (positive_count - negative_count) * 0.1)
-        elif negative_count > positive_count:
-            sentiment = "negative"
-            confidence = min(0.8, 0.5 + (negative_count - positive_count) * 0.1)
-        else:
-            sentiment = "neutral"
-            confidence = 0.5
+        # 점수 계산 (긍정 비율 기반, 0-100)
+        score = (positive_ratio * 100 + neutral_ratio * 50) * 0.8 + 20
         
-        results.append({
-            "text": text,
-            "sentiment": sentiment,
-            "confidence": confidence,
-            "scores": {
-                "positive": positive_count / max(1, positive_count + negative_count),
-                "negative": negative_count / max(1, positive_count + negative_count),
-                "neutral": 0.5 if positive_count == negative_count else 0.2
-            }
-        })
-    
-    return results
-
-def calculate_sentiment_score(comments: List[str]) -> Dict:
-    """댓글 리스트의 종합 감성 점수 계산"""
-    if not comments:
-        return {
-            "score": 50.0,
-            "positive_ratio": 0.33,
-            "negative_ratio": 0.33,
-            "neutral_ratio": 0.34,
-            "total_comments": 0
+        summary = {
+            "score": min(100, max(0, score)),
+            "positive_ratio": positive_ratio,
+            "negative_ratio": negative_ratio,
+            "neutral_ratio": neutral_ratio,
+            "total_comments": int(round(self.total_weight)),
+            "mean_positive_probability": float(self.probability_weights[POSITIVE] / self.total_weight)
         }
-    
-    # 감성분석 실행
-    results = analyze_sentiment_kobert(comments)
-    
-    # 통계 계산
-    sentiment_counts = Counter(result["sentiment"] for result in results)
-    total = len(results)
-    
-    positive_ratio = sentiment_counts.get("positive", 0) / total
-    negative_ratio = sentiment_counts.get("negative", 0) / total
-    neutral_ratio = sentiment_counts.get("neutral", 0) / total
-    
-    # 점수 계산 (긍정 비율 기반, 0-100)
-    score = (positive_ratio * 100 + neutral_ratio * 50) * 0.8 + 20
-    
-    return {
-        "score": min(100, max(0, score)),
-        "positive_ratio": positive_ratio,
-        "negative_ratio": negative_ratio,
-        "neutral_ratio": neutral_ratio,
-        "total_comments": total
-    }
+        like_total = self.like_label_weights.sum()
+        if like_total:
+            summary["like_weighted_positive_ratio"] = float(self.like_label_weights[POSITIVE] / like_total)
+        return summary
+
+def calculate_sentiment_score(comments: List[str], weights: Optional[List[int]] = None) -> Dict:
+    """댓글 리스트의 종합 감성 점수 계산
+
+    weights: 댓글별 가중치 (유사 댓글 클러스터 크기) - 대표 댓글만 분석하고 비율은 클러스터 크기로 가중
+    """
+    return SentimentAccumulator().add(predict_sentiment_kobert(comments), weights).summary()
+
+def calculate_sentiment_score_stream(chunks: Iterable[Tuple[List[str], Optional[List[int]]]]) -> Dict:
+    """(댓글 리스트, 가중치) 청크를 차례로 추론/집계 - 청크별 확률 행렬만 잠시 메모리에 올림"""
+    accumulator = SentimentAccumulator()
+    for comments, weights in chunks:
+        accumulator.add(predict_sentiment_kobert(comments), weights)
+    return accumulator.summary()
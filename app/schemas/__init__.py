@@ -9,7 +9,7 @@ __all__ = [
     
     # ROI schemas
     "BrandCompatibilityRequest", "WeightConfig", "SimulatorRequest",
-    "BrandImageScore", "SentimentScore", "ROIEstimate", "TotalScore", "SimulatorResponse",
+    "BrandImageScore", "SentimentScore", "ROIEstimate", "TotalScore", "ComponentScores", "SimulatorResponse",
     
     # Common schemas
     "HealthCheck", "ErrorResponse", "SuccessResponse"
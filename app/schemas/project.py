@@ -28,3 +28,34 @@ class YoutuberWithROI(BaseModel):
     estimated_price: str = "가격 문의"
     total_score: float  # roi_score -> total_score로 변경
     grade: str   # roi_grade -> grade로 변경 (더 간결)
+    brand_score: Optional[float] = None  # materialized 구성요소 점수
+    sentiment_score: Optional[float] = None
+    roi_estimate_score: Optional[float] = None
+    rank: Optional[int] = None  # 원점수 순위 (1부터)
+    raw_score: Optional[float] = None  # 상대평가 적용 전 원점수
+
+class ChannelCandidate(BaseModel):
+    channel_id: str
+    title: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    category: str = "미분류"
+    subscriber_count: Optional[int] = None
+    similarity: float  # 브랜드-채널 임베딩 유사도 (0-100, 텍스트 0.7 + 이미지 0.3)
+    text_similarity: Optional[float] = None  # SBERT 유사도 (0-100)
+    image_similarity: Optional[float] = None  # CLIP 유사도 (0-100, 썸네일/브랜드 이미지 없으면 None)
+
+class ProjectStatus(BaseModel):
+    project_id: str
+    job_id: str
+    status: str  # queued, running, completed, failed, cancelled
+    total: int  # 분석 대상 유튜버 수
+    processed: int  # 처리 완료 유튜버 수
+    failed: int  # 분석 실패 유튜버 수
+    progress: float  # 0.0 ~ 1.0
+    throughput_per_sec: Optional[float] = None  # 초당 처리 유튜버 수
+    eta_seconds: Optional[float] = None  # 예상 남은 시간
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    shards: Optional[List[dict]] = None  # 멀티 프로세스 모드의 샤드별 지표
@@ -37,6 +37,10 @@ class SentimentScore(BaseModel):
     negative_ratio: float = Field(..., description="부정 비율")
     neutral_ratio: float = Field(..., description="중립 비율")
     total_comments: int = Field(..., description="분석된 댓글 수")
+    positive_ratio_low: Optional[float] = Field(None, description="긍정 비율 95% 신뢰구간 하한")
+    positive_ratio_high: Optional[float] = Field(None, description="긍정 비율 95% 신뢰구간 상한")
+    sampled_comments: Optional[int] = Field(None, description="모델로 분석한 표본 댓글(클러스터) 수")
+    like_weighted_positive_ratio: Optional[float] = Field(None, description="좋아요 가중 긍정 비율")
 
 class ROIEstimate(BaseModel):
     score: float = Field(..., description="ROI 점수 (0-100)")
@@ -44,6 +48,7 @@ class ROIEstimate(BaseModel):
     estimated_engagement: float = Field(..., description="예상 참여율")
     estimated_cost: str = Field(..., description="예상 비용")
     cpm: float = Field(..., description="예상 CPM")
+    growth_rate: Optional[float] = Field(None, description="30일 환산 구독자 증가율 (%)")
 
 class TotalScore(BaseModel):
     total_score: float = Field(..., description="종합 점수 (0-100)")
@@ -51,6 +56,11 @@ class TotalScore(BaseModel):
     recommendation: str = Field(..., description="추천 사유")
     weights_used: WeightConfig = Field(..., description="사용된 가중치")
 
+class ComponentScores(BaseModel):
+    brand: BrandImageScore = Field(..., description="브랜드 적합도 분석 결과")
+    sentiment: SentimentScore = Field(..., description="감성분석 결과")
+    roi: ROIEstimate = Field(..., description="ROI 추정 결과")
+
 class SimulatorResponse(BaseModel):
     channel_id: str
     brand_name: str
@@ -1,10 +1,12 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
 # 요청 스키마
 class SearchReq(BaseModel):
     keyword: str
-    top_n: int = Field(30, ge=1, le=200)
+    top_n: int = Field(30, ge=1, le=200)  # 페이지 크기
+    page: int = Field(1, ge=1)
+    mode: Literal["hybrid", "lexical", "semantic"] = "hybrid"  # 키워드(BM25) + 의미(SBERT) 융합
     region: str = "KR"
     lang: str = "ko"
 
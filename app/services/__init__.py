@@ -1,5 +1,18 @@
 from .youtube_service import youtube_service
 from .brand_service import brand_service
 from .roi_service import roi_service
+from .score_service import score_service
+from .compare_service import compare_service
+from .job_service import job_service
+from .candidate_service import candidate_service
+from .search_service import search_service
+from .feed_cache import feed_cache
+from .ranking_service import ranking_service
+from .channel_stats_service import channel_stats_service
+from .comment_service import comment_service
 
-__all__ = ["youtube_service", "brand_service", "roi_service"]
+__all__ = [
+    "youtube_service", "brand_service", "roi_service", "score_service",
+    "compare_service", "job_service", "candidate_service", "search_service",
+    "feed_cache", "ranking_service", "channel_stats_service", "comment_service"
+]
@@ -1,19 +1,42 @@
 """
 브랜드 적합도 분석 서비스
 """
+import struct
+from io import BytesIO
 from typing import Optional, List
+import numpy as np
 from PIL import Image
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.tracing import traced
 from app.ml import (
+    model_manager,
     load_image_from_url,
     load_image_from_base64,
+    encode_images,
+    encode_texts,
+    build_brand_text,
     calculate_image_similarity,
     calculate_brand_channel_compatibility
 )
 from app.schemas.roi import BrandImageScore
 
+# 저장된 브랜드 이미지 임베딩 헤더: magic + CLIP 모델 이름 (길이 uint16 + UTF-8), 이후 float32 벡터
+BRAND_EMBEDDING_MAGIC = b"CLIPEMB1"
+
 class BrandService:
     """브랜드 분석 관련 서비스"""
     
+    def __init__(self):
+        # 브랜드 측 임베딩 캐시: 채널마다 같은 브랜드 텍스트/이미지를 다시 인코딩하지 않도록
+        # (cache_key, 종류, 모델 버전[, 브랜드 텍스트]) 키로 보관
+        self._embedding_cache = TTLCache(
+            maxsize=settings.BRAND_EMBEDDING_CACHE_MAX_ENTRIES,
+            ttl=settings.SCORE_CACHE_TTL_SECONDS,
+            name="brand_embeddings"
+        )
+    
+    @traced()
     def analyze_brand_compatibility(
         self,
         channel_id: str,
@@ -24,11 +47,16 @@ class BrandService:
         brand_image_url: Optional[str] = None,
         brand_image_base64: Optional[str] = None,
         brand_image_path: Optional[str] = None,
+        brand_image_embedding: Optional[np.ndarray] = None,
         channel_description: str = "",
         channel_titles: List[str] = None,
-        channel_thumbnails: List[Image.Image] = None
+        channel_thumbnails: List[Image.Image] = None,
+        cache_key: Optional[tuple] = None
     ) -> BrandImageScore:
-        """브랜드 적합도 종합 분석"""
+        """브랜드 적합도 종합 분석
+
+        cache_key(예: (project_id, 프로젝트 버전))가 주어지면 브랜드 텍스트/이미지 임베딩을 캐시합니다.
+        """
         
         if channel_titles is None:
             channel_titles = []
@@ -37,22 +65,23 @@ class BrandService:
         
         # 1. 이미지 유사도 분석
         image_score = 50.0
-        if brand_image_url or brand_image_base64 or brand_image_path:
-            brand_image = None
-            if brand_image_url:
-                brand_image = load_image_from_url(brand_image_url)
-            elif brand_image_base64:
-                brand_image = load_image_from_base64(brand_image_base64)
-            elif brand_image_path:
-                # 로컬 파일 처리
-                try:
-                    import os
-                    if os.path.exists(brand_image_path):
-                        from PIL import Image
-                        brand_image = Image.open(brand_image_path).convert("RGB")
-                except Exception as e:
-                    print(f"[Error] 로컬 이미지 로드 실패 ({brand_image_path}): {e}")
-            
+        if brand_image_embedding is not None:
+            # 프로젝트 생성 시 계산해 둔 임베딩 사용 (브랜드 이미지 디코딩/인코딩 생략)
+            if channel_thumbnails:
+                image_score = calculate_image_similarity(
+                    None, channel_thumbnails, brand_embedding=brand_image_embedding
+                )
+        elif (brand_image_url or brand_image_base64 or brand_image_path) and cache_key is not None:
+            # 임베딩이 저장되지 않은 프로젝트: 브랜드 이미지는 캐시 키당 한 번만 디코딩/인코딩
+            brand_embedding = self.get_brand_image_embedding(
+                cache_key, brand_image_url, brand_image_base64, brand_image_path
+            )
+            if brand_embedding is not None and channel_thumbnails:
+                image_score = calculate_image_similarity(
+                    None, channel_thumbnails, brand_embedding=brand_embedding
+                )
+        elif brand_image_url or brand_image_base64 or brand_image_path:
+            brand_image = self._load_brand_image(brand_image_url, brand_image_base64, brand_image_path)
             if brand_image and channel_thumbnails:
                 image_score = calculate_image_similarity(brand_image, channel_thumbnails)
         
@@ -62,7 +91,10 @@ class BrandService:
             brand_tone=brand_tone,
             brand_category=brand_category,
             channel_description=channel_description,
-            channel_titles=channel_titles
+            channel_titles=channel_titles,
+            brand_embedding=self.get_brand_text_embedding(
+                cache_key, build_brand_text(brand_description, brand_tone, brand_category)
+            ) if cache_key is not None else None
         )
         
         # 3. 종합 점수 계산 - 극단적 차별화
@@ -107,7 +139,7 @@ class BrandService:
             "channel_data_points": {
                 "thumbnails_analyzed": len(channel_thumbnails),
                 "titles_analyzed": len(channel_titles),
-                "has_brand_image": bool(brand_image_url or brand_image_base64)
+                "has_brand_image": bool(brand_image_url or brand_image_base64 or brand_image_embedding is not None)
             }
         }
         
@@ -121,11 +153,114 @@ class BrandService:
                 "channel_data_points": {
                     "thumbnails_analyzed": len(channel_thumbnails),
                     "titles_analyzed": len(channel_titles),
-                    "has_brand_image": bool(brand_image_url or brand_image_base64)
+                    "has_brand_image": bool(brand_image_url or brand_image_base64 or brand_image_embedding is not None)
                 }
             }
         )
     
+    def encode_brand_image(self, content: bytes) -> bytes:
+        """업로드된 브랜드 이미지 검증 후 CLIP 임베딩 계산 (Project.brand_image_embedding 저장용)
+
+        이미지가 아니거나 손상된 경우 ValueError
+        """
+        try:
+            with Image.open(BytesIO(content)) as image:
+                image.verify()
+            # verify() 이후에는 다시 열어야 디코딩 가능
+            with Image.open(BytesIO(content)) as image:
+                brand_image = image.convert("RGB")
+        except Exception as e:
+            raise ValueError(f"이미지 파일을 읽을 수 없습니다: {e}")
+        
+        return self.dump_brand_embedding(encode_images([brand_image])[0])
+    
+    def invalidate_project(self, project_id: str) -> int:
+        """프로젝트 수정/삭제 시 브랜드 측 임베딩 제거"""
+        return self._embedding_cache.invalidate(lambda key: key[0] == project_id)
+    
+    @traced()
+    def get_brand_text_embedding(self, cache_key: tuple, brand_text: str) -> Optional[np.ndarray]:
+        """브랜드 텍스트 SBERT 임베딩 (캐시, 실패 시 None → 기존 경로로 계산)"""
+        key = cache_key + ("text", model_manager.version, brand_text)
+        try:
+            return self._embedding_cache.get_or_set(key, lambda: encode_texts([brand_text])[0])
+        except Exception as e:
+            print(f"[Error] 브랜드 텍스트 임베딩 실패: {e}")
+            return None
+    
+    @traced()
+    def get_brand_image_embedding(
+        self,
+        cache_key: tuple,
+        brand_image_url: Optional[str],
+        brand_image_base64: Optional[str],
+        brand_image_path: Optional[str]
+    ) -> Optional[np.ndarray]:
+        """브랜드 이미지 CLIP 임베딩 (캐시, 로드/인코딩 실패는 캐시하지 않음)"""
+        key = cache_key + ("image", model_manager.version)
+        embedding = self._embedding_cache.get(key)
+        if embedding is not None:
+            return embedding
+        
+        brand_image = self._load_brand_image(brand_image_url, brand_image_base64, brand_image_path)
+        if brand_image is None:
+            return None
+        try:
+            embedding = encode_images([brand_image])[0]
+        except Exception as e:
+            print(f"[Error] 브랜드 이미지 임베딩 실패: {e}")
+            return None
+        self._embedding_cache.set(key, embedding)
+        return embedding
+    
+    def _load_brand_image(
+        self,
+        brand_image_url: Optional[str],
+        brand_image_base64: Optional[str],
+        brand_image_path: Optional[str]
+    ) -> Optional[Image.Image]:
+        """URL/Base64/로컬 파일에서 브랜드 이미지 로드"""
+        brand_image = None
+        if brand_image_url:
+            # 요청으로 전달된 브랜드 이미지는 저장소에 없으면 내려받음
+            brand_image = load_image_from_url(brand_image_url, fetch_on_miss=True)
+        elif brand_image_base64:
+            brand_image = load_image_from_base64(brand_image_base64)
+        elif brand_image_path:
+            # 로컬 파일 처리
+            try:
+                import os
+                if os.path.exists(brand_image_path):
+                    brand_image = Image.open(brand_image_path).convert("RGB")
+            except Exception as e:
+                print(f"[Error] 로컬 이미지 로드 실패 ({brand_image_path}): {e}")
+        return brand_image
+    
+    @staticmethod
+    def dump_brand_embedding(embedding: np.ndarray) -> bytes:
+        """브랜드 이미지 임베딩 직렬화 (현재 CLIP 모델 이름을 헤더에 기록)"""
+        model_name = settings.CLIP_MODEL_NAME.encode("utf-8")
+        return (
+            BRAND_EMBEDDING_MAGIC + struct.pack("<H", len(model_name)) + model_name
+            + np.asarray(embedding, dtype="<f4").tobytes()
+        )
+    
+    @staticmethod
+    def load_brand_embedding(data: Optional[bytes]) -> Optional[np.ndarray]:
+        """저장된 브랜드 이미지 임베딩 복원
+
+        다른 CLIP 모델로 만든 임베딩(차원이 다를 수 있음)이나 헤더 없는 이전 형식은 None을 반환하므로,
+        호출자는 brand_image_path의 이미지 파일에서 현재 모델로 다시 인코딩합니다.
+        """
+        if not data or not data.startswith(BRAND_EMBEDDING_MAGIC):
+            return None
+        offset = len(BRAND_EMBEDDING_MAGIC)
+        (length,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        if data[offset:offset + length].decode("utf-8", "replace") != settings.CLIP_MODEL_NAME:
+            return None
+        return np.frombuffer(data, dtype="<f4", offset=offset + length)
+    
     def get_compatibility_grade(self, score: float) -> str:
         """적합도 점수를 등급으로 변환"""
         if score >= 90:
@@ -0,0 +1,176 @@
+"""
+채널 후보 검색 서비스 - 채널 SBERT/CLIP 임베딩 ANN 인덱스로 브랜드와 유사한 채널 선별
+"""
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from sqlmodel import Session, select
+from app.config import settings
+from app.core.models import Influencer, Project, Video
+from app.core.tracing import traced
+from app.ml import model_manager, image_store, encode_images, encode_texts, build_brand_text, build_channel_text
+from app.ml.ann_index import VectorIndex
+
+# 브랜드 적합도 기본 점수와 동일한 가중치 (이미지 0.3, 텍스트 0.7)
+TEXT_WEIGHT = 0.7
+IMAGE_WEIGHT = 0.3
+
+# 인덱스 meta 표시: scripts/build_ann_index.py(rebuild)로 전체 채널을 넣었음 (크롤러 증분 반영 전제 조건)
+FULL_BUILD_KEY = "full_build"
+
+class CandidateService:
+    """브랜드 → 채널 후보 검색 및 채널 임베딩 인덱스 관리"""
+
+    def __init__(self):
+        self.text_index = VectorIndex(settings.ANN_INDEX_DIR, "sbert")
+        self.image_index = VectorIndex(settings.ANN_INDEX_DIR, "clip")
+
+    def index_channels(self, session: Session, channel_ids: Sequence[str], save: bool = True) -> Dict[str, int]:
+        """채널 임베딩 계산 후 인덱스에 추가/갱신 (크롤러 커밋 후 호출)
+
+        현재 모델 버전으로 전체 구축(scripts/build_ann_index.py)된 인덱스에만 증분 반영합니다.
+        전체 구축 전에 크롤링한 채널만 넣으면 부분 인덱스가 준비된 것처럼 보여 나머지 채널이 후보에서 빠지므로 건너뜁니다.
+        """
+        self._refresh()
+        if not self._is_full_build():
+            print("[Error] 후보 인덱스가 현재 모델로 전체 구축되지 않아 증분 반영을 건너뜁니다 (scripts/build_ann_index.py 실행 필요)")
+            return {"text": 0, "image": 0, "removed": 0}
+        return self._index_channels(session, channel_ids, save)
+
+    def _index_channels(self, session: Session, channel_ids: Sequence[str], save: bool) -> Dict[str, int]:
+        influencers = session.exec(
+            select(Influencer).where(Influencer.channel_id.in_(list(channel_ids)))
+        ).all()
+        found_ids = {influencer.channel_id for influencer in influencers}
+        removed_ids = [channel_id for channel_id in channel_ids if channel_id not in found_ids]
+
+        # 채널 텍스트 (브랜드 적합도 계산과 같은 입력: 설명 + 영상 제목 10개)
+        titles: Dict[str, List[str]] = {}
+        for channel_id, video_title in session.exec(
+            select(Video.channel_id, Video.video_title).where(Video.channel_id.in_(list(found_ids)))
+        ).all():
+            if video_title:
+                titles.setdefault(channel_id, []).append(video_title)
+
+        text_ids = [influencer.channel_id for influencer in influencers]
+        if text_ids:
+            texts = [
+                build_channel_text(influencer.description or "", titles.get(influencer.channel_id, []))
+                for influencer in influencers
+            ]
+            self.text_index.add(text_ids, encode_texts(texts))
+
+        # 채널 썸네일 (로컬 이미지 저장소에 있는 것만)
+        image_ids = []
+        images = []
+        for influencer in influencers:
+            image = image_store.get(influencer.thumbnail_url) if influencer.thumbnail_url else None
+            if image is not None:
+                image_ids.append(influencer.channel_id)
+                images.append(image)
+        if images:
+            self.image_index.add(image_ids, encode_images(images))
+
+        self.remove_channels(removed_ids, save=False)
+        if save:
+            self.text_index.save()
+            self.image_index.save()
+        return {"text": len(text_ids), "image": len(image_ids), "removed": len(removed_ids)}
+
+    def remove_channels(self, channel_ids: Sequence[str], save: bool = True) -> None:
+        """삭제된 채널을 인덱스에서 제거"""
+        if not channel_ids:
+            return
+        self.text_index.remove(channel_ids)
+        self.image_index.remove(channel_ids)
+        if save:
+            self.text_index.save()
+            self.image_index.save()
+
+    def rebuild(self, session: Session, batch_size: int = 256) -> Dict[str, int]:
+        """전체 채널로 인덱스 재구축 (최초 구축, 모델 버전 변경 시), 끝나면 전체 구축 표시"""
+        meta = {"model_version": model_manager.version}
+        self.text_index.clear(meta)
+        self.image_index.clear(meta)
+
+        channel_ids = session.exec(select(Influencer.channel_id).order_by(Influencer.channel_id)).all()
+        for start in range(0, len(channel_ids), batch_size):
+            self._index_channels(session, channel_ids[start:start + batch_size], save=False)
+            session.expunge_all()
+        for index in (self.text_index, self.image_index):
+            index.meta[FULL_BUILD_KEY] = True
+            index.save()
+        return {"text": len(self.text_index), "image": len(self.image_index)}
+
+    def is_ready(self) -> bool:
+        """현재 모델 버전으로 전체 구축된 인덱스가 있는지 (크롤러 증분분만 있는 부분 인덱스는 제외)"""
+        self._refresh()
+        return len(self.text_index) > 0 and self._is_full_build()
+
+    def _is_full_build(self) -> bool:
+        return all(
+            index.meta.get("model_version") == model_manager.version and index.meta.get(FULL_BUILD_KEY)
+            for index in (self.text_index, self.image_index)
+        )
+
+    @traced()
+    def get_candidates(self, project: Project, k: int) -> List[Dict]:
+        """브랜드 텍스트/이미지 임베딩과 유사한 상위 k개 채널"""
+        from app.services.brand_service import brand_service
+        from app.services.score_service import score_service
+
+        self._refresh()
+
+        cache_key = (project.project_id, score_service.project_version(project))
+        text_query = brand_service.get_brand_text_embedding(
+            cache_key,
+            build_brand_text(project.campaign_goal, project.brand_tone, project.brand_categories)
+        )
+        image_query = brand_service.load_brand_embedding(project.brand_image_embedding)
+        if image_query is None and project.brand_image_path:
+            image_query = brand_service.get_brand_image_embedding(cache_key, None, None, project.brand_image_path)
+
+        # 인덱스별 후보를 넉넉히 뽑은 뒤 합집합을 두 유사도로 재정렬
+        pool = k * settings.ANN_OVERSAMPLE
+        candidate_ids = []
+        if text_query is not None:
+            candidate_ids.extend(channel_id for channel_id, _ in self.text_index.search(text_query, pool))
+        if image_query is not None:
+            candidate_ids.extend(channel_id for channel_id, _ in self.image_index.search(image_query, pool))
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        if not candidate_ids:
+            return []
+
+        text_vectors = self.text_index.get_vectors(candidate_ids) if text_query is not None else {}
+        image_vectors = self.image_index.get_vectors(candidate_ids) if image_query is not None else {}
+
+        candidates = []
+        for channel_id in candidate_ids:
+            text_similarity = self._scaled(text_vectors.get(channel_id), text_query)
+            image_similarity = self._scaled(image_vectors.get(channel_id), image_query)
+            candidates.append({
+                "channel_id": channel_id,
+                # 유사도를 계산할 수 없는 쪽은 브랜드 적합도 분석과 같은 기본값 50
+                "similarity": round(
+                    TEXT_WEIGHT * (text_similarity if text_similarity is not None else 50.0) +
+                    IMAGE_WEIGHT * (image_similarity if image_similarity is not None else 50.0), 2
+                ),
+                "text_similarity": text_similarity,
+                "image_similarity": image_similarity
+            })
+
+        candidates.sort(key=lambda candidate: candidate["similarity"], reverse=True)
+        return candidates[:k]
+
+    def _refresh(self) -> None:
+        self.text_index.refresh()
+        self.image_index.refresh()
+
+    @staticmethod
+    def _scaled(vector: Optional[np.ndarray], query: Optional[np.ndarray]) -> Optional[float]:
+        """코사인 유사도를 0-100 스케일로 변환"""
+        if vector is None or query is None:
+            return None
+        return round(max(0.0, min(100.0, (float(np.dot(vector, query)) + 1) * 50)), 2)
+
+# 서비스 인스턴스
+candidate_service = CandidateService()
@@ -0,0 +1,147 @@
+"""
+채널 영상 집계 서비스 - 최근 N개 영상 평균/업로드 주기/참여율 백분위를 증분 갱신
+"""
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from sqlmodel import Session, select
+from app.config import settings
+from app.core.models import ChannelStats, Influencer, Video
+
+class ChannelStatsService:
+    """채널별 영상 집계 테이블 관리"""
+
+    def update_channel(
+        self,
+        session: Session,
+        channel_id: str,
+        videos: Iterable[Dict],
+        replace: bool = False
+    ) -> Optional[ChannelStats]:
+        """새로 수집한 영상 통계를 최근 영상 창에 병합하고 집계를 다시 계산 (커밋은 호출자)
+
+        videos: video_id, published_at(datetime 또는 ISO 문자열), view_count, like_count, comment_count
+        같은 video_id는 최신 통계로 덮어쓰며, replace=True면 기존 창을 버리고 새로 만듭니다.
+        Influencer의 avg_views/viral_score/estimated_cpm도 함께 갱신하고,
+        집계가 ROI 입력이므로 last_updated(점수 캐시 채널 버전)를 올립니다.
+        """
+        influencer = session.get(Influencer, channel_id)
+        if not influencer:
+            return None
+
+        stats = session.get(ChannelStats, channel_id) or ChannelStats(channel_id=channel_id)
+        window = {} if replace or not stats.recent_videos else {
+            entry[0]: entry for entry in json.loads(stats.recent_videos)
+        }
+        for video in videos:
+            published_at = video.get("published_at")
+            if isinstance(published_at, str):
+                published_at = datetime.fromisoformat(published_at)
+            if published_at is not None:
+                # 정렬 가능한 ISO 문자열로 통일 (API 응답은 UTC, DB 값은 tz 없음)
+                published_at = published_at.replace(tzinfo=None).isoformat()
+            elif video["video_id"] in window:
+                # 통계만 갱신된 경우 기존 게시일 유지
+                published_at = window[video["video_id"]][1]
+            window[video["video_id"]] = [
+                video["video_id"],
+                published_at,
+                video.get("view_count") or 0,
+                video.get("like_count") or 0,
+                video.get("comment_count") or 0
+            ]
+
+        # 게시일 최신순 상위 N개만 유지 (게시일 없는 영상은 뒤로)
+        recent = sorted(window.values(), key=lambda entry: entry[1] or "", reverse=True)
+        recent = recent[:settings.CHANNEL_STATS_RECENT_VIDEOS]
+
+        self._aggregate(stats, recent)
+        stats.recent_videos = json.dumps(recent)
+        stats.updated_at = datetime.now()
+        session.add(stats)
+
+        self._update_influencer(influencer, stats)
+        influencer.last_updated = datetime.now()
+        return stats
+
+    def rebuild(self, session: Session, channel_ids: Optional[Sequence[str]] = None) -> int:
+        """Video 테이블에서 채널 집계 재구축 (최초 구축/백필용)"""
+        query = select(
+            Video.channel_id, Video.video_id, Video.video_published_at,
+            Video.view_count, Video.like_count, Video.comment_count
+        ).where(Video.channel_id.is_not(None))
+        if channel_ids is not None:
+            query = query.where(Video.channel_id.in_(list(channel_ids)))
+
+        videos_by_channel: Dict[str, List[Dict]] = {}
+        for channel_id, video_id, published_at, view_count, like_count, comment_count in session.exec(query).all():
+            videos_by_channel.setdefault(channel_id, []).append({
+                "video_id": video_id,
+                "published_at": published_at,
+                "view_count": view_count,
+                "like_count": like_count,
+                "comment_count": comment_count
+            })
+
+        for channel_id, videos in videos_by_channel.items():
+            self.update_channel(session, channel_id, videos, replace=True)
+        return len(videos_by_channel)
+
+    def get(self, session: Session, channel_id: str) -> Optional[ChannelStats]:
+        return session.get(ChannelStats, channel_id)
+
+    def _aggregate(self, stats: ChannelStats, recent: List[list]) -> None:
+        """최근 영상 창으로 평균/업로드 간격 중앙값/참여율 백분위 계산"""
+        stats.video_sample = len(recent)
+        if not recent:
+            stats.avg_views = stats.avg_likes = stats.avg_comments = None
+            stats.upload_interval_days = None
+            stats.engagement_p25 = stats.engagement_p50 = stats.engagement_p75 = None
+            return
+
+        counts = np.array([entry[2:5] for entry in recent], dtype=np.float64)
+        stats.avg_views, stats.avg_likes, stats.avg_comments = (
+            round(float(value), 2) for value in counts.mean(axis=0)
+        )
+
+        published = sorted(
+            datetime.fromisoformat(entry[1]).timestamp() for entry in recent if entry[1]
+        )
+        stats.upload_interval_days = (
+            round(float(np.median(np.diff(published))) / 86400, 2) if len(published) >= 2 else None
+        )
+
+        # 영상별 참여율 (조회수 없는 영상 제외)
+        views = counts[:, 0]
+        viewed = views > 0
+        if viewed.any():
+            engagement = (counts[viewed, 1] + counts[viewed, 2]) / views[viewed] * 100
+            stats.engagement_p25, stats.engagement_p50, stats.engagement_p75 = (
+                round(float(value), 3) for value in np.percentile(engagement, [25, 50, 75])
+            )
+        else:
+            stats.engagement_p25 = stats.engagement_p50 = stats.engagement_p75 = None
+
+    def _update_influencer(self, influencer: Influencer, stats: ChannelStats) -> None:
+        """Influencer ROI 컬럼 갱신
+
+        viral_score: 최근 평균 조회수 / 구독자 수 (%, 최대 100)
+        estimated_cpm: 예상 협찬비 / 최근 평균 조회수 * 1000 (원)
+        """
+        from app.services.roi_service import roi_service
+
+        if not stats.avg_views:
+            influencer.avg_views = None
+            influencer.viral_score = None
+            influencer.estimated_cpm = None
+            return
+
+        subscriber_count = influencer.subscriber_count or 0
+        influencer.avg_views = int(stats.avg_views)
+        influencer.viral_score = round(min(100.0, stats.avg_views / max(1, subscriber_count) * 100), 1)
+        cost, _ = roi_service.estimate_cost(subscriber_count)
+        influencer.estimated_cpm = round(cost / stats.avg_views * 1000, 1)
+
+# 서비스 인스턴스
+channel_stats_service = ChannelStatsService()
@@ -0,0 +1,321 @@
+"""
+댓글 수집 서비스 - YouTube 댓글 ID 기준 중복 제거 + SimHash 유사 댓글 클러스터링 + 감성 분석 표본 추출
+"""
+import random
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import text, update
+from sqlmodel import Session, select, delete
+from app.config import settings
+from app.core.models import Comment, CommentCluster, Influencer
+from app.core.tracing import traced
+from app.utils.sampling import proportion_interval, stratified_order, weighted_reservoir
+from app.utils.text_dedup import normalize_comment, simhash64, hamming_distances
+
+SAMPLE_STRATEGIES = ("likes", "recency", "stratified")
+
+# 감성 분석 표본 추출 단위: 유사 댓글 클러스터 + 아직 클러스터링되지 않은 댓글
+# (클러스터의 영상은 첫 댓글의 영상, 나이는 마지막 댓글 기준 일수)
+_SAMPLING_UNITS = text("""
+    SELECT c.representative_text AS comment_text, c.token_ids, c.size, c.like_count,
+           julianday('now') - julianday(c.last_published_at) AS age_days,
+           (SELECT m.video_id FROM comment m WHERE m.cluster_id = c.id LIMIT 1) AS video_id
+    FROM commentcluster c
+    WHERE c.channel_id = :channel_id
+    UNION ALL
+    SELECT comment_text, token_ids, 1, coalesce(like_count, 0), julianday('now') - julianday(published_at), video_id
+    FROM comment
+    WHERE channel_id = :channel_id AND cluster_id IS NULL
+""")
+
+class CommentService:
+    """댓글 저장 및 유사 댓글 클러스터 관리"""
+
+    @traced()
+    def ingest(self, session: Session, channel_id: str, comments: Iterable[Dict]) -> Dict[str, int]:
+        """채널 댓글 저장 (커밋은 호출자)
+
+        comments: comment_id, video_id, comment_text, like_count, published_at(datetime 또는 ISO 문자열), author_name
+        - 이미 저장된 comment_id는 좋아요 수만 갱신 (정확한 중복)
+        - 새 댓글은 SimHash 해밍 거리가 COMMENT_SIMHASH_MAX_DISTANCE 이하인 클러스터에 합치고 개수 증가 (유사 중복)
+        - 새 댓글은 KoBERT 토큰 ID를 함께 저장해 감성 분석 때 다시 토큰화하지 않음
+        """
+        from app.ml.sentiment_analyzer import tokenize_comments
+
+        counts = {"inserted": 0, "duplicates": 0, "clusters_created": 0}
+
+        # 배치 내 같은 ID는 마지막 값만 사용
+        batch: Dict[object, Dict] = {}
+        for index, comment in enumerate(comments):
+            batch[comment.get("comment_id") or ("__no_id__", index)] = comment
+        ids = [key for key in batch if isinstance(key, str)]
+
+        existing = {
+            row.comment_id: row
+            for row in session.exec(select(Comment).where(Comment.comment_id.in_(ids))).all()
+        } if ids else {}
+
+        new_comments = []
+        for key, data in batch.items():
+            if key in existing:
+                self._refresh_likes(session, existing[key], data.get("like_count") or 0)
+                counts["duplicates"] += 1
+            else:
+                new_comments.append(data)
+
+        token_ids = tokenize_comments([data["comment_text"] for data in new_comments])
+        clusters = self._ClusterIndex(session, channel_id)
+        for data, tokens in zip(new_comments, token_ids):
+            comment = Comment(
+                comment_id=data.get("comment_id"),
+                video_id=data["video_id"],
+                channel_id=channel_id,
+                comment_text=data["comment_text"],
+                like_count=data.get("like_count") or 0,
+                published_at=self._parse_datetime(data.get("published_at")),
+                author_name=data.get("author_name"),
+                token_ids=tokens
+            )
+            created = clusters.assign(comment)
+            session.add(comment)
+            counts["inserted"] += 1
+            counts["clusters_created"] += int(created)
+
+        clusters.flush()
+        return counts
+
+    def rebuild(self, session: Session, channel_ids: Optional[Sequence[str]] = None) -> Dict[str, int]:
+        """저장된 댓글로 클러스터 재구축 (최초 구축/기존 데이터 백필, 임계값 변경 시)
+
+        감성 분석 입력이 바뀌므로 채널 데이터 버전(last_updated)을 올립니다.
+        """
+        if channel_ids is None:
+            channel_ids = session.exec(select(Comment.channel_id).distinct()).all()
+
+        counts = {"channels": 0, "comments": 0, "clusters": 0}
+        for channel_id in channel_ids:
+            session.exec(update(Comment).where(Comment.channel_id == channel_id).values(cluster_id=None))
+            session.exec(delete(CommentCluster).where(CommentCluster.channel_id == channel_id))
+
+            clusters = self._ClusterIndex(session, channel_id)
+            comments = session.exec(
+                select(Comment).where(Comment.channel_id == channel_id).order_by(Comment.published_at, Comment.id)
+            ).all()
+            for comment in comments:
+                clusters.assign(comment)
+            clusters.flush()
+
+            influencer = session.get(Influencer, channel_id)
+            if influencer:
+                influencer.last_updated = datetime.now()
+                session.add(influencer)
+            session.flush()
+
+            counts["channels"] += 1
+            counts["comments"] += len(comments)
+            counts["clusters"] += len(clusters.cluster_ids)
+            session.expunge_all()
+        return counts
+
+    def retokenize(self, session: Session, channel_ids: Optional[Sequence[str]] = None, batch_size: int = 1000) -> int:
+        """저장된 댓글/클러스터 대표 댓글 토큰 ID 재생성 (기존 데이터 백필, KOBERT_MODEL/KOBERT_MAX_LENGTH 변경 시)"""
+        from app.ml.sentiment_analyzer import tokenize_comments
+
+        connection = session.connection()
+        updated = 0
+        for model, text_column in ((Comment, Comment.comment_text), (CommentCluster, CommentCluster.representative_text)):
+            query = select(model.id, text_column)
+            if channel_ids is not None:
+                query = query.where(model.channel_id.in_(list(channel_ids)))
+            rows = session.exec(query).all()
+            statement = text(f"UPDATE {model.__tablename__} SET token_ids = :tokens WHERE id = :row_id")
+            for start in range(0, len(rows), batch_size):
+                chunk = rows[start:start + batch_size]
+                token_ids = tokenize_comments([row[1] for row in chunk])
+                connection.execute(
+                    statement, [{"row_id": row[0], "tokens": tokens} for row, tokens in zip(chunk, token_ids)]
+                )
+                updated += len(chunk)
+        return updated
+
+    @traced()
+    def sample_sentiment(self, session: Session, channel_id: str, strategy: Optional[str] = None) -> Dict:
+        """표본 댓글 감성 분석 - 긍정 비율 신뢰구간이 충분히 좁아질 때까지 표본을 늘림
+
+        COMMENT_SAMPLE_INITIAL개로 시작해 95% 신뢰구간 폭이 COMMENT_SAMPLE_CI_WIDTH 이하가 되거나
+        COMMENT_SAMPLE_MAX개(또는 전체)에 도달할 때까지 COMMENT_SAMPLE_STEP개씩 추가 분석합니다.
+        감성이 한쪽으로 뚜렷한 채널은 적은 표본에서 멈추므로 모델 추론은 불확실한 채널에만 더 쓰입니다.
+        비율은 클러스터 크기로 가중하며, 같은 채널은 항상 같은 표본을 뽑도록 채널 ID로 시드를 고정합니다.
+        """
+        from app.ml.sentiment_analyzer import POSITIVE, SentimentAccumulator, predict_sentiment_kobert
+
+        accumulator = SentimentAccumulator()
+        units = session.connection().execute(_SAMPLING_UNITS, {"channel_id": channel_id}).all()
+        if not units:
+            return accumulator.summary()
+
+        order = self._sample_order(channel_id, units, strategy or settings.COMMENT_SAMPLE_STRATEGY)
+        size = min(settings.COMMENT_SAMPLE_INITIAL, len(order))
+        while True:
+            # 새로 추가된 표본만 추론해 누적 (이전 표본의 확률 행렬은 보관하지 않음)
+            batch = order[accumulator.count:size]
+            accumulator.add(
+                predict_sentiment_kobert([unit.comment_text for unit in batch], [unit.token_ids for unit in batch]),
+                weights=[unit.size for unit in batch],
+                likes=[unit.like_count for unit in batch]
+            )
+            low, high = proportion_interval(
+                float(accumulator.ratios[POSITIVE]), size, accumulator.effective_count, population=len(units)
+            )
+            if high - low <= settings.COMMENT_SAMPLE_CI_WIDTH or size >= len(order):
+                break
+            size = min(size + settings.COMMENT_SAMPLE_STEP, len(order))
+
+        summary = accumulator.summary()
+        summary.update({
+            "positive_ratio_low": round(low, 4),
+            "positive_ratio_high": round(high, 4),
+            "sampled_comments": size,
+            "distinct_comments": len(units)
+        })
+        return summary
+
+    def _refresh_likes(self, session: Session, comment: Comment, like_count: int) -> None:
+        """재수집된 댓글의 좋아요 수 갱신 (클러스터 합계에도 반영)"""
+        delta = like_count - (comment.like_count or 0)
+        if not delta:
+            return
+        comment.like_count = like_count
+        session.add(comment)
+        if comment.cluster_id is not None:
+            cluster = session.get(CommentCluster, comment.cluster_id)
+            if cluster:
+                cluster.like_count += delta
+                session.add(cluster)
+
+    def _sample_order(self, channel_id: str, units: List, strategy: str) -> List:
+        """전략별 추출 순서 (최대 COMMENT_SAMPLE_MAX개)
+
+        likes: 좋아요 수 + 1에 비례한 가중 reservoir 추출
+        recency: 최근 댓글일수록 가중치가 큰 reservoir 추출 (COMMENT_SAMPLE_HALF_LIFE_DAYS마다 절반)
+        stratified: 영상별 댓글 수에 비례 배분
+        """
+        if strategy not in SAMPLE_STRATEGIES:
+            raise ValueError(f"지원하지 않는 표본 추출 방식입니다: {strategy}")
+
+        rng = random.Random(zlib.crc32(channel_id.encode("utf-8")))
+        limit = settings.COMMENT_SAMPLE_MAX
+        if strategy == "stratified":
+            return stratified_order(units, [unit.video_id for unit in units], limit, rng)
+
+        if strategy == "likes":
+            weights = np.array([unit.like_count for unit in units], dtype=np.float64) + 1.0
+        else:
+            ages = np.array([unit.age_days for unit in units], dtype=np.float64)
+            # 게시일 없는 댓글은 가장 오래된 댓글로 취급
+            ages = np.nan_to_num(ages, nan=np.nanmax(ages) if not np.isnan(ages).all() else 0.0)
+            weights = 0.5 ** (np.maximum(ages, 0.0) / settings.COMMENT_SAMPLE_HALF_LIFE_DAYS)
+        return weighted_reservoir(units, weights.tolist(), limit, rng)
+
+    @staticmethod
+    def _parse_datetime(value) -> Optional[datetime]:
+        """DB 값과 비교할 수 있도록 tz 없는 UTC로 통일 (API 응답은 ...Z)"""
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return value.replace(tzinfo=None) if value is not None else None
+
+    class _ClusterIndex:
+        """채널 클러스터 SimHash를 메모리에 올려 새 댓글마다 해밍 거리를 한 번에 비교
+
+        정규화하면 (거의) 빈 문자열이 되는 짧은 댓글(이모지/기호만 있는 댓글 등)은 SimHash가 사실상 같아
+        반대 감성의 댓글이 한 클러스터로 묶이므로, 원문이 정확히 같은 댓글끼리만 묶습니다.
+        """
+
+        def __init__(self, session: Session, channel_id: str):
+            self.session = session
+            self.channel_id = channel_id
+            rows = session.exec(
+                select(CommentCluster.id, CommentCluster.simhash, CommentCluster.representative_text)
+                .where(CommentCluster.channel_id == channel_id)
+            ).all()
+            self.cluster_ids: List[Optional[int]] = []
+            self.fingerprints: List[int] = []  # SimHash로 비교하는 클러스터만
+            self.fingerprint_clusters: List[int] = []  # fingerprints 항목의 클러스터 인덱스
+            self.exact: Dict[str, int] = {}  # 짧은 댓글 원문 -> 클러스터 인덱스
+            for cluster_id, fingerprint, representative_text in rows:
+                self._register(cluster_id, fingerprint, representative_text or "")
+            self.new_clusters: Dict[int, CommentCluster] = {}  # 아직 id가 없는 클러스터 (인덱스 -> 객체)
+            self.pending: List[Tuple[Comment, int]] = []  # (댓글, 클러스터 인덱스)
+
+        @staticmethod
+        def _is_short(normalized: str) -> bool:
+            return len(normalized.replace(" ", "")) < settings.COMMENT_SIMHASH_MIN_CHARS
+
+        def _register(self, cluster_id: Optional[int], fingerprint: int, text: str, normalized: Optional[str] = None) -> int:
+            index = len(self.cluster_ids)
+            self.cluster_ids.append(cluster_id)
+            if normalized is None:
+                normalized = normalize_comment(text)
+            if self._is_short(normalized):
+                self.exact.setdefault(text.strip(), index)
+            else:
+                self.fingerprints.append(fingerprint)
+                self.fingerprint_clusters.append(index)
+            return index
+
+        def assign(self, comment: Comment) -> bool:
+            """댓글을 가장 가까운 클러스터에 추가 (없으면 새 클러스터), 새로 만들었으면 True"""
+            normalized = normalize_comment(comment.comment_text)
+            fingerprint = simhash64(normalized)
+            index = None
+            if self._is_short(normalized):
+                index = self.exact.get((comment.comment_text or "").strip())
+            elif self.fingerprints:
+                distances = hamming_distances(self.fingerprints, fingerprint)
+                nearest = int(distances.argmin())
+                if distances[nearest] <= settings.COMMENT_SIMHASH_MAX_DISTANCE:
+                    index = self.fingerprint_clusters[nearest]
+
+            if index is None:
+                cluster = CommentCluster(
+                    channel_id=self.channel_id,
+                    simhash=fingerprint,
+                    representative_text=comment.comment_text,
+                    token_ids=comment.token_ids,
+                    size=1,
+                    like_count=comment.like_count or 0,
+                    first_published_at=comment.published_at,
+                    last_published_at=comment.published_at
+                )
+                self.session.add(cluster)
+                index = self._register(None, fingerprint, comment.comment_text or "", normalized)
+                self.new_clusters[index] = cluster
+                created = True
+            else:
+                cluster = self.new_clusters.get(index) or self.session.get(CommentCluster, self.cluster_ids[index])
+                cluster.size += 1
+                cluster.like_count += comment.like_count or 0
+                if comment.published_at:
+                    cluster.first_published_at = min(filter(None, [cluster.first_published_at, comment.published_at]))
+                    cluster.last_published_at = max(filter(None, [cluster.last_published_at, comment.published_at]))
+                self.session.add(cluster)
+                created = False
+
+            self.pending.append((comment, index))
+            return created
+
+        def flush(self) -> None:
+            """새 클러스터 id 발급 후 댓글에 cluster_id 연결"""
+            self.session.flush()
+            for index, cluster in self.new_clusters.items():
+                self.cluster_ids[index] = cluster.id
+            self.new_clusters = {}
+            for comment, index in self.pending:
+                comment.cluster_id = self.cluster_ids[index]
+                self.session.add(comment)
+            self.pending = []
+
+# 서비스 인스턴스
+comment_service = CommentService()
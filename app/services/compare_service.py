@@ -0,0 +1,109 @@
+"""
+채널 비교 분석 서비스 - 채널별 구성요소 점수를 요청 단위 스레드 풀에서 병렬 계산
+
+스레드 수는 요청마다 min(채널 수, COMPARE_MAX_WORKERS)이므로 전체 소요 시간은
+대략 ceil(채널 수 / 스레드 수) x 채널 하나의 분석 시간입니다. 채널 수가 COMPARE_MAX_WORKERS 이하면
+한 번에 모두 실행되지만, 추론은 CPU 코어를 나눠 쓰므로 코어 수보다 많은 채널은 채널당 시간이 늘어납니다.
+"""
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Optional
+from sqlmodel import Session
+from app.config import settings
+from app.core.database import engine
+from app.core.models import Influencer
+from app.core.profiling import run_in_profile
+from app.core.tracing import span
+from app.schemas.roi import WeightConfig
+from app.services.score_service import score_service
+
+class CompareService:
+    """여러 채널 비교 분석 엔진"""
+
+    def compare_channels(
+        self,
+        project_id: str,
+        channel_ids: List[str],
+        weights: Optional[WeightConfig] = None,
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """채널별 분석을 병렬로 실행하고 부분 결과와 채널별 소요 시간을 반환
+
+        각 채널의 브랜드/감성/ROI 점수는 정확히 한 번만 계산되며,
+        제한 시간 안에 끝나지 않은 채널은 pending_channels로 보고됩니다.
+        대기 중이던 채널은 취소되고, 이미 실행 중인 채널은 다음 구성요소 계산 전에 제한 시간을 확인해 멈춥니다.
+        """
+        weights = weights or WeightConfig()
+        timeout = settings.COMPARE_TIMEOUT_SECONDS if timeout is None else timeout
+
+        # 중복 채널 제거 (요청 순서 유지)
+        unique_channel_ids = list(dict.fromkeys(channel_ids))
+
+        started = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(len(unique_channel_ids), settings.COMPARE_MAX_WORKERS)),
+            thread_name_prefix="compare"
+        )
+        # 실행 스레드에서도 요청 트레이스에 span이 이어지도록 채널마다 컨텍스트를 복사해 실행
+        # (프로파일링 중인 요청이면 실행 스레드도 샘플링 대상으로 등록)
+        futures = {
+            executor.submit(
+                contextvars.copy_context().run, run_in_profile,
+                self._analyze_channel, project_id, channel_id, weights, deadline
+            ): channel_id
+            for channel_id in unique_channel_ids
+        }
+        done, not_done = wait(futures, timeout=timeout)
+        # 대기 중인 채널은 취소, 실행 중인 채널은 deadline을 보고 스스로 멈춤 (응답은 기다리지 않음)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        results = []
+        failed = []
+        for future in done:
+            channel_id = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failed.append({"channel_id": channel_id, "error": getattr(e, "detail", None) or str(e)})
+
+        pending = [futures[future] for future in not_done]
+
+        # 요청 순서대로 정렬
+        order = {channel_id: i for i, channel_id in enumerate(unique_channel_ids)}
+        results.sort(key=lambda x: order[x["channel_id"]])
+        failed.sort(key=lambda x: order[x["channel_id"]])
+        pending.sort(key=lambda x: order[x])
+
+        return {
+            "results": results,
+            "failed_channels": failed,
+            "pending_channels": pending,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def _analyze_channel(self, project_id: str, channel_id: str, weights: WeightConfig, deadline: float) -> Dict:
+        """단일 채널 분석 (스레드마다 별도 세션 사용, deadline이 지나면 남은 계산을 건너뜀)"""
+        started = time.perf_counter()
+
+        with span("compare_service.analyze_channel", channel_id=channel_id), Session(engine) as session:
+            components = score_service.compute_components(session, project_id, channel_id, deadline=deadline)
+            total_result = score_service.compose_total_score(components, weights)
+            influencer = session.get(Influencer, channel_id)
+
+            return {
+                "channel_id": channel_id,
+                "channel_name": influencer.title if influencer else "Unknown",
+                "subscriber_count": influencer.subscriber_count if influencer else 0,
+                "brand_score": components.brand.score,
+                "sentiment_score": components.sentiment.score,
+                "roi_score": components.roi.score,
+                "total_score": total_result.total_score,
+                "grade": total_result.grade,
+                "recommendation": total_result.recommendation,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            }
+
+# 서비스 인스턴스
+compare_service = CompareService()
@@ -0,0 +1,166 @@
+"""
+홈 피드 응답 캐시 - 직렬화된 응답 보관 + stale-while-revalidate + ETag/304
+
+크롤러(별도 프로세스)는 커밋 후 bump_data_version()으로 버전 파일을 갱신하고,
+API 프로세스는 버전이 바뀌거나 HOME_FEED_TTL_SECONDS가 지나면 이전 응답을 그대로 주면서
+백그라운드에서 다시 만듭니다.
+"""
+import hashlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Hashable, List, Optional
+from fastapi import Request, Response
+from sqlmodel import Session
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.database import engine
+from app.core.responses import dumps
+
+# 버전 파일 확인 주기 (요청마다 stat하지 않도록)
+VERSION_CHECK_INTERVAL = 1.0
+
+def bump_data_version() -> None:
+    """채널 데이터가 바뀌었음을 API 프로세스에 알림 (크롤러 커밋 후 호출)"""
+    path = Path(settings.HOME_FEED_VERSION_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(str(time.time_ns()))
+    os.replace(tmp_path, path)
+
+class FeedEntry:
+    """직렬화된 응답 (항목별 JSON + 전체 본문 + ETag)"""
+
+    __slots__ = ("items", "body", "etag", "built_at", "data_version", "builder")
+
+    def __init__(self, items: List[bytes], data_version: Optional[str], builder: Callable):
+        self.items = items
+        self.body = b"[" + b",".join(items) + b"]"
+        self.etag = make_etag(self.body)
+        self.built_at = time.monotonic()
+        self.data_version = data_version
+        self.builder = builder
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+class FeedCache:
+    """(엔드포인트, 파라미터) 키별 직렬화 응답 캐시"""
+
+    def __init__(self):
+        self._entries = TTLCache(maxsize=settings.HOME_FEED_MAX_ENTRIES, name="home_feed")
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self._refreshing = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._data_version: Optional[str] = None
+        self._version_checked_at = 0.0
+
+    def respond(
+        self,
+        request: Request,
+        key: Hashable,
+        builder: Callable[[Session], list],
+        sample: Optional[int] = None
+    ) -> Response:
+        """캐시된 응답 반환 (If-None-Match 일치 시 304)
+
+        sample이 주어지면 캐시된 항목 풀에서 매 요청 sample개를 무작위로 골라 응답합니다.
+        무작위 응답은 요청마다 본문이 달라 304가 맞을 일이 없으므로 ETag 없이 no-store로 보냅니다.
+        """
+        entry, status = self.get_entry(key, builder)
+
+        if sample is not None and sample < len(entry.items):
+            body = b"[" + b",".join(random.sample(entry.items, sample)) + b"]"
+            return Response(
+                content=body,
+                media_type="application/json",
+                headers={"Cache-Control": "no-store", "X-Cache": status}
+            )
+
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "X-Cache": status}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def get_entry(self, key: Hashable, builder: Callable[[Session], list]):
+        """(entry, HIT|STALE|MISS): 오래된 항목은 즉시 반환하고 백그라운드에서 갱신"""
+        data_version = self._current_data_version()
+        entry = self._entries.get(key)
+
+        if entry is None:
+            # 최초 요청: 같은 키의 동시 요청은 한 번만 빌드
+            with self._build_lock(key):
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._build(key, builder, data_version)
+                    with self._lock:
+                        self._build_locks.pop(key, None)
+                    return entry, "MISS"
+
+        expired = time.monotonic() - entry.built_at > settings.HOME_FEED_TTL_SECONDS
+        if expired or entry.data_version != data_version:
+            self._schedule_refresh(key, entry.builder)
+            return entry, "STALE"
+        return entry, "HIT"
+
+    def invalidate(self) -> int:
+        """전체 캐시 제거"""
+        return self._entries.invalidate()
+
+    def _build(self, key: Hashable, builder: Callable[[Session], list], data_version: Optional[str]) -> FeedEntry:
+        with Session(engine) as session:
+            rows = builder(session)
+        items = [dumps(row) for row in rows]
+        entry = FeedEntry(items, data_version, builder)
+        self._entries.set(key, entry)
+        return entry
+
+    def _schedule_refresh(self, key: Hashable, builder: Callable[[Session], list]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="feed-refresh")
+        self._executor.submit(self._refresh, key, builder)
+
+    def _refresh(self, key: Hashable, builder: Callable[[Session], list]) -> None:
+        try:
+            self._build(key, builder, self._current_data_version())
+        except Exception as e:
+            # 갱신 실패 시 이전 응답을 계속 제공
+            print(f"[Error] 홈 피드 캐시 갱신 실패 ({key}): {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _build_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            return self._build_locks.setdefault(key, threading.Lock())
+
+    def _current_data_version(self) -> Optional[str]:
+        """크롤러가 기록한 데이터 버전 (VERSION_CHECK_INTERVAL마다 확인)"""
+        now = time.monotonic()
+        if now - self._version_checked_at >= VERSION_CHECK_INTERVAL:
+            try:
+                self._data_version = str(os.stat(settings.HOME_FEED_VERSION_FILE).st_mtime_ns)
+            except FileNotFoundError:
+                self._data_version = None
+            self._version_checked_at = now
+        return self._data_version
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더와 ETag 비교 (약한 비교, * 지원)"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+# 전역 인스턴스
+feed_cache = FeedCache()
@@ -0,0 +1,408 @@
+"""
+프로젝트 분석 작업 큐 서비스 - SQLite 기반 작업 테이블 + 청크 단위 처리/재개
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import update
+from sqlmodel import Session, select, func
+from app.config import settings
+from app.core.database import engine
+from app.core.models import AnalysisJob, Influencer, Project
+from app.core.tracing import trace_root
+from app.services.score_service import score_service
+from app.services.shard_scoring import ShardRunner, new_shard_metrics
+
+ACTIVE_STATUSES = ("queued", "running")
+
+class JobCancelled(Exception):
+    """작업 취소 요청 감지"""
+
+class JobLost(Exception):
+    """작업 소유권 상실 (heartbeat가 늦어 재대기열에 들어간 뒤 다른 워커가 가져감)"""
+
+class JobHeartbeat(threading.Thread):
+    """점수 계산 중에도 JOB_HEARTBEAT_INTERVAL마다 heartbeat 갱신 (별도 세션)
+
+    첫 청크의 모델 로딩처럼 청크 하나가 JOB_STALE_SECONDS보다 오래 걸려도 다른 워커가
+    작업을 재대기열에 넣지 않도록 합니다. 소유권을 잃으면 lost를 설정하고 종료합니다.
+    """
+
+    def __init__(self, service: "JobService", job_id: str):
+        super().__init__(name=f"job-heartbeat-{job_id}", daemon=True)
+        self.service = service
+        self.job_id = job_id
+        self.lost = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(settings.JOB_HEARTBEAT_INTERVAL):
+            try:
+                with Session(engine) as session:
+                    owned = self.service._beat(session, self.job_id)
+            except Exception as e:
+                # 쓰기 잠금 대기 시간 초과 등은 다음 주기에 재시도
+                print(f"[Error] 작업 heartbeat 갱신 실패 ({self.job_id}): {e}")
+                continue
+            if not owned:
+                self.lost.set()
+                return
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+class JobService:
+    """프로젝트 분석 작업 큐 관리"""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def enqueue(self, session: Session, project_id: str) -> AnalysisJob:
+        """분석 작업 등록 (이미 대기/실행 중인 작업이 있으면 그대로 반환)"""
+        active_job = self.get_active_job(session, project_id)
+        if active_job:
+            return active_job
+
+        shortlist = self._shortlist(session, project_id)
+        if shortlist is not None:
+            total = len(shortlist)
+        else:
+            total = session.exec(select(func.count()).select_from(Influencer)).one()
+        job = AnalysisJob(
+            job_id=str(uuid.uuid4()),
+            project_id=project_id,
+            total=total,
+            chunk_size=settings.ANALYSIS_CHUNK_SIZE,
+            channel_ids=json.dumps(shortlist) if shortlist is not None else None
+        )
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job
+
+    def _shortlist(self, session: Session, project_id: str) -> Optional[List[str]]:
+        """ANALYSIS_SHORTLIST_SIZE > 0이면 ANN 후보 상위 N개 채널만 분석 (인덱스가 없으면 전체)"""
+        from app.services.candidate_service import candidate_service
+
+        if settings.ANALYSIS_SHORTLIST_SIZE <= 0 or not candidate_service.is_ready():
+            return None
+        project = session.get(Project, project_id)
+        if project is None:
+            return None
+        candidates = candidate_service.get_candidates(project, settings.ANALYSIS_SHORTLIST_SIZE)
+        return sorted(candidate["channel_id"] for candidate in candidates)
+
+    def get_active_job(self, session: Session, project_id: str) -> Optional[AnalysisJob]:
+        """대기/실행 중인 작업 조회"""
+        return session.exec(
+            select(AnalysisJob).where(
+                AnalysisJob.project_id == project_id,
+                AnalysisJob.status.in_(ACTIVE_STATUSES)
+            ).order_by(AnalysisJob.created_at.desc())
+        ).first()
+
+    def get_latest_job(self, session: Session, project_id: str) -> Optional[AnalysisJob]:
+        """가장 최근 작업 조회"""
+        return session.exec(
+            select(AnalysisJob)
+            .where(AnalysisJob.project_id == project_id)
+            .order_by(AnalysisJob.created_at.desc())
+        ).first()
+
+    def request_cancel(self, session: Session, project_id: str) -> Optional[AnalysisJob]:
+        """작업 취소 요청 (대기 중이면 즉시 취소, 실행 중이면 다음 청크 경계에서 중단)"""
+        job = self.get_active_job(session, project_id)
+        if not job:
+            return None
+
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = datetime.now()
+        job.cancel_requested = True
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job
+
+    def claim_next(self) -> Optional[str]:
+        """대기 중인 작업 하나를 원자적으로 선점"""
+        with Session(engine) as session:
+            job_id = session.exec(
+                select(AnalysisJob.job_id)
+                .where(AnalysisJob.status == "queued")
+                .order_by(AnalysisJob.created_at)
+            ).first()
+            if job_id is None:
+                return None
+            return job_id if self._claim(session, job_id) else None
+
+    def requeue_stale(self) -> int:
+        """heartbeat가 끊긴 실행 중 작업을 대기열로 되돌림 (마지막 커밋 청크부터 재개)"""
+        threshold = datetime.now() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+        with Session(engine) as session:
+            result = session.exec(
+                update(AnalysisJob)
+                .where(AnalysisJob.status == "running", AnalysisJob.heartbeat_at < threshold)
+                .values(status="queued", worker_id=None)
+            )
+            session.commit()
+            return result.rowcount
+
+    def run_job(self, job_id: str) -> None:
+        """작업 실행: cursor 이후 채널을 청크 단위로 점수 계산 + upsert + 진행 상황 커밋"""
+        with Session(engine) as session:
+            job = session.get(AnalysisJob, job_id)
+            if job is None:
+                return
+            if job.status == "queued" and not self._claim(session, job_id):
+                return
+            session.refresh(job)
+            if job.status != "running" or job.worker_id != self.worker_id:
+                return
+
+            project = session.get(Project, job.project_id)
+            if project is None:
+                self._finish(session, job_id, "failed", error="프로젝트를 찾을 수 없습니다")
+                return
+
+            try:
+                if settings.ANALYSIS_WORKERS > 1:
+                    self._run_sharded(session, job_id, project)
+                else:
+                    self._run_chunks(session, job_id, project)
+
+                if session.get(AnalysisJob, job_id) is not None:
+                    self._finish(session, job_id, "completed")
+
+            except JobCancelled:
+                session.rollback()
+                self._finish(session, job_id, "cancelled")
+            except JobLost:
+                # 새 소유 워커가 마지막 커밋 청크부터 이어서 처리하므로 상태를 건드리지 않음
+                session.rollback()
+                print(f"[Worker] 작업 소유권 상실, 중단: {job_id}")
+            except Exception as e:
+                session.rollback()
+                print(f"[Error] 분석 작업 실패 ({job_id}): {e}")
+                self._finish(session, job_id, "failed", error=str(e))
+
+    def _run_chunks(self, session: Session, job_id: str, project: Project) -> None:
+        """단일 프로세스 모드: cursor 이후 채널을 청크 단위로 처리"""
+        heartbeat = JobHeartbeat(self, job_id)
+        heartbeat.start()
+        try:
+            self._process_chunks(session, job_id, project, heartbeat)
+        finally:
+            heartbeat.stop()
+
+    def _process_chunks(self, session: Session, job_id: str, project: Project, heartbeat: JobHeartbeat) -> None:
+        while True:
+            job = self._refresh_job(session, job_id)
+            if job is None:
+                return
+
+            # 재개 지점(cursor) 이후 다음 청크 조회 (channel_id 순 keyset 페이지네이션)
+            query = select(Influencer).order_by(Influencer.channel_id).limit(job.chunk_size)
+            if job.channel_ids:
+                query = query.where(Influencer.channel_id.in_(json.loads(job.channel_ids)))
+            if job.cursor:
+                query = query.where(Influencer.channel_id > job.cursor)
+            influencers = session.exec(query).all()
+            if not influencers:
+                return
+
+            # 청크마다 트레이스 하나 (작업 전체를 한 트레이스로 묶으면 span 수 상한에 금방 걸림)
+            with trace_root("job_service.run_chunk", job_id=job_id, channels=len(influencers)):
+                rows = []
+                failed = 0
+                for influencer in influencers:
+                    if heartbeat.lost.is_set():
+                        raise JobLost()
+                    try:
+                        rows.append(score_service.score_row(session, project, influencer))
+                    except Exception as e:
+                        print(f"Error analyzing influencer {influencer.channel_id}: {e}")
+                        failed += 1
+
+                # 결과 upsert와 진행 상황 갱신을 한 트랜잭션으로 커밋 → 재개 시 중복/누락 없음
+                # (진행 상황은 소유 워커일 때만 갱신되고, 아니면 upsert까지 롤백)
+                score_service.upsert_results(session, rows)
+                self._commit_progress(
+                    session, job_id,
+                    cursor=influencers[-1].channel_id,
+                    processed=AnalysisJob.processed + len(influencers),
+                    failed=AnalysisJob.failed + failed
+                )
+
+    def _run_sharded(self, session: Session, job_id: str, project: Project) -> None:
+        """멀티 프로세스 모드: channel_id 해시로 샤딩해 N개 프로세스가 점수 계산,
+        현재 프로세스가 단일 writer로 결과를 일괄 upsert"""
+        job = self._refresh_job(session, job_id)
+        if job is None:
+            return
+
+        state = json.loads(job.shard_state) if job.shard_state else {}
+        # 재개 시 샤드별 cursor가 유효하도록 최초 샤드 수를 유지
+        num_shards = state.get("num_shards") or settings.ANALYSIS_WORKERS
+        shards = state.get("shards") or {str(i): new_shard_metrics() for i in range(num_shards)}
+
+        runner = ShardRunner(
+            project_id=project.project_id,
+            num_shards=num_shards,
+            chunk_size=job.chunk_size,
+            channel_ids=json.loads(job.channel_ids) if job.channel_ids else None,
+            cursors={int(shard): metrics["cursor"] for shard, metrics in shards.items()}
+        )
+        runner.start()
+        last_beat = time.monotonic()
+        try:
+            for message in runner.messages():
+                if message["type"] in ("ready", "heartbeat", "tick"):
+                    # 모델 로딩/청크 계산 중이거나 메시지를 기다리는 동안에도 heartbeat 유지
+                    if time.monotonic() - last_beat >= settings.JOB_HEARTBEAT_INTERVAL:
+                        if self._refresh_job(session, job_id) is None:
+                            return
+                        if not self._beat(session, job_id):
+                            raise JobLost()
+                        last_beat = time.monotonic()
+                    continue
+
+                shard = str(message["shard"])
+                metrics = shards[shard]
+                processed = failed = 0
+
+                if message["type"] == "chunk":
+                    if self._refresh_job(session, job_id) is None:
+                        return
+
+                    score_service.upsert_results(session, message["rows"])
+                    metrics["cursor"] = message["cursor"]
+                    metrics["processed"] += message["processed"]
+                    metrics["failed"] += message["failed"]
+                    metrics["busy_seconds"] = round(metrics["busy_seconds"] + message["elapsed"], 3)
+                    if metrics["busy_seconds"] > 0:
+                        metrics["throughput_per_sec"] = round(metrics["processed"] / metrics["busy_seconds"], 2)
+                    processed, failed = message["processed"], message["failed"]
+                elif message["type"] == "done":
+                    metrics["done"] = True
+                elif message["type"] == "error":
+                    raise RuntimeError(f"샤드 {shard} 실패: {message['error']}")
+
+                # 결과 upsert, 샤드 cursor, 진행 상황을 한 트랜잭션으로 커밋 (소유 워커일 때만)
+                self._commit_progress(
+                    session, job_id,
+                    shard_state=json.dumps({"num_shards": num_shards, "shards": shards}),
+                    processed=AnalysisJob.processed + processed,
+                    failed=AnalysisJob.failed + failed
+                )
+                last_beat = time.monotonic()
+        finally:
+            runner.stop()
+
+    def _owned(self, job_id: str):
+        """이 워커가 실행 중인 작업 조건 (조건부 UPDATE용)"""
+        return (
+            AnalysisJob.job_id == job_id,
+            AnalysisJob.worker_id == self.worker_id,
+            AnalysisJob.status == "running"
+        )
+
+    def _beat(self, session: Session, job_id: str) -> bool:
+        """heartbeat 갱신 (소유권을 잃었으면 False)"""
+        result = session.exec(
+            update(AnalysisJob).where(*self._owned(job_id)).values(heartbeat_at=datetime.now())
+        )
+        session.commit()
+        return result.rowcount == 1
+
+    def _commit_progress(self, session: Session, job_id: str, **values) -> None:
+        """진행 상황 + heartbeat를 소유 워커 조건으로 갱신하고 커밋 (소유권을 잃었으면 롤백 후 JobLost)"""
+        result = session.exec(
+            update(AnalysisJob).where(*self._owned(job_id)).values(heartbeat_at=datetime.now(), **values)
+        )
+        if result.rowcount != 1:
+            session.rollback()
+            raise JobLost()
+        session.commit()
+
+    def _refresh_job(self, session: Session, job_id: str) -> Optional[AnalysisJob]:
+        """작업 상태 재조회 (삭제됐으면 None, 취소 요청이면 JobCancelled)"""
+        session.expire_all()
+        job = session.get(AnalysisJob, job_id)
+        if job is None or session.get(Project, job.project_id) is None:
+            # 실행 중 프로젝트가 삭제됨
+            return None
+        if job.cancel_requested:
+            raise JobCancelled()
+        return job
+
+    def get_status(self, job: AnalysisJob) -> Dict:
+        """진행률, 처리량(채널/초), 예상 남은 시간 계산"""
+        progress = job.processed / job.total if job.total else (1.0 if job.status == "completed" else 0.0)
+
+        throughput = None
+        eta_seconds = None
+        if job.started_at:
+            end = job.finished_at or datetime.now()
+            elapsed = (end - job.started_at).total_seconds()
+            processed_this_run = job.processed - job.run_processed_start
+            if elapsed > 0 and processed_this_run > 0:
+                throughput = processed_this_run / elapsed
+                if job.status == "running":
+                    eta_seconds = max(0, job.total - job.processed) / throughput
+
+        return {
+            "project_id": job.project_id,
+            "job_id": job.job_id,
+            "status": job.status,
+            "total": job.total,
+            "processed": job.processed,
+            "failed": job.failed,
+            "progress": round(min(1.0, progress), 4),
+            "throughput_per_sec": round(throughput, 2) if throughput else None,
+            "eta_seconds": round(eta_seconds, 1) if eta_seconds is not None else None,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "error": job.error,
+            "shards": [
+                {"shard": int(shard), **metrics}
+                for shard, metrics in json.loads(job.shard_state)["shards"].items()
+            ] if job.shard_state else None
+        }
+
+    def _claim(self, session: Session, job_id: str) -> bool:
+        """조건부 UPDATE로 작업 선점 (다른 워커가 먼저 가져갔으면 False)"""
+        now = datetime.now()
+        result = session.exec(
+            update(AnalysisJob)
+            .where(AnalysisJob.job_id == job_id, AnalysisJob.status == "queued")
+            .values(
+                status="running",
+                worker_id=self.worker_id,
+                started_at=now,
+                heartbeat_at=now,
+                run_processed_start=AnalysisJob.processed
+            )
+        )
+        session.commit()
+        return result.rowcount == 1
+
+    def _finish(self, session: Session, job_id: str, status: str, error: Optional[str] = None) -> None:
+        """작업 종료 상태 기록 (이 워커가 소유한 실행 중 작업만)"""
+        now = datetime.now()
+        session.exec(
+            update(AnalysisJob)
+            .where(*self._owned(job_id))
+            .values(status=status, error=error, finished_at=now, heartbeat_at=now)
+        )
+        session.commit()
+
+# 서비스 인스턴스
+job_service = JobService()
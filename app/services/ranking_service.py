@@ -0,0 +1,144 @@
+"""
+프로젝트 결과 순위 서비스 - 원점수 순위만으로 S-Curve 상대평가 점수 계산, 대용량 결과 스트리밍
+"""
+import csv
+import io
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import text
+from sqlmodel import Session
+from app.config import settings
+from app.core.database import engine
+from app.core.responses import dumps
+
+# 상대평가 목표 점수 범위 (1등: 92점 ~ 꼴등: 53점)
+CURVE_MAX_SCORE = 92.0
+CURVE_MIN_SCORE = 53.0
+
+# 내보내기 컬럼 (CSV 헤더 순서)
+EXPORT_COLUMNS = [
+    "rank", "channel_id", "title", "subscriber_count", "thumbnail_url", "category", "engagement_rate",
+    "estimated_price", "raw_score", "total_score", "grade",
+    "brand_score", "sentiment_score", "roi_estimate_score"
+]
+
+# 순위 기준: 원점수 내림차순, 동점은 저장 순서
+# (project_id, roi_score DESC) 인덱스 항목이 rowid(id) 오름차순으로 이어지므로 정렬 없이 인덱스 순서로 읽힘
+_RANK_WINDOW = "row_number() OVER (ORDER BY r.roi_score DESC, r.id)"
+
+_RESULT_COLUMNS = """
+    r.channel_id, i.title, i.subscriber_count, i.thumbnail_url, i.category, i.engagement_rate,
+    i.estimated_price, r.roi_score AS raw_score, r.brand_score, r.sentiment_score, r.roi_estimate_score
+"""
+
+# 전체 순위: 인덱스 순서로 읽으면서 순위를 매기므로 임시 정렬 없이 스트리밍
+# 바깥 정렬은 윈도와 같은 키로 지정해 순서를 보장 (ORDER BY rank는 계산된 열이라 임시 B-tree 정렬이 생김,
+# EXPLAIN QUERY PLAN에서 USE TEMP B-TREE가 없는지 확인)
+_RANKED_ROWS = f"""
+    SELECT {_RANK_WINDOW} - 1 AS rank, {_RESULT_COLUMNS}
+    FROM projectresult r JOIN influencer i ON i.channel_id = r.channel_id
+    WHERE r.project_id = :project_id
+    ORDER BY r.roi_score DESC, r.id
+"""
+
+# 순위 구간 (top-k/offset): 같은 스트리밍 순위에서 구간만 잘라냄 (offset + limit 행까지만 읽고 멈춤)
+_RANKED_PAGE = _RANKED_ROWS + "    LIMIT :limit OFFSET :offset\n"
+
+# 전체 수: 순위 조회와 같은 조인으로 세어 채널 정보가 없는 결과는 제외 (양쪽 모두 커버링 인덱스만 읽음)
+_COUNT_ROWS = """
+    SELECT count(*)
+    FROM projectresult r JOIN influencer i ON i.channel_id = r.channel_id
+    WHERE r.project_id = :project_id
+"""
+
+class RankingService:
+    """프로젝트 결과 순위/상대평가 점수 (S-Curve 점수 계산은 이 모듈에서만)"""
+
+    @staticmethod
+    def curved_score(rank: int, total_count: int) -> float:
+        """0부터 시작하는 순위와 전체 수로 계산한 S-Curve 점수
+
+        코사인 곡선으로 상위/하위권 변별력을 높이고 중위권을 두텁게 배치합니다.
+        """
+        percentile = rank / max(1, total_count - 1)
+        curve_factor = (math.cos(percentile * math.pi) + 1) / 2
+        return CURVE_MIN_SCORE + curve_factor * (CURVE_MAX_SCORE - CURVE_MIN_SCORE)
+
+    def count(self, connection, project_id: str) -> int:
+        """순위에 포함되는 프로젝트 결과 수 (인덱스만 읽음)"""
+        return connection.execute(text(_COUNT_ROWS), {"project_id": project_id}).scalar() or 0
+
+    def get_ranked_page(
+        self,
+        session: Session,
+        project_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Tuple[int, List[Dict]]:
+        """(전체 수, 순위 구간 행): 상위 limit개(offset부터)만 DB에서 읽음 (limit 없으면 전체)"""
+        connection = session.connection()
+        total_count = self.count(connection, project_id)
+        rows = connection.execute(
+            text(_RANKED_PAGE),
+            {"project_id": project_id, "limit": -1 if limit is None else limit, "offset": offset}
+        ).all()
+        return total_count, [self._to_row(row, total_count) for row in rows]
+
+    def iter_ranked_rows(self, project_id: str, batch_size: int = 0) -> Iterator[List[Dict]]:
+        """순위가 매겨진 결과 행을 batch_size개씩 반환 (전체 목록을 메모리에 올리지 않음)
+
+        전체 수 조회와 행 조회를 한 트랜잭션(같은 스냅샷)에서 실행해 순위가 어긋나지 않게 하고,
+        행은 stream_results 커서에서 배치 단위로 읽습니다.
+        """
+        batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+
+        with engine.connect() as connection:
+            total_count = self.count(connection, project_id)
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(
+                text(_RANKED_ROWS), {"project_id": project_id}
+            )
+            for partition in result.partitions():
+                yield [self._to_row(row, total_count) for row in partition]
+
+    def _to_row(self, row, total_count: int) -> Dict:
+        """DB 행 + 순위 기반 상대평가 점수/등급"""
+        from app.services.roi_service import roi_service
+
+        score = self.curved_score(row.rank, total_count)
+        return {
+            "rank": row.rank + 1,
+            "channel_id": row.channel_id,
+            "title": row.title,
+            "subscriber_count": row.subscriber_count,
+            "thumbnail_url": row.thumbnail_url,
+            "category": row.category or "미분류",
+            "engagement_rate": row.engagement_rate,
+            "estimated_price": row.estimated_price or "가격 문의",
+            "raw_score": row.raw_score,
+            "total_score": round(score, 2),
+            "grade": roi_service.calculate_grade(score),
+            "brand_score": row.brand_score,
+            "sentiment_score": row.sentiment_score,
+            "roi_estimate_score": row.roi_estimate_score
+        }
+
+    def export_ndjson(self, project_id: str) -> Iterator[bytes]:
+        """한 줄에 한 채널씩 JSON (배치 단위로 전송)"""
+        for batch in self.iter_ranked_rows(project_id):
+            yield b"".join(dumps(row) + b"\n" for row in batch)
+
+    def export_csv(self, project_id: str) -> Iterator[bytes]:
+        """CSV (엑셀에서 한글이 깨지지 않도록 UTF-8 BOM 포함)"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+        for batch in self.iter_ranked_rows(project_id):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(batch)
+            yield buffer.getvalue().encode("utf-8")
+
+# 서비스 인스턴스
+ranking_service = RankingService()
@@ -1,17 +1,31 @@
 """
 ROI 분석 서비스
 """
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from app.ml import calculate_sentiment_score
 from app.schemas.roi import SentimentScore, ROIEstimate, TotalScore, WeightConfig
 
 class ROIService:
     """ROI 분석 관련 서비스"""
     
-    def analyze_sentiment(self, channel_id: str, comments: List[str]) -> SentimentScore:
-        """감성 분석 수행 - 극단적 점수 차별화"""
-        sentiment_data = calculate_sentiment_score(comments)
-        
+    def analyze_sentiment(
+        self,
+        channel_id: str,
+        comments: List[str],
+        weights: Optional[List[int]] = None
+    ) -> SentimentScore:
+        """감성 분석 수행 - 극단적 점수 차별화
+
+        weights가 있으면 comments는 유사 댓글 클러스터 대표 텍스트이고 비율은 클러스터 크기로 가중합니다.
+        """
+        sentiment_data = calculate_sentiment_score(comments, weights)
+        return self.score_sentiment(channel_id, sentiment_data, distinct_comments=len(comments))
+
+    def score_sentiment(self, channel_id: str, sentiment_data: Dict, distinct_comments: int) -> SentimentScore:
+        """감성 비율 집계 결과로 점수 계산
+
+        댓글 수 보너스는 서로 다른 댓글(클러스터) 수 기준이라 복사 댓글로 부풀려지지 않습니다.
+        """
         # 기본 점수를 더 극단적으로 조정
         base_score = sentiment_data["score"]
         
@@ -22,7 +36,7 @@ class ROIService:
         negative_penalty = sentiment_data["negative_ratio"] * 60
         
         # 댓글 수 보너스 확대 (최대 20점)
-        comment_bonus = min(20, len(comments) / 5)
+        comment_bonus = min(20, distinct_comments / 5)
         
         # 채널별 카테고리 보너스 (뷰티/패션/요리 등)
         category_bonus = 0
@@ -40,7 +54,11 @@ class ROIService:
             positive_ratio=sentiment_data["positive_ratio"],
             negative_ratio=sentiment_data["negative_ratio"],
             neutral_ratio=sentiment_data["neutral_ratio"],
-            total_comments=sentiment_data["total_comments"]
+            total_comments=sentiment_data["total_comments"],
+            positive_ratio_low=sentiment_data.get("positive_ratio_low"),
+            positive_ratio_high=sentiment_data.get("positive_ratio_high"),
+            sampled_comments=sentiment_data.get("sampled_comments"),
+            like_weighted_positive_ratio=sentiment_data.get("like_weighted_positive_ratio")
         )
     
     def estimate_roi(
@@ -48,10 +66,11 @@ class ROIService:
         channel_id: str,
         subscriber_count: int,
         avg_views: int,
-        engagement_rate: float
+        engagement_rate: float,
+        growth_rate: Optional[float] = None
     ) -> ROIEstimate:
         """
-        ROI 추정 계산
+        ROI 추정 계산 (growth_rate: 30일 환산 구독자 증가율 %, 없으면 반영하지 않음)
         """
         
         # 1. 예상 조회수: 실제 데이터(avg_views)가 있으면 우선 사용, 없으면 추정
@@ -69,16 +88,7 @@ class ROIService:
                 estimated_views = int(subscriber_count * 0.30)
         
         # 2. 예상 비용 계산 
-        if subscriber_count < 10000:
-            cost_per_10k_subs = 5
-        elif subscriber_count < 100000:
-            cost_per_10k_subs = 8
-        elif subscriber_count < 1000000:
-            cost_per_10k_subs = 12
-        else:
-            cost_per_10k_subs = 20
-            
-        estimated_cost_value = (subscriber_count / 10000) * cost_per_10k_subs * 10000
+        estimated_cost_value, cost_per_10k_subs = self.estimate_cost(subscriber_count)
         estimated_cost = self._format_cost(estimated_cost_value)
         
         # 총합 100점 만점 구성
@@ -111,6 +121,12 @@ class ROIService:
             subscriber_score = min(20, max(0, (log_subs - 3) / (6 - 3) * 20))
 
         roi_score = engagement_score + view_ratio_score + subscriber_score
+
+        # 4. 성장률 보정 (±10점)
+        # 30일 구독자 증가율 5% 이상이면 +10점, 감소 채널은 같은 비율로 감점
+        if growth_rate is not None:
+            target_growth = 5.0
+            roi_score = max(0, min(100, roi_score + max(-10, min(10, growth_rate / target_growth * 10))))
         
         # 예상 참여율 (단순 표시용)
         estimated_engagement = min(engagement_rate * 1.1, 10.0)
@@ -120,9 +136,22 @@ class ROIService:
             estimated_views=estimated_views,
             estimated_engagement=round(estimated_engagement, 2),
             estimated_cost=estimated_cost,
-            cpm=cost_per_10k_subs
+            cpm=cost_per_10k_subs,
+            growth_rate=growth_rate
         )
     
+    def estimate_cost(self, subscriber_count: int) -> Tuple[float, int]:
+        """구독자 수별 차등 협찬비 (원, 구독자 1만명당 단가(만원))"""
+        if subscriber_count < 10000:
+            cost_per_10k_subs = 5
+        elif subscriber_count < 100000:
+            cost_per_10k_subs = 8
+        elif subscriber_count < 1000000:
+            cost_per_10k_subs = 12
+        else:
+            cost_per_10k_subs = 20
+        return (subscriber_count / 10000) * cost_per_10k_subs * 10000, cost_per_10k_subs
+
     def calculate_total_score(
         self,
         brand_score: float,
@@ -151,47 +180,30 @@ class ROIService:
             weights_used=weights
         )
     def apply_relative_distribution(self, results: List[TotalScore]) -> List[TotalScore]:
-        """ 49명 전체 데이터를 받아 S~D 등급으로 강제 배분"""
-        import math
+        """ 49명 전체 데이터를 받아 S~D 등급으로 강제 배분 (순위 기반 S-Curve 점수)"""
+        from app.services.ranking_service import ranking_service
 
         if not results:
             return []
 
         # 1. 원점수(raw_score) 기준 1등부터 꼴등까지 정렬
-        # 점수가 높은 순서대로 줄을 세웁니다.
         sorted_results = sorted(results, key=lambda x: x.total_score, reverse=True)
-        
         total_count = len(sorted_results)
         final_results = []
 
-        # 2. 목표 점수 범위 설정 (92점 ~ 53점)
-        MAX_SCORE = 92.0
-        MIN_SCORE = 53.0
-
         for rank, item in enumerate(sorted_results):
-            # 상위 몇 %인지 계산 (0.0 = 1등, 1.0 = 꼴등)
-            percentile = rank / max(1, total_count - 1)
-
-            # [S-Curve 보정] 상위권/하위권 변별력 강화, 중위권은 두텁게
-            # 코사인 함수를 써서 부드러운 곡선으로 점수를 배분합니다.
-            curve_factor = (math.cos(percentile * math.pi) + 1) / 2
-            
-            # 최종 점수 확정
-            final_score = MIN_SCORE + (curve_factor * (MAX_SCORE - MIN_SCORE))
-            
-            # 확정된 점수로 등급과 추천사 다시 계산
-            new_grade = self._calculate_grade(final_score)
+            # 2. 순위와 전체 수로 최종 점수 확정 후 등급과 추천사 다시 계산
+            final_score = ranking_service.curved_score(rank, total_count)
+            new_grade = self.calculate_grade(final_score)
             new_recommendation = self._generate_recommendation(final_score, new_grade)
 
-            # 결과 업데이트
             # Pydantic 모델의 불변성(immutable)을 고려해 새로 생성
-            updated_item = TotalScore(
+            final_results.append(TotalScore(
                 total_score=round(final_score, 2),
                 grade=new_grade,
                 recommendation=new_recommendation,
                 weights_used=item.weights_used
-            )
-            final_results.append(updated_item)
+            ))
 
         return final_results
     
@@ -211,8 +223,8 @@ class ROIService:
         else:
             return f"{int(cost/100000000)}억원"
     
-    def _calculate_grade(self, score: float) -> str:
-        """점수를 등급으로 변환"""
+    def calculate_grade(self, score: float) -> str:
+        """점수를 등급으로 변환 (S/A/B/C/D, 라우트와 다른 서비스에서도 사용)"""
         if score >= 90:
             return "S"
         elif score >= 80:
@@ -0,0 +1,347 @@
+"""
+종합 점수 계산 서비스 - 구성요소 점수 산출 및 가중치 평가
+"""
+import time
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.models import ChannelStats, Influencer, Project, ProjectResult, Video
+from app.core.tracing import traced
+from app.ml import model_manager, load_image_from_url
+from app.schemas.roi import (
+    WeightConfig, ComponentScores, TotalScore,
+    BrandImageScore, SentimentScore, ROIEstimate
+)
+
+class ScoreService:
+    """브랜드/감성/ROI 구성요소 점수와 가중치 조합을 다루는 서비스"""
+
+    def __init__(self):
+        # 요청 간 공유 캐시: 키에 입력 버전(프로젝트/채널 갱신 시각, 모델 버전)이 포함되어
+        # 입력이 바뀌면 자연히 새 키로 계산됩니다. 크롤러는 별도 프로세스이므로 채널 갱신은
+        # last_updated 스탬프로만 반영되고, 프로젝트 무효화 훅은 오래된 항목을 즉시 비웁니다.
+        self._component_cache = TTLCache(
+            maxsize=settings.SCORE_CACHE_MAX_ENTRIES,
+            ttl=settings.SCORE_CACHE_TTL_SECONDS,
+            name="score_components"
+        )
+
+    @traced()
+    def compute_components(
+        self,
+        session: Session,
+        project_id: str,
+        channel_id: str,
+        deadline: Optional[float] = None
+    ) -> ComponentScores:
+        """(프로젝트, 채널) 조합의 구성요소 점수를 한 번만 계산
+
+        deadline(time.monotonic 기준)이 지나면 남은 구성요소를 계산하지 않고 TimeoutError를 냅니다.
+        """
+        project = session.get(Project, project_id)
+        if not project:
+            raise HTTPException(status_code=404, detail="프로젝트를 찾을 수 없습니다")
+
+        influencer = session.get(Influencer, channel_id)
+        if not influencer:
+            raise HTTPException(status_code=404, detail="채널을 찾을 수 없습니다")
+
+        scores = {}
+        for component in ("brand", "sentiment", "roi"):
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"제한 시간 초과로 {component} 점수 계산 중단")
+            scores[component] = self.get_component(session, project, influencer, component)
+        return ComponentScores(**scores)
+
+    @traced()
+    def get_component(self, session: Session, project: Project, influencer: Influencer, component: str):
+        """구성요소 점수 조회 (요청 단위 메모 → 요청 간 캐시 → 실제 계산 순)"""
+        key = self._component_key(project, influencer, component)
+
+        # 요청 단위 메모: 세션은 요청마다 새로 열리므로 세션 info에 보관
+        request_memo = session.info.setdefault("component_scores", {})
+        if key in request_memo:
+            return request_memo[key]
+
+        result = self._component_cache.get(key)
+        if result is None:
+            # 백그라운드 분석이 저장한 materialized 행이 최신이면 재사용
+            materialized = self.load_materialized(session, project, influencer)
+            if materialized is not None:
+                result = getattr(materialized, component)
+                self._component_cache.set(key, result)
+                request_memo[key] = result
+                return result
+
+            compute = {
+                "brand": self._compute_brand,
+                "sentiment": self._compute_sentiment,
+                "roi": self._compute_roi
+            }[component]
+            result = compute(session, project, influencer)
+            self._component_cache.set(key, result)
+
+        request_memo[key] = result
+        return result
+
+    def invalidate_project(self, project_id: str) -> int:
+        """프로젝트 수정/삭제 시 호출되는 무효화 훅"""
+        from app.services.brand_service import brand_service
+
+        brand_service.invalidate_project(project_id)
+        return self._component_cache.invalidate(lambda key: key[0] == project_id)
+
+    def load_materialized(self, session: Session, project: Project, influencer: Influencer) -> Optional[ComponentScores]:
+        """버전 스탬프가 현재 입력과 일치하는 materialized 구성요소 점수 조회"""
+        memo_key = ("materialized", project.project_id, influencer.channel_id)
+        request_memo = session.info.setdefault("component_scores", {})
+        if memo_key in request_memo:
+            return request_memo[memo_key]
+
+        project_version, channel_version, model_version = self.version_stamps(project, influencer)
+        row = session.exec(
+            select(ProjectResult).where(
+                ProjectResult.project_id == project.project_id,
+                ProjectResult.channel_id == influencer.channel_id
+            ).order_by(ProjectResult.computed_at.desc())
+        ).first()
+
+        components = None
+        if (
+            row is not None
+            and row.breakdown
+            and row.project_version == project_version
+            and row.channel_version == channel_version
+            and row.model_version == model_version
+        ):
+            try:
+                components = ComponentScores.model_validate_json(row.breakdown)
+            except ValueError as e:
+                print(f"[Error] materialized 점수 파싱 실패 ({project.project_id}/{influencer.channel_id}): {e}")
+
+        request_memo[memo_key] = components
+        return components
+
+    def score_row(self, session: Session, project: Project, influencer: Influencer) -> Dict:
+        """ProjectResult 행 값 계산 (구성요소 점수 + 버전 스탬프)"""
+        components = ComponentScores(
+            brand=self.get_component(session, project, influencer, "brand"),
+            sentiment=self.get_component(session, project, influencer, "sentiment"),
+            roi=self.get_component(session, project, influencer, "roi")
+        )
+        total = self.compose_total_score(components)
+        project_version, channel_version, model_version = self.version_stamps(project, influencer)
+
+        return {
+            "project_id": project.project_id,
+            "channel_id": influencer.channel_id,
+            "roi_score": total.total_score,  # 원점수 (상대평가는 조회 시 적용)
+            "roi_grade": total.grade,
+            "brand_score": components.brand.score,
+            "text_score": components.brand.details.get("text_compatibility"),
+            "image_score": components.brand.details.get("image_similarity"),
+            "sentiment_score": components.sentiment.score,
+            "roi_estimate_score": components.roi.score,
+            "breakdown": components.model_dump_json(),
+            "project_version": project_version,
+            "channel_version": channel_version,
+            "model_version": model_version,
+            "computed_at": datetime.now()
+        }
+
+    def upsert_results(self, session: Session, rows: List[Dict]) -> None:
+        """(project_id, channel_id) 기준 일괄 upsert - 재실행해도 행이 중복되지 않음"""
+        if not rows:
+            return
+
+        statement = sqlite_insert(ProjectResult.__table__).values(rows)
+        update_columns = {
+            column: statement.excluded[column]
+            for column in rows[0]
+            if column not in ("project_id", "channel_id")
+        }
+        session.exec(statement.on_conflict_do_update(
+            index_elements=["project_id", "channel_id"],
+            set_=update_columns
+        ))
+
+    def version_stamps(self, project: Project, influencer: Influencer) -> Tuple[Optional[str], Optional[str], str]:
+        """입력 버전 스탬프: (프로젝트 버전, 채널 버전, 모델 버전)"""
+        return (
+            self.project_version(project),
+            influencer.last_updated.isoformat() if influencer.last_updated else None,
+            model_manager.version
+        )
+
+    def project_version(self, project: Project) -> Optional[str]:
+        """프로젝트 버전 스탬프 (브랜드 정보 수정 시각, 없으면 생성 시각)"""
+        project_stamp = project.updated_at or project.created_at
+        return project_stamp.isoformat() if project_stamp else None
+
+    def _component_key(self, project: Project, influencer: Influencer, component: str) -> tuple:
+        """캐시 키: (project_id, channel_id, 구성요소, 프로젝트 버전, 채널 버전, 모델 버전)"""
+        return (project.project_id, influencer.channel_id, component) + self.version_stamps(project, influencer)
+
+    @traced()
+    def _compute_brand(self, session: Session, project: Project, influencer: Influencer) -> BrandImageScore:
+        """브랜드 적합도 분석 (CLIP + 텍스트 분석)"""
+        from app.services.brand_service import brand_service
+
+        # 비디오 제목들 수집
+        videos = session.exec(
+            select(Video).where(Video.channel_id == influencer.channel_id)
+        ).all()
+        video_titles = [video.video_title for video in videos if video.video_title]
+
+        # 썸네일 이미지 로드 (유튜버 프로필 썸네일, 크롤러가 미리 받아둔 로컬 저장소에서만 읽음)
+        channel_thumbnails = []
+        if influencer.thumbnail_url:
+            try:
+                thumbnail_image = load_image_from_url(influencer.thumbnail_url)
+                if thumbnail_image:
+                    channel_thumbnails.append(thumbnail_image)
+            except Exception as e:
+                print(f"[Error] 썸네일 로드 실패: {e}")
+
+        return brand_service.analyze_brand_compatibility(
+            channel_id=influencer.channel_id,
+            brand_name=project.company_name,
+            brand_description=project.campaign_goal,
+            brand_tone=project.brand_tone,
+            brand_category=project.brand_categories,
+            brand_image_path=project.brand_image_path,
+            brand_image_embedding=brand_service.load_brand_embedding(project.brand_image_embedding),
+            channel_description=influencer.description or "",
+            channel_titles=video_titles,
+            channel_thumbnails=channel_thumbnails,
+            cache_key=(project.project_id, self.project_version(project))
+        )
+
+    @traced()
+    def _compute_sentiment(self, session: Session, project: Project, influencer: Influencer) -> SentimentScore:
+        """감성 분석 (실제 댓글 데이터 기반, 신뢰구간이 좁아질 때까지 표본 클러스터만 분석)"""
+        from app.services.comment_service import comment_service
+        from app.services.roi_service import roi_service
+
+        sentiment_data = comment_service.sample_sentiment(session, influencer.channel_id)
+
+        if not sentiment_data["total_comments"]:
+            # 댓글이 없으면 기본값
+            return SentimentScore(
+                score=65.0,
+                positive_ratio=0.60,
+                negative_ratio=0.25,
+                neutral_ratio=0.15,
+                total_comments=0
+            )
+
+        return roi_service.score_sentiment(
+            influencer.channel_id, sentiment_data, distinct_comments=sentiment_data["distinct_comments"]
+        )
+
+    @traced()
+    def _compute_roi(self, session: Session, project: Project, influencer: Influencer) -> ROIEstimate:
+        """ROI 추정 (참여율 기반, 예상 조회수는 채널 영상 집계의 최근 평균 조회수)"""
+        from app.services.roi_service import roi_service
+
+        # 집계가 없으면 0을 넘겨 구독자 수 기반 추정 사용
+        stats = session.get(ChannelStats, influencer.channel_id)
+        return roi_service.estimate_roi(
+            channel_id=influencer.channel_id,
+            subscriber_count=influencer.subscriber_count or 0,
+            avg_views=int(stats.avg_views) if stats and stats.avg_views else 0,
+            engagement_rate=influencer.engagement_rate or 1.0,
+            growth_rate=stats.subscriber_growth_30d if stats else None
+        )
+
+    def component_vector(self, components: ComponentScores) -> np.ndarray:
+        """구성요소 점수를 (brand, sentiment, roi) 순서의 벡터로 변환"""
+        return np.array(
+            [components.brand.score, components.sentiment.score, components.roi.score],
+            dtype=np.float64
+        )
+
+    def weight_matrix(self, weight_configs: List[WeightConfig]) -> np.ndarray:
+        """가중치 설정 리스트를 (N, 3) 행렬로 변환"""
+        if not weight_configs:
+            return np.empty((0, 3), dtype=np.float64)
+        return np.array(
+            [[w.brand_image_weight, w.sentiment_weight, w.roi_weight] for w in weight_configs],
+            dtype=np.float64
+        )
+
+    def simplex_weight_grid(self, steps: int) -> np.ndarray:
+        """합이 1인 가중치 심플렉스 격자 생성 (1/steps 간격)
+
+        steps=10이면 66개, steps=100이면 5151개의 가중치 조합을 반환합니다.
+        """
+        a, b = np.meshgrid(np.arange(steps + 1), np.arange(steps + 1), indexing="ij")
+        mask = (a + b) <= steps
+        a, b = a[mask], b[mask]
+        c = steps - a - b
+        return np.stack([a, b, c], axis=1).astype(np.float64) / steps
+
+    def evaluate_weight_grid(self, components: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """가중치 행렬 전체를 한 번의 행렬곱으로 평가"""
+        return weights @ components
+
+    def pareto_front(
+        self,
+        totals: np.ndarray,
+        weights: np.ndarray,
+        reference: Optional[WeightConfig] = None
+    ) -> np.ndarray:
+        """파레토 최적 가중치 인덱스 계산
+
+        목적함수: 종합 점수 최대화 + 기준 가중치(기본값)와의 L1 거리 최소화.
+        기준 가중치에서 멀어질수록 점수가 엄격히 올라가는 조합만 남습니다.
+        """
+        if len(totals) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        reference_vec = self.weight_matrix([reference or WeightConfig()])[0]
+        distance = np.abs(weights - reference_vec).sum(axis=1)
+
+        # 거리 오름차순, 동일 거리에서는 점수 내림차순
+        order = np.lexsort((-totals, distance))
+        sorted_totals = totals[order]
+        running_best = np.maximum.accumulate(sorted_totals)
+        previous_best = np.concatenate(([-np.inf], running_best[:-1]))
+        return order[sorted_totals > previous_best]
+
+    def compose_total_score(self, components: ComponentScores, weights: Optional[WeightConfig] = None) -> TotalScore:
+        """구성요소 점수와 가중치로 종합 점수 산출"""
+        from app.services.roi_service import roi_service
+
+        weights = weights or WeightConfig()
+        total_score = float(self.evaluate_weight_grid(
+            self.component_vector(components),
+            self.weight_matrix([weights])
+        )[0])
+        grade = roi_service.calculate_grade(total_score)
+
+        return TotalScore(
+            total_score=round(total_score, 2),
+            grade=grade,
+            recommendation=self._recommendation(grade),
+            weights_used=weights
+        )
+
+    def _recommendation(self, grade: str) -> str:
+        """등급 기반 추천 사유"""
+        if grade in ["S", "A"]:
+            return "적극 추천! 높은 ROI가 예상됩니다."
+        elif grade == "B":
+            return "추천합니다. 양호한 성과가 예상됩니다."
+        elif grade == "C":
+            return "보통 수준입니다. 신중한 검토가 필요합니다."
+        return "권장하지 않습니다. 다른 인플루언서를 고려해보세요."
+
+# 서비스 인스턴스
+score_service = ScoreService()
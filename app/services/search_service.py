@@ -0,0 +1,155 @@
+"""
+채널 검색 서비스 - 로컬 DB FTS5 전문 검색(BM25) + SBERT 의미 검색, reciprocal rank fusion
+"""
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import text
+from sqlmodel import Session, select
+from app.config import settings
+from app.core.models import Influencer
+from app.core.tracing import traced
+from app.ml import encode_texts, extract_keywords
+
+# bm25 컬럼 가중치 (title, description, category, video_titles)
+BM25_WEIGHTS = (10.0, 2.0, 5.0, 1.0)
+
+# trigram 토크나이저는 3글자 이상 단어만 MATCH로 검색 가능
+TRIGRAM_MIN_LENGTH = 3
+
+class SearchService:
+    """로컬 채널 검색"""
+
+    def parse_query(self, keyword: str) -> Tuple[List[str], List[str]]:
+        """검색어를 (trigram 검색 단어, 단어 접두어 검색 단어)로 분리"""
+        terms = extract_keywords([keyword], top_k=10)
+        match_terms = [term for term in terms if len(term) >= TRIGRAM_MIN_LENGTH]
+        prefix_terms = [term for term in terms if len(term) < TRIGRAM_MIN_LENGTH]
+        return match_terms, prefix_terms
+
+    @traced()
+    def search_lexical(
+        self,
+        session: Session,
+        keyword: str,
+        limit: int = 30,
+        offset: int = 0
+    ) -> List[Tuple[str, float]]:
+        """FTS5 검색: 모든 단어를 포함하는 채널의 (channel_id, BM25 점수) 목록 (점수 높은 순)
+
+        2글자 이하 단어는 trigram 색인을 쓸 수 없어 단어 색인(channel_words)에서 단어 접두어로 찾습니다.
+        (예: "뷰티"는 "뷰티", "뷰티팁"과 일치하지만 단어 중간인 "데일리뷰티"와는 일치하지 않음)
+        """
+        match_terms, prefix_terms = self.parse_query(keyword)
+        if not match_terms and not prefix_terms:
+            return []
+
+        conditions = []
+        params = {"limit": limit, "offset": offset}
+        if match_terms:
+            # 각 단어를 구문(phrase)으로 감싸 FTS5 연산자로 해석되지 않게 함 (공백 = AND)
+            params["match"] = " ".join('"' + term.replace('"', '""') + '"' for term in match_terms)
+            conditions.append("channel_fts MATCH :match")
+        if prefix_terms:
+            params["prefix"] = " ".join('"' + term.replace('"', '""') + '"*' for term in prefix_terms)
+            conditions.append("channel_words MATCH :prefix")
+
+        # 점수는 trigram 단어가 있으면 channel_fts, 없으면 단어 색인 기준 BM25
+        if match_terms and prefix_terms:
+            base = "channel_fts"
+            source = "channel_fts JOIN channel_words ON channel_words.rowid = channel_fts.rowid"
+        else:
+            base = source = "channel_fts" if match_terms else "channel_words"
+        score = "-bm25({}, {})".format(base, ", ".join(str(weight) for weight in BM25_WEIGHTS))
+
+        rows = session.connection().execute(
+            text(f"""
+                SELECT i.channel_id, {score} AS score
+                FROM {source} JOIN influencer i ON i.rowid = {base}.rowid
+                WHERE {" AND ".join(conditions)}
+                ORDER BY score DESC
+                LIMIT :limit OFFSET :offset
+            """),
+            params
+        ).all()
+        return [(channel_id, float(score)) for channel_id, score in rows]
+
+    @traced()
+    def search_semantic(self, keyword: str, limit: int = 30) -> List[Tuple[str, float]]:
+        """SBERT 의미 검색: 미리 계산된 채널 텍스트 임베딩 인덱스에서 (channel_id, 코사인 유사도)
+
+        검색어 임베딩 1회 외에는 모델을 호출하지 않습니다 (인덱스가 없으면 빈 목록).
+        """
+        from app.services.candidate_service import candidate_service
+
+        if not candidate_service.is_ready():
+            return []
+        query = encode_texts([keyword])[0]
+        return [
+            (channel_id, similarity)
+            for channel_id, similarity in candidate_service.text_index.search(query, limit)
+            if similarity >= settings.SEARCH_MIN_SIMILARITY
+        ]
+
+    def reciprocal_rank_fusion(self, rankings: Sequence[Sequence[str]], k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """여러 순위 목록을 RRF 점수(합 1 / (k + 순위))로 융합, 점수 높은 순"""
+        k = k or settings.SEARCH_RRF_K
+        rankings = [ranking for ranking in rankings if len(ranking)]
+        if not rankings:
+            return []
+
+        ids = np.concatenate([np.asarray(ranking, dtype=object) for ranking in rankings])
+        ranks = np.concatenate([np.arange(1, len(ranking) + 1) for ranking in rankings])
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        scores = np.bincount(inverse, weights=1.0 / (k + ranks))
+        # unique_ids는 정렬되어 있으므로 안정 정렬 시 동점은 channel_id 순 (페이지 간 순서 안정)
+        order = np.argsort(-scores, kind="stable")
+        return [(unique_ids[i], float(scores[i])) for i in order]
+
+    def search_ranked(
+        self,
+        session: Session,
+        keyword: str,
+        limit: int = 30,
+        offset: int = 0,
+        mode: str = "hybrid"
+    ) -> List[Tuple[str, float]]:
+        """검색 방식(lexical/semantic/hybrid)에 따른 페이지 단위 (channel_id, 점수)"""
+        if mode == "lexical":
+            return self.search_lexical(session, keyword, limit, offset)
+
+        # 융합 전 각 방식의 후보는 요청 페이지까지 포함하도록 충분히 확보
+        pool = max(settings.SEARCH_CANDIDATE_POOL, offset + limit)
+        rankings = []
+        if mode == "hybrid":
+            rankings.append([channel_id for channel_id, _ in self.search_lexical(session, keyword, pool)])
+        try:
+            rankings.append([channel_id for channel_id, _ in self.search_semantic(keyword, pool)])
+        except Exception as e:
+            # 모델 로드 실패 등: 키워드 검색 결과만 사용
+            print(f"[Error] 의미 검색 실패: {e}")
+
+        return self.reciprocal_rank_fusion(rankings)[offset:offset + limit]
+
+    def search(
+        self,
+        session: Session,
+        keyword: str,
+        limit: int = 30,
+        offset: int = 0,
+        mode: str = "lexical"
+    ) -> List[Influencer]:
+        """로컬 DB 채널 검색 (검색 방식별 순위)"""
+        ranked = self.search_ranked(session, keyword, limit, offset, mode)
+        if not ranked:
+            return []
+
+        influencers = {
+            influencer.channel_id: influencer
+            for influencer in session.exec(
+                select(Influencer).where(Influencer.channel_id.in_([channel_id for channel_id, _ in ranked]))
+            ).all()
+        }
+        return [influencers[channel_id] for channel_id, _ in ranked if channel_id in influencers]
+
+# 서비스 인스턴스
+search_service = SearchService()
@@ -0,0 +1,190 @@
+"""
+멀티 프로세스 샤딩 점수 계산 - channel_id 해시로 채널을 나눠 샤드 프로세스에서 계산
+"""
+import multiprocessing
+import os
+import queue
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional
+from app.config import settings
+
+def shard_of(channel_id: str, num_shards: int) -> int:
+    """프로세스/실행 간에 안정적인 샤드 번호 (내장 hash()는 프로세스마다 달라짐)"""
+    return zlib.crc32(channel_id.encode("utf-8")) % num_shards
+
+def new_shard_metrics() -> Dict:
+    """샤드별 진행 지표 초기값"""
+    return {
+        "cursor": None,
+        "processed": 0,
+        "failed": 0,
+        "busy_seconds": 0.0,
+        "throughput_per_sec": None,
+        "done": False
+    }
+
+def _score_shard(
+    project_id: str,
+    shard: int,
+    num_shards: int,
+    chunk_size: int,
+    cursor: Optional[str],
+    channel_ids: Optional[List[str]],
+    torch_threads: int,
+    results: "multiprocessing.Queue",
+    stop_event: "multiprocessing.Event"
+) -> None:
+    """샤드 프로세스 본체: 모델은 프로세스당 한 번 로드하고, 청크 결과를 writer로 전송"""
+    try:
+        import torch
+        from sqlmodel import Session, select
+        from app.core.database import engine
+        from app.core.models import Influencer, Project
+        from app.ml import model_manager
+        from app.services.score_service import score_service
+
+        torch.set_num_threads(torch_threads)
+        model_manager.warm_up()
+        # 모델 로딩이 끝났음을 알림 (writer가 heartbeat를 갱신)
+        results.put({"type": "ready", "shard": shard})
+        last_beat = time.monotonic()
+
+        with Session(engine) as session:
+            project = session.get(Project, project_id)
+            if project is None:
+                results.put({"type": "error", "shard": shard, "error": "프로젝트를 찾을 수 없습니다"})
+                return
+
+            # 이 샤드에 속한 채널 ID만 channel_id 순으로 (cursor 이후부터)
+            query = select(Influencer.channel_id).order_by(Influencer.channel_id)
+            if cursor:
+                query = query.where(Influencer.channel_id > cursor)
+            if channel_ids is not None:
+                # ANN 후보 shortlist로 제한된 작업
+                query = query.where(Influencer.channel_id.in_(channel_ids))
+            shard_channel_ids = [
+                channel_id for channel_id in session.exec(query).all()
+                if shard_of(channel_id, num_shards) == shard
+            ]
+
+            for start in range(0, len(shard_channel_ids), chunk_size):
+                if stop_event.is_set():
+                    return
+
+                chunk_started = time.perf_counter()
+                chunk_ids = shard_channel_ids[start:start + chunk_size]
+                influencers = session.exec(
+                    select(Influencer).where(Influencer.channel_id.in_(chunk_ids))
+                ).all()
+
+                rows = []
+                failed = 0
+                for influencer in influencers:
+                    # 청크가 길어도 작업이 stale로 재대기열에 들어가지 않도록 주기적으로 알림
+                    if time.monotonic() - last_beat >= settings.JOB_HEARTBEAT_INTERVAL:
+                        results.put({"type": "heartbeat", "shard": shard})
+                        last_beat = time.monotonic()
+                    try:
+                        rows.append(score_service.score_row(session, project, influencer))
+                    except Exception as e:
+                        print(f"[Shard {shard}] Error analyzing influencer {influencer.channel_id}: {e}")
+                        failed += 1
+
+                last_beat = time.monotonic()
+                results.put({
+                    "type": "chunk",
+                    "shard": shard,
+                    "rows": rows,
+                    "cursor": chunk_ids[-1],
+                    "processed": len(chunk_ids),
+                    "failed": failed + len(chunk_ids) - len(influencers),
+                    "elapsed": time.perf_counter() - chunk_started
+                })
+                session.expunge_all()
+
+        results.put({"type": "done", "shard": shard})
+
+    except Exception as e:
+        results.put({"type": "error", "shard": shard, "error": str(e)})
+
+class ShardRunner:
+    """샤드 프로세스 실행 및 결과 스트림 관리"""
+
+    def __init__(
+        self,
+        project_id: str,
+        num_shards: int,
+        chunk_size: int,
+        cursors: Dict[int, Optional[str]],
+        channel_ids: Optional[List[str]] = None
+    ):
+        self.project_id = project_id
+        self.num_shards = num_shards
+        self.chunk_size = chunk_size
+        self.cursors = cursors
+        self.channel_ids = channel_ids
+        # fork는 PyTorch 스레드 풀과 충돌할 수 있으므로 spawn 사용
+        self._context = multiprocessing.get_context("spawn")
+        # writer가 밀리면 샤드가 대기하도록 큐 크기 제한 (메모리 상한)
+        self._results = self._context.Queue(maxsize=num_shards * 4)
+        self._stop_event = self._context.Event()
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self) -> None:
+        torch_threads = settings.ANALYSIS_TORCH_THREADS or max(1, (os.cpu_count() or 1) // self.num_shards)
+        for shard in range(self.num_shards):
+            process = self._context.Process(
+                target=_score_shard,
+                args=(
+                    self.project_id,
+                    shard,
+                    self.num_shards,
+                    self.chunk_size,
+                    self.cursors.get(shard),
+                    self.channel_ids,
+                    torch_threads,
+                    self._results,
+                    self._stop_event
+                ),
+                name=f"analysis-shard-{shard}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+    def messages(self) -> Iterator[Dict]:
+        """모든 샤드가 끝날 때까지 결과 메시지를 순서대로 전달
+
+        1초 동안 메시지가 없으면 {"type": "tick"}을 전달해 writer가 기다리는 동안에도 heartbeat를 갱신하게 합니다.
+        """
+        finished = set()
+        while len(finished) < self.num_shards:
+            try:
+                message = self._results.get(timeout=1.0)
+            except queue.Empty:
+                # 메시지 없이 종료된 프로세스는 실패로 간주
+                for shard, process in enumerate(self._processes):
+                    if shard not in finished and not process.is_alive() and self._results.empty():
+                        yield {"type": "error", "shard": shard, "error": f"프로세스 비정상 종료 (exit={process.exitcode})"}
+                        finished.add(shard)
+                yield {"type": "tick"}
+                continue
+
+            if message["type"] in ("done", "error"):
+                finished.add(message["shard"])
+            yield message
+
+    def stop(self) -> None:
+        """샤드 프로세스 정리 (취소/오류 시 진행 중 청크는 버림)"""
+        self._stop_event.set()
+        # 큐가 가득 차서 put에서 막힌 프로세스가 종료될 수 있도록 비움
+        while True:
+            try:
+                self._results.get_nowait()
+            except queue.Empty:
+                break
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,206 @@
+"""
+채널 지표 스냅샷 서비스 - 월별 블록에 추가 전용으로 기록, 오래된 블록 다운샘플링, 성장률/이동평균 계산
+
+블록 데이터는 [ts, 구독자, 조회수, 영상 수, 참여율*1000] 다섯 개 int64 열을
+첫 값 + 차분(델타)으로 저장하고 zlib으로 압축합니다. 구독자/조회수는 단조 증가에 가까워
+델타가 작으므로 6시간 주기 한 달치(약 120개) 블록이 수백 바이트 수준입니다.
+"""
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from sqlmodel import Session, select
+from app.config import settings
+from app.core.models import ChannelSnapshotBlock, ChannelStats, Influencer
+
+COLUMNS = ("ts", "subscriber_count", "view_count", "video_count", "engagement_rate")
+ENGAGEMENT_SCALE = 1000  # 참여율은 소수 셋째 자리까지 정수로 저장
+DAY_SECONDS = 86400
+
+# 다운샘플링 단위 (초)
+RESOLUTION_SECONDS = {"daily": DAY_SECONDS, "weekly": 7 * DAY_SECONDS}
+
+def encode_block(values: np.ndarray) -> bytes:
+    """(N, 5) int64 -> 열별 델타 인코딩 + zlib"""
+    deltas = np.diff(values, axis=0, prepend=np.zeros((1, values.shape[1]), dtype=np.int64))
+    return zlib.compress(np.ascontiguousarray(deltas.T, dtype="<i8").tobytes())
+
+def decode_block(data: bytes, count: int) -> np.ndarray:
+    """encode_block의 역변환 -> (N, 5) int64"""
+    if not count:
+        return np.empty((0, len(COLUMNS)), dtype=np.int64)
+    deltas = np.frombuffer(zlib.decompress(data), dtype="<i8").reshape(len(COLUMNS), count).T
+    return np.cumsum(deltas, axis=0)
+
+def month_of(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m")
+
+def downsample(values: np.ndarray, bucket_seconds: int) -> np.ndarray:
+    """구간(일/주)마다 마지막 스냅샷만 남김"""
+    if len(values) == 0:
+        return values
+    buckets = values[:, 0] // bucket_seconds
+    last_in_bucket = np.flatnonzero(np.r_[buckets[1:] != buckets[:-1], True])
+    return values[last_in_bucket]
+
+class SnapshotService:
+    """채널 지표 시계열 저장/조회"""
+
+    def record(self, session: Session, influencers: Iterable[Influencer], ts: Optional[int] = None) -> int:
+        """채널 현재 지표를 해당 월 블록 끝에 추가 (커밋은 호출자)
+
+        같은 시각 이전의 스냅샷이 이미 있으면 건너뛰어 재실행해도 중복되지 않습니다.
+        기록 후 30일 환산 구독자 증가율을 채널 집계(ChannelStats)에 갱신합니다.
+        """
+        ts = int(ts if ts is not None else datetime.now(timezone.utc).timestamp())
+        month = month_of(ts)
+        recorded = 0
+
+        for influencer in influencers:
+            block = session.get(ChannelSnapshotBlock, (influencer.channel_id, month))
+            if block is None:
+                block = ChannelSnapshotBlock(channel_id=influencer.channel_id, month=month, first_ts=ts)
+            elif block.count and block.last_ts >= ts:
+                continue
+
+            row = np.array([[
+                ts,
+                influencer.subscriber_count or 0,
+                influencer.view_count or 0,
+                influencer.video_count or 0,
+                round((influencer.engagement_rate or 0.0) * ENGAGEMENT_SCALE)
+            ]], dtype=np.int64)
+            values = np.vstack([decode_block(block.data, block.count), row])
+
+            block.data = encode_block(values)
+            block.count = len(values)
+            block.last_ts = ts
+            session.add(block)
+            recorded += 1
+
+            self._update_growth(session, influencer.channel_id, ts)
+
+        return recorded
+
+    def compact(self, session: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+        """오래된 월 블록 다운샘플링 (raw -> daily -> weekly)
+
+        SNAPSHOT_RAW_MONTHS가 지난 블록은 하루 1개, SNAPSHOT_DAILY_MONTHS가 지난 블록은 주 1개로 줄여
+        채널당 저장량이 수년이 지나도 월 수에만 비례하도록 유지합니다.
+        """
+        now = now or datetime.now(timezone.utc)
+        current = now.year * 12 + now.month - 1
+        compacted = {"daily": 0, "weekly": 0}
+
+        for block in session.exec(
+            select(ChannelSnapshotBlock).where(ChannelSnapshotBlock.resolution != "weekly")
+        ).all():
+            year, month = (int(part) for part in block.month.split("-"))
+            age = current - (year * 12 + month - 1)
+            if age >= settings.SNAPSHOT_DAILY_MONTHS:
+                resolution = "weekly"
+            elif age >= settings.SNAPSHOT_RAW_MONTHS:
+                resolution = "daily"
+            else:
+                continue
+            if resolution == block.resolution:
+                continue
+
+            values = downsample(decode_block(block.data, block.count), RESOLUTION_SECONDS[resolution])
+            block.data = encode_block(values)
+            block.count = len(values)
+            block.resolution = resolution
+            session.add(block)
+            compacted[resolution] += 1
+
+        return compacted
+
+    def load(self, session: Session, channel_id: str, since_ts: Optional[int] = None) -> np.ndarray:
+        """채널 스냅샷 (N, 5) int64, 시각 오름차순"""
+        query = select(ChannelSnapshotBlock).where(ChannelSnapshotBlock.channel_id == channel_id)
+        if since_ts is not None:
+            query = query.where(ChannelSnapshotBlock.last_ts >= since_ts)
+        blocks = session.exec(query.order_by(ChannelSnapshotBlock.month)).all()
+        if not blocks:
+            return decode_block(b"", 0)
+
+        values = np.vstack([decode_block(block.data, block.count) for block in blocks])
+        if since_ts is not None:
+            values = values[values[:, 0] >= since_ts]
+        return values
+
+    def growth(self, values: np.ndarray, days: int) -> Dict[str, Optional[float]]:
+        """최근 days일 구독자/조회수 증감 (기록이 짧으면 실제 기간 기준)"""
+        empty = {"days_covered": 0.0, "subscriber_change": None, "subscriber_growth_pct": None,
+                 "view_change": None, "view_growth_pct": None}
+        if len(values) < 2:
+            return empty
+
+        ts = values[:, 0]
+        latest = values[-1]
+        # 기준 시점 이전(또는 같은) 마지막 스냅샷, 없으면 가장 오래된 스냅샷
+        start_index = max(0, int(np.searchsorted(ts, ts[-1] - days * DAY_SECONDS, side="right")) - 1)
+        start = values[start_index]
+        if start[0] == latest[0]:
+            return empty
+
+        result = {"days_covered": round(float(latest[0] - start[0]) / DAY_SECONDS, 2)}
+        for column, name in ((1, "subscriber"), (2, "view")):
+            change = int(latest[column] - start[column])
+            result[f"{name}_change"] = change
+            result[f"{name}_growth_pct"] = round(change / start[column] * 100, 3) if start[column] > 0 else None
+        return result
+
+    def daily_series(self, values: np.ndarray, days: int, window: int) -> List[Dict]:
+        """최근 days일의 일별 값(하루 마지막 스냅샷, 빈 날은 직전 값)과 window일 이동평균"""
+        if len(values) == 0:
+            return []
+
+        daily = downsample(values, DAY_SECONDS)
+        day_index = daily[:, 0] // DAY_SECONDS
+        all_days = np.arange(day_index[0], day_index[-1] + 1)
+        # 빈 날은 직전 스냅샷으로 채움
+        filled = daily[np.searchsorted(day_index, all_days, side="right") - 1]
+
+        def moving_average(column: np.ndarray) -> np.ndarray:
+            column = column.astype(np.float64)
+            cumulative = np.cumsum(np.r_[0.0, column])
+            sizes = np.minimum(np.arange(1, len(column) + 1), window)
+            return (cumulative[1:] - cumulative[np.arange(len(column)) + 1 - sizes]) / sizes
+
+        subscriber_ma = moving_average(filled[:, 1])
+        view_ma = moving_average(filled[:, 2])
+
+        start = max(0, len(all_days) - days)
+        return [
+            {
+                "date": datetime.fromtimestamp(int(all_days[i]) * DAY_SECONDS, timezone.utc).date().isoformat(),
+                "subscriber_count": int(filled[i, 1]),
+                "view_count": int(filled[i, 2]),
+                "video_count": int(filled[i, 3]),
+                "engagement_rate": float(filled[i, 4]) / ENGAGEMENT_SCALE,
+                "subscriber_ma": round(float(subscriber_ma[i]), 1),
+                "view_ma": round(float(view_ma[i]), 1)
+            }
+            for i in range(start, len(all_days))
+        ]
+
+    def growth_rate_30d(self, values: np.ndarray, min_days: float = 7.0) -> Optional[float]:
+        """30일 환산 구독자 증가율 (%) - 기록이 min_days보다 짧으면 None"""
+        growth = self.growth(values, 30)
+        if growth["subscriber_growth_pct"] is None or growth["days_covered"] < min_days:
+            return None
+        ratio = 1 + growth["subscriber_growth_pct"] / 100
+        if ratio <= 0:
+            return None
+        return round((ratio ** (30 / growth["days_covered"]) - 1) * 100, 3)
+
+    def _update_growth(self, session: Session, channel_id: str, ts: int) -> None:
+        """ROI 입력용 구독자 증가율을 채널 집계에 저장"""
+        since_ts = ts - 31 * DAY_SECONDS
+        stats = session.get(ChannelStats, channel_id) or ChannelStats(channel_id=channel_id)
+        stats.subscriber_growth_30d = self.growth_rate_30d(self.load(session, channel_id, since_ts))
+        session.add(stats)
+
+# 서비스 인스턴스
+snapshot_service = SnapshotService()
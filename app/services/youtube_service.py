@@ -3,13 +3,13 @@ YouTube 관련 비즈니스 로직
 """
 import os
 import time
-import httpx
 from typing import List, Dict, Optional
 from fastapi import HTTPException
 from sqlmodel import Session, select, func
 from app.core import Influencer, get_session
 from app.schemas.youtube import ChannelDetails, HomeYoutuberCard, ChannelWithMetrics
 from app.config import settings
+from app.utils.youtube_utils import youtube_client
 
 # YouTube API 설정
 API_KEY = os.getenv("YOUTUBE_API_KEY", "")
@@ -29,7 +29,7 @@ class YouTubeService:
         url = f"{YOUTUBE_BASE_URL}/{endpoint}"
         params["key"] = self.api_key
         
-        with httpx.Client(timeout=20) as client:
+        with youtube_client(timeout=20) as client:
             response = client.get(url, params=params)
             if response.status_code >= 400:
                 raise HTTPException(status_code=response.status_code, detail=response.text)
@@ -87,25 +87,26 @@ class YouTubeService:
             statement = select(Influencer).order_by(desc(Influencer.subscriber_count)).limit(max_results)
             influencers = session.exec(statement).all()
             
-            return [
-                ChannelWithMetrics(
-                    channel_id=inf.channel_id,
-                    title=inf.title or "Unknown",
-                    subscriber_count=inf.subscriber_count,
-                    view_count=inf.view_count,
-                    video_count=inf.video_count,
-                    thumbnail_url=inf.thumbnail_url,
-                    engagement_rate=inf.engagement_rate,
-                    estimated_price=inf.estimated_price or f"{inf.subscriber_count // 1000}만원" if inf.subscriber_count else "가격 문의",
-                    category=inf.category or "미분류"
-                )
-                for inf in influencers
-            ]
+            return [self.to_channel_with_metrics(inf) for inf in influencers]
             
         except Exception as e:
             print(f"[Error] DB 인기 채널 조회 실패: {e}")
             return []
 
+    def to_channel_with_metrics(self, inf: Influencer) -> ChannelWithMetrics:
+        """DB 채널 → 응답 모델 변환"""
+        return ChannelWithMetrics(
+            channel_id=inf.channel_id,
+            title=inf.title or "Unknown",
+            subscriber_count=inf.subscriber_count,
+            view_count=inf.view_count,
+            video_count=inf.video_count,
+            thumbnail_url=inf.thumbnail_url,
+            engagement_rate=inf.engagement_rate,
+            estimated_price=inf.estimated_price or f"{inf.subscriber_count // 1000}만원" if inf.subscriber_count else "가격 문의",
+            category=inf.category or "미분류"
+        )
+
     def get_popular_channels(self, max_results: int = 50) -> List[ChannelWithMetrics]:
         """인기 채널 조회"""
         try:
@@ -192,11 +193,20 @@ class YouTubeService:
         else:
             return "2000만원 이상"
     
-    def get_sorted_youtubers(self, session: Session, sort_by: str, limit: int) -> List[HomeYoutuberCard]:
-        """정렬된 유튜버 목록 조회"""
-        from sqlmodel import select, desc, asc
+    def get_sorted_youtubers(self, session: Session, sort_by: str, limit: int) -> List[Dict]:
+        """정렬된 유튜버 목록 조회 (필요한 컬럼만 읽어 HomeYoutuberCard 형태의 dict 행으로 반환)"""
+        from sqlmodel import desc, asc
+        from app.core.responses import trusted_rows
         
-        query = select(Influencer)
+        query = select(
+            Influencer.channel_id,
+            Influencer.title,
+            Influencer.subscriber_count,
+            Influencer.thumbnail_url,
+            Influencer.category,
+            Influencer.engagement_rate,
+            Influencer.estimated_price
+        )
         
         if sort_by == "followers":
             query = query.order_by(desc(Influencer.subscriber_count))
@@ -206,20 +216,20 @@ class YouTubeService:
             query = query.order_by(asc(Influencer.subscriber_count))
         
         query = query.limit(limit)
-        influencers = session.exec(query).all()
-        
-        return [
-            HomeYoutuberCard(
-                channel_id=inf.channel_id,
-                title=inf.title,
-                subscriber_count=inf.subscriber_count or 0,
-                thumbnail_url=inf.thumbnail_url or "",
-                category=inf.category or "기타",
-                engagement_rate=inf.engagement_rate or 0.0,
-                estimated_price=inf.estimated_price or self._estimate_price(inf.subscriber_count or 0)
-            )
-            for inf in influencers
+        rows = [
+            {
+                "channel_id": channel_id,
+                "title": title,
+                "subscriber_count": subscriber_count or 0,
+                "thumbnail_url": thumbnail_url or "",
+                "category": category or "기타",
+                "engagement_rate": engagement_rate or 0.0,
+                "estimated_price": estimated_price or self._estimate_price(subscriber_count or 0)
+            }
+            for channel_id, title, subscriber_count, thumbnail_url, category, engagement_rate, estimated_price
+            in session.exec(query).all()
         ]
+        return trusted_rows(rows, HomeYoutuberCard)
 
 # 서비스 인스턴스
 youtube_service = YouTubeService()
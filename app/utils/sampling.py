@@ -0,0 +1,74 @@
+"""
+댓글 표본 추출 유틸 - 가중 reservoir 추출(A-ES), 층별 비례 추출 순서, 가중 비율 신뢰구간
+
+두 추출 함수 모두 "추출 순서"를 반환합니다. 앞에서 n개를 자르면 그 자체로 크기 n의 표본이므로
+표본 크기를 늘려 갈 때 이미 분석한 댓글을 버리지 않고 뒤에 이어 붙이기만 하면 됩니다.
+"""
+import heapq
+import math
+import random
+from typing import Hashable, Iterable, List, Optional, Sequence, Tuple
+
+Z_95 = 1.959963984540054
+
+def weighted_reservoir(items: Iterable, weights: Iterable[float], k: int, rng: random.Random) -> List:
+    """가중치 비례 비복원 추출 (Efraimidis-Spirakis A-ES)
+
+    항목마다 key = u^(1/w)를 매기고 key 상위 k개만 힙에 유지하므로 한 번 순회로 끝나고 메모리는 O(k)입니다.
+    key 내림차순으로 반환하며, 앞 n개는 같은 가중치로 크기 n을 추출한 표본과 분포가 같습니다.
+    """
+    heap: List[Tuple[float, int, object]] = []
+    for index, (item, weight) in enumerate(zip(items, weights)):
+        if weight <= 0:
+            continue
+        # log(u^(1/w)) = log(u) / w (아주 작은 가중치에서도 0으로 뭉개지지 않음)
+        key = math.log(1.0 - rng.random()) / weight
+        if len(heap) < k:
+            heapq.heappush(heap, (key, index, item))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, index, item))
+    return [item for _, _, item in sorted(heap, reverse=True)]
+
+def stratified_order(items: Sequence, strata: Sequence[Hashable], k: int, rng: random.Random) -> List:
+    """층(영상)별 모집단 크기에 비례 배분되는 추출 순서
+
+    층 안에서는 무작위 순서로 섞고, i번째 항목에 (i + 층별 난수 offset) / 층 크기 위치를 매겨 정렬합니다.
+    앞 n개를 자르면 각 층이 n * (층 크기 / 전체)개에 ±1 이내로 포함됩니다 (체계적 비례 배분).
+    """
+    groups = {}
+    for index, stratum in enumerate(strata):
+        groups.setdefault(stratum, []).append(index)
+
+    keyed: List[Tuple[float, int]] = []
+    for members in groups.values():
+        rng.shuffle(members)
+        offset = rng.random()
+        keyed.extend(((position + offset) / len(members), index) for position, index in enumerate(members))
+    return [items[index] for _, index in heapq.nsmallest(k, keyed)]
+
+def proportion_interval(
+    p: float,
+    n: int,
+    n_eff: float,
+    population: Optional[int] = None,
+    z: float = Z_95
+) -> Tuple[float, float]:
+    """비율 p의 Wilson 신뢰구간 (하한, 상한)
+
+    n_eff: 유효 표본 크기 - 가중치가 고르지 않으면 Kish (Σw)² / Σw²로 n보다 작게 잡습니다.
+    population: 모집단 수 - 표본 비율이 크면 유한 모집단 보정으로 구간을 좁힙니다.
+    """
+    if n == 0 or n_eff <= 0:
+        return 0.0, 1.0
+    if population is not None and n >= population:
+        # 전수 분석: 표본 오차 없음
+        return p, p
+
+    if population is not None and population > 1:
+        n_eff /= (population - n) / (population - 1)
+
+    z2 = z * z
+    denominator = 1 + z2 / n_eff
+    center = (p + z2 / (2 * n_eff)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n_eff + z2 / (4 * n_eff * n_eff)) / denominator
+    return float(max(0.0, center - half)), float(min(1.0, center + half))
@@ -0,0 +1,63 @@
+"""
+댓글 중복 판별 유틸 - 텍스트 정규화 + 문자 3-gram 64비트 SimHash
+"""
+import hashlib
+import re
+import unicodedata
+from typing import Sequence
+import numpy as np
+
+SHINGLE_SIZE = 3
+
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_MENTION = re.compile(r"@\S+")
+_HTML = re.compile(r"<[^>]+>")
+_REPEAT = re.compile(r"(.)\1{2,}")  # ㅋㅋㅋㅋ, !!!! 등 3회 이상 반복
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+_BITS = np.arange(64, dtype=np.uint64)
+
+def normalize_comment(text: str) -> str:
+    """비교용 정규화: NFKC, 소문자, URL/멘션/HTML 태그 제거, 반복 문자 축약, 기호 제거"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = _URL.sub(" ", text)
+    text = _MENTION.sub(" ", text)
+    text = _HTML.sub(" ", text)
+    text = _NON_WORD.sub(" ", text)
+    text = _REPEAT.sub(r"\1\1", text)
+    return _SPACES.sub(" ", text).strip()
+
+def simhash64(normalized: str) -> int:
+    """정규화된 텍스트의 문자 3-gram SimHash (부호 있는 64비트 정수, SQLite INTEGER 저장용)
+
+    띄어쓰기만 다른 복사 댓글이 같은 값이 되도록 공백을 제거한 뒤 shingle을 만듭니다.
+    """
+    normalized = normalized.replace(" ", "")
+    if len(normalized) <= SHINGLE_SIZE:
+        shingles = [normalized]
+    else:
+        shingles = [normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)]
+
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+         for shingle in shingles],
+        dtype=np.uint64
+    )
+    # 비트별로 shingle 해시가 1이면 +1, 0이면 -1 투표
+    bits = (hashes[:, None] >> _BITS) & np.uint64(1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    fingerprint = int(((votes > 0).astype(np.uint64) << _BITS).sum(dtype=np.uint64))
+    return fingerprint - (1 << 64) if fingerprint >= (1 << 63) else fingerprint
+
+def hamming_distances(fingerprints: Sequence[int], fingerprint: int) -> np.ndarray:
+    """fingerprint와 각 SimHash 사이의 해밍 거리"""
+    values = np.asarray(fingerprints, dtype=np.int64).view(np.uint64)
+    target = np.array([fingerprint], dtype=np.int64).view(np.uint64)[0]
+    return _popcount(values ^ target)
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """64비트 값별 1인 비트 수 (np.bitwise_count는 NumPy 2.0 이상에만 있으므로 1.x에서는 unpackbits로 계산)"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8)).reshape(-1, 64).sum(axis=1)
@@ -1,11 +1,37 @@
+import time
 import httpx
 from typing import List, Dict, Optional
 from app.schemas.youtube import ChannelDetails, VideoStatsOut
 from app.config.settings import settings
+from app.core.metrics import record_youtube_call
+from app.core.tracing import KIND_CLIENT, start_span
 
 API_KEY = settings.YOUTUBE_API_KEY
 YOUTUBE_BASE_URL = "https://www.googleapis.com/youtube/v3"
 
+def _endpoint(request: httpx.Request) -> str:
+    return request.url.path.rstrip("/").rsplit("/", 1)[-1]
+
+def _mark_request_start(request: httpx.Request) -> None:
+    request.extensions["started_at"] = time.perf_counter()
+    request.extensions["trace_span"] = start_span(f"youtube.{_endpoint(request)}", KIND_CLIENT)
+
+def _record_response(response: httpx.Response) -> None:
+    request = response.request
+    started_at = request.extensions.get("started_at", time.perf_counter())
+    record_youtube_call(_endpoint(request), time.perf_counter() - started_at, response.status_code)
+    trace_span = request.extensions.get("trace_span")
+    if trace_span is not None:
+        trace_span.set_attribute("http.status_code", response.status_code)
+        trace_span.end()
+
+def youtube_client(timeout: float = 20) -> httpx.Client:
+    """YouTube API 호출용 httpx 클라이언트 (엔드포인트별 호출 수/할당량/응답 시간을 /metrics에, 호출 구간을 트레이스에 기록)"""
+    return httpx.Client(
+        timeout=timeout,
+        event_hooks={"request": [_mark_request_start], "response": [_record_response]}
+    )
+
 def search_channels_by_keyword(keyword: str, top_n: int = 50) -> List[str]:
     """키워드로 채널 검색하여 채널 ID 리스트 반환"""
     try:
@@ -24,7 +50,7 @@ def search_channels_by_keyword(keyword: str, top_n: int = 50) -> List[str]:
             "key": API_KEY
         }
         
-        with httpx.Client(timeout=30) as client:
+        with youtube_client(timeout=30) as client:
             response = client.get(f"{YOUTUBE_BASE_URL}/search", params=params)
             
             # 상세한 에러 정보 출력
@@ -66,7 +92,7 @@ def fetch_channel_details(channel_ids: List[str], source_tag: str = "") -> List[
             "key": API_KEY
         }
         
-        with httpx.Client(timeout=20) as client:
+        with youtube_client(timeout=20) as client:
             response = client.get(f"{YOUTUBE_BASE_URL}/channels", params=params)
             response.raise_for_status()
             data = response.json()
@@ -113,7 +139,7 @@ def get_recent_video_stats(channel_id: str, num_videos: int = 5) -> List[VideoSt
             "key": API_KEY
         }
         
-        with httpx.Client(timeout=20) as client:
+        with youtube_client(timeout=20) as client:
             response = client.get(f"{YOUTUBE_BASE_URL}/search", params=search_params)
             response.raise_for_status()
             search_data = response.json()
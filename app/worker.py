@@ -0,0 +1,32 @@
+"""
+프로젝트 분석 워커 - API 프로세스와 별도로 작업 큐를 처리
+
+실행: python -m app.worker
+"""
+import time
+from app.config import settings
+from app.core import create_db_and_tables
+from app.services.job_service import job_service
+
+def main():
+    create_db_and_tables()
+    print(f"[Worker] 분석 워커 시작 ({job_service.worker_id})")
+
+    while True:
+        # 중단된 작업은 마지막 커밋 청크부터 재개
+        requeued = job_service.requeue_stale()
+        if requeued:
+            print(f"[Worker] 중단된 작업 {requeued}건 재대기열 등록")
+
+        job_id = job_service.claim_next()
+        if job_id is None:
+            time.sleep(settings.WORKER_POLL_INTERVAL)
+            continue
+
+        print(f"[Worker] 작업 시작: {job_id}")
+        started = time.perf_counter()
+        job_service.run_job(job_id)
+        print(f"[Worker] 작업 종료: {job_id} ({time.perf_counter() - started:.1f}s)")
+
+if __name__ == "__main__":
+    main()
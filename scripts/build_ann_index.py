@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+채널 후보 ANN 인덱스 전체 재구축 (최초 구축 또는 모델 변경 시)
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlmodel import Session
+from app.core.database import engine
+from app.services.candidate_service import candidate_service
+
+def build_ann_index():
+    """전체 채널의 SBERT/CLIP 임베딩으로 인덱스 재구축"""
+    started = time.perf_counter()
+    print("🔧 채널 후보 인덱스 재구축 중...")
+    
+    with Session(engine) as session:
+        counts = candidate_service.rebuild(session)
+    
+    print(f"✅ 재구축 완료: 텍스트 {counts['text']}개 | 이미지 {counts['image']}개 | {time.perf_counter() - started:.1f}초")
+
+if __name__ == "__main__":
+    build_ann_index()
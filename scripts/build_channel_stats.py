@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+채널 영상 집계 전체 재구축 (최초 구축/백필용, 이후에는 크롤러가 증분 갱신)
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlmodel import Session
+from app.core.database import engine, create_db_and_tables
+from app.services.channel_stats_service import channel_stats_service
+from app.services.feed_cache import bump_data_version
+
+def build_channel_stats():
+    """Video 테이블로 채널별 최근 영상 집계 및 Influencer ROI 컬럼 갱신"""
+    started = time.perf_counter()
+    print("🔧 채널 영상 집계 재구축 중...")
+    
+    create_db_and_tables()
+    with Session(engine) as session:
+        count = channel_stats_service.rebuild(session)
+        session.commit()
+    bump_data_version()
+    
+    print(f"✅ 재구축 완료: 채널 {count}개 | {time.perf_counter() - started:.1f}초")
+
+if __name__ == "__main__":
+    build_channel_stats()
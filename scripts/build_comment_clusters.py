@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+유사 댓글 클러스터 전체 재구축 (최초 구축/백필, COMMENT_SIMHASH_MAX_DISTANCE 변경 시)
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlmodel import Session
+from app.core.database import engine, create_db_and_tables
+from app.services.comment_service import comment_service
+from app.services.feed_cache import bump_data_version
+
+def build_comment_clusters():
+    """Comment 테이블로 채널별 SimHash 클러스터 재구축"""
+    started = time.perf_counter()
+    print("🔧 유사 댓글 클러스터 재구축 중...")
+    
+    create_db_and_tables()
+    with Session(engine) as session:
+        counts = comment_service.rebuild(session)
+        session.commit()
+    bump_data_version()
+    
+    print(
+        f"✅ 재구축 완료: 채널 {counts['channels']}개 | 댓글 {counts['comments']}개 → "
+        f"클러스터 {counts['clusters']}개 | {time.perf_counter() - started:.1f}초"
+    )
+
+if __name__ == "__main__":
+    build_comment_clusters()
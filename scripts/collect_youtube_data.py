@@ -7,7 +7,10 @@ import sqlite3
 import httpx
 from typing import List, Dict
 from datetime import datetime
+from sqlmodel import Session
 from app.config.settings import settings
+from app.core.database import engine
+from app.services.comment_service import comment_service
 
 API_KEY = settings.YOUTUBE_API_KEY
 YOUTUBE_BASE_URL = "https://www.googleapis.com/youtube/v3"
@@ -76,6 +79,7 @@ def collect_video_thumbnails_and_comments():
         try:
             # 1. 최근 비디오 3개 가져오기
             videos = get_channel_videos(channel_id, max_results=3)
+            channel_comments = []
             
             if not videos:
                 print(f"⚠️ {title}: 비디오를 찾을 수 없습니다")
@@ -109,27 +113,27 @@ def collect_video_thumbnails_and_comments():
                 # 3. 댓글 수집 (최대 10개로 제한)
                 comments = get_video_comments(video_id, max_results=10)
                 
-                comment_count = 0
                 for comment in comments:
-                    comment_id = comment['id']
-                    comment_text = comment['snippet']['topLevelComment']['snippet']['textDisplay']
-                    like_count = comment['snippet']['topLevelComment']['snippet']['likeCount']
-                    published_at = comment['snippet']['topLevelComment']['snippet']['publishedAt']
-                    author_name = comment['snippet']['topLevelComment']['snippet']['authorDisplayName']
-                    
-                    # 댓글 저장 (중복 방지)
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO comment 
-                        (comment_id, video_id, channel_id, comment_text, like_count, published_at, author_name)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (comment_id, video_id, channel_id, comment_text, like_count, published_at, author_name))
-                    
-                    comment_count += 1
+                    snippet = comment['snippet']['topLevelComment']['snippet']
+                    channel_comments.append({
+                        'comment_id': comment['id'],
+                        'video_id': video_id,
+                        'comment_text': snippet['textDisplay'],
+                        'like_count': snippet['likeCount'],
+                        'published_at': snippet['publishedAt'],
+                        'author_name': snippet['authorDisplayName']
+                    })
                 
-                print(f"  💬 댓글 {comment_count}개 수집")
+                print(f"  💬 댓글 {len(comments)}개 수집")
             
             # 변경사항 저장
             conn.commit()
+            
+            # 댓글 저장 (댓글 ID 중복 방지 + 유사 댓글 클러스터링)
+            with Session(engine) as session:
+                counts = comment_service.ingest(session, channel_id, channel_comments)
+                session.commit()
+            print(f"  💬 신규 댓글 {counts['inserted']}개, 새 클러스터 {counts['clusters_created']}개")
             print(f"✅ {title}: 완료")
             
         except Exception as e:
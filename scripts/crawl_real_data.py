@@ -4,11 +4,15 @@ import sys
 import time
 from datetime import datetime
 from googleapiclient.discovery import build
-from sqlalchemy import text
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from app.core.models import Influencer, Video, Comment
+from app.core.models import Influencer, Video
 from app.core.database import get_session
+from app.ml.image_store import image_store
+from app.services.candidate_service import candidate_service
+from app.services.feed_cache import bump_data_version
+from app.services.channel_stats_service import channel_stats_service
+from app.services.comment_service import comment_service
 
 # 환경변수에서 API 키 로드
 from dotenv import load_dotenv
@@ -39,9 +43,12 @@ def get_video_comments(video_id, target_count=150):
             for item in response['items']:
                 comment = item['snippet']['topLevelComment']['snippet']
                 comments.append({
+                    'comment_id': item['snippet']['topLevelComment']['id'],
+                    'video_id': video_id,
                     'comment_text': comment['textDisplay'][:300],
                     'like_count': comment['likeCount'],
-                    'published_at': comment['publishedAt']
+                    'published_at': comment['publishedAt'],
+                    'author_name': comment.get('authorDisplayName')
                 })
             
             next_page_token = response.get('nextPageToken')
@@ -103,11 +110,6 @@ def crawl_influencer_data(session, channel_id, channel_name):
     """특정 인플루언서의 실제 데이터 크롤링"""
     print(f"\n=== {channel_name} ({channel_id}) 크롤링 시작 ===")
     
-    # 기존 데이터 삭제
-    session.execute(text("DELETE FROM comment WHERE channel_id = :channel_id"), {"channel_id": channel_id})
-    session.execute(text("DELETE FROM video WHERE channel_id = :channel_id"), {"channel_id": channel_id})
-    session.commit()
-    
     # 비디오 데이터 가져오기
     videos = get_channel_videos(channel_id, max_results=5)
     
@@ -129,25 +131,35 @@ def crawl_influencer_data(session, channel_id, channel_name):
             like_count=video_data['like_count'],
             comment_count=video_data['comment_count']
         )
-        session.add(video)
+        # 다시 수집한 영상은 통계만 갱신 (댓글이 참조하므로 삭제하지 않음)
+        session.merge(video)
         
-        # 댓글 100-200개 가져오기
+        # 댓글 100-200개 가져오기 (이미 수집한 댓글 ID는 좋아요 수만 갱신, 유사 댓글은 클러스터로 묶음)
         comments = get_video_comments(video_data['video_id'], target_count=150)
+        counts = comment_service.ingest(session, channel_id, comments)
         
-        for comment_data in comments:
-            comment = Comment(
-                video_id=video_data['video_id'],
-                channel_id=channel_id,
-                comment_text=comment_data['comment_text'],
-                like_count=comment_data['like_count'],
-                published_at=datetime.fromisoformat(comment_data['published_at'].replace('Z', '+00:00'))
-            )
-            session.add(comment)
-        
-        print(f"  📹 {video_data['title'][:50]}... ({len(comments)}개 댓글)")
+        print(f"  📹 {video_data['title'][:50]}... ({len(comments)}개 댓글, 신규 {counts['inserted']}개, 새 클러스터 {counts['clusters_created']}개)")
         time.sleep(2)  # API 할당량 보호
     
+    # 최근 영상 통계를 채널 집계에 병합 (채널 데이터 버전 last_updated도 함께 갱신)
+    channel_stats_service.update_channel(session, channel_id, videos)
+    influencer = session.get(Influencer, channel_id)
+    
+    # 캐시된 분석 점수는 last_updated 버전 스탬프가 바뀌어 API 프로세스에서 다음 조회 때 재계산됨
     session.commit()
+    bump_data_version()
+    
+    # 채널/비디오 썸네일을 로컬 이미지 저장소에 미리 받아둠
+    thumbnail_urls = [video_data['thumbnail_url'] for video_data in videos]
+    if influencer and influencer.thumbnail_url:
+        thumbnail_urls.append(influencer.thumbnail_url)
+    image_store.prefetch_sync(thumbnail_urls)
+    
+    # 영상 제목이 바뀌었으므로 채널 후보 인덱스 갱신
+    try:
+        candidate_service.index_channels(session, [channel_id])
+    except Exception as e:
+        print(f"⚠️ 후보 인덱스 갱신 실패: {e}")
     print(f"✅ {channel_name} 크롤링 완료")
 
 def main():
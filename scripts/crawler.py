@@ -4,6 +4,11 @@ from datetime import datetime
 from sqlmodel import Session
 from app.core.database import engine, create_db_and_tables
 from app.core.models import Influencer
+from app.ml.image_store import image_store
+from app.services.candidate_service import candidate_service
+from app.services.feed_cache import bump_data_version
+from app.services.channel_stats_service import channel_stats_service
+from app.services.snapshot_service import snapshot_service
 from app.utils.youtube_utils import (
     search_channels_by_keyword,
     fetch_channel_details,
@@ -135,6 +140,7 @@ def update_influencer_data():
             
             collected = 0
             skipped = 0
+            updated_channel_ids = []
             
             for idx, channel_id in enumerate(channel_ids, 1):
                 
@@ -170,6 +176,7 @@ def update_influencer_data():
                         video_stats_dict.append({
                             'video_id': v.video_id,
                             'title': v.video_title,
+                            'published_at': v.video_published_at,
                             'view_count': v.view_count or 0,
                             'like_count': v.like_count or 0,
                             'comment_count': v.comment_count or 0
@@ -232,8 +239,13 @@ def update_influencer_data():
                         session.add(db_influencer)
                         action = "추가"
                     
+                    # 최근 영상 통계를 채널 집계에 병합 (평균 조회수/업로드 주기/참여율 백분위)
+                    session.flush()
+                    channel_stats_service.update_channel(session, channel_id, video_stats_dict)
+                    
                     print(f"[{idx:2d}] ✅ {details.title[:25]:25s} | 구독자: {sub_count:>7,}명 | 참여율: {eng_rate:>5.1f}% | {action}")
                     collected += 1
+                    updated_channel_ids.append(channel_id)
                     
                 except Exception as e:
                     error_msg = str(e)
@@ -245,13 +257,45 @@ def update_influencer_data():
                     skipped += 1
                     continue
             
+            # 갱신된 채널 지표를 스냅샷 시계열에 추가 (성장률은 채널 집계에 반영)
+            snapshot_service.record(
+                session,
+                [session.get(Influencer, channel_id) for channel_id in updated_channel_ids]
+            )
+            
             # 카테고리별 커밋
             session.commit()
             
+            # 캐시된 분석 점수는 따로 무효화하지 않음: 위에서 갱신된 채널 last_updated가
+            # API 프로세스 점수 캐시 키/materialized 결과의 버전 스탬프에 포함되어 다음 조회 때 재계산됨
+            
+            # API 프로세스의 홈 피드 캐시가 백그라운드에서 갱신되도록 데이터 버전 변경
+            bump_data_version()
+            
+            # 썸네일을 로컬 이미지 저장소에 미리 받아둠 (점수 계산 시 HTTP 요청 없음)
+            thumbnail_urls = [
+                influencer.thumbnail_url
+                for influencer in (session.get(Influencer, channel_id) for channel_id in updated_channel_ids)
+                if influencer and influencer.thumbnail_url
+            ]
+            prefetch_stats = image_store.prefetch_sync(thumbnail_urls)
+            print(f"🖼️  썸네일 prefetch: {prefetch_stats['stored']}개 저장 | {prefetch_stats['failed']}개 실패")
+            
+            # 채널 후보 ANN 인덱스 갱신 (썸네일 prefetch 이후여야 이미지 임베딩 포함)
+            try:
+                candidate_service.index_channels(session, updated_channel_ids)
+            except Exception as e:
+                print(f"⚠️  후보 인덱스 갱신 실패: {str(e)[:50]}")
+            
             total_collected += collected
             total_skipped += skipped
             
             print(f"\n📊 [{category_keyword}] 완료: ✅ {collected}명 수집 | ⏭️ {skipped}명 제외")
+        
+        # 오래된 스냅샷 블록 다운샘플링 (저장량 유지)
+        compacted = snapshot_service.compact(session)
+        session.commit()
+        print(f"🗜️  스냅샷 다운샘플링: 일 단위 {compacted['daily']}개 | 주 단위 {compacted['weekly']}개 블록")
     
     # 최종 요약
     print(f"\n{'='*70}")
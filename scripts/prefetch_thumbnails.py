@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+채널/영상 썸네일을 로컬 이미지 저장소에 미리 받아두기 (기존 DB 백필용, 이후에는 크롤러가 수집 직후 저장)
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import update
+from sqlmodel import Session, select
+from app.core.database import engine, create_db_and_tables
+from app.core.models import Influencer, Video
+from app.ml import image_store
+from app.services.feed_cache import bump_data_version
+
+BATCH_SIZE = 1000
+
+def prefetch_thumbnails():
+    """Influencer/Video 썸네일 중 저장소에 없는 것을 내려받고, 새로 받은 채널은 데이터 버전(last_updated) 갱신"""
+    started = time.perf_counter()
+    print("🖼️  썸네일 prefetch 중...")
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        urls = set(session.exec(select(Influencer.thumbnail_url).where(Influencer.thumbnail_url.is_not(None))).all())
+        urls.update(session.exec(select(Video.thumbnail_url).where(Video.thumbnail_url.is_not(None))).all())
+        missing = [url for url in sorted(urls) if not image_store.contains(url)]
+        print(f"📋 썸네일 {len(urls)}개 중 {len(missing)}개 미저장")
+
+        totals = {"stored": 0, "failed": 0}
+        stored_urls = []
+        for start in range(0, len(missing), BATCH_SIZE):
+            batch = missing[start:start + BATCH_SIZE]
+            stats = image_store.prefetch_sync(batch)
+            totals["stored"] += stats["stored"]
+            totals["failed"] += stats["failed"]
+            stored_urls.extend(url for url in batch if image_store.contains(url))
+            print(f"   {min(start + BATCH_SIZE, len(missing))}/{len(missing)} | 저장 {totals['stored']} | 실패 {totals['failed']}")
+
+        # 썸네일이 새로 생긴 채널은 이미지 점수가 달라지므로 캐시된 점수를 다시 계산하도록 버전 갱신
+        channel_ids = set()
+        for start in range(0, len(stored_urls), BATCH_SIZE):
+            batch = stored_urls[start:start + BATCH_SIZE]
+            channel_ids.update(session.exec(
+                select(Influencer.channel_id).where(Influencer.thumbnail_url.in_(batch))
+            ).all())
+            channel_ids.update(session.exec(
+                select(Video.channel_id).where(Video.thumbnail_url.in_(batch), Video.channel_id.is_not(None))
+            ).all())
+        channel_ids = sorted(channel_ids)
+        for start in range(0, len(channel_ids), BATCH_SIZE):
+            session.exec(
+                update(Influencer)
+                .where(Influencer.channel_id.in_(channel_ids[start:start + BATCH_SIZE]))
+                .values(last_updated=datetime.now())
+            )
+        session.commit()
+        updated = len(channel_ids)
+    if updated:
+        bump_data_version()
+
+    print(f"✅ prefetch 완료: 저장 {totals['stored']}개 | 실패 {totals['failed']}개 | 채널 {updated}개 갱신 | {time.perf_counter() - started:.1f}초")
+
+if __name__ == "__main__":
+    prefetch_thumbnails()
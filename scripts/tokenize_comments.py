@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+댓글 KoBERT 토큰 ID 재생성 (기존 데이터 백필, KOBERT_MODEL/KOBERT_MAX_LENGTH 변경 시)
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlmodel import Session
+from app.core.database import engine, create_db_and_tables
+from app.services.comment_service import comment_service
+
+def tokenize_comments():
+    """Comment/CommentCluster 텍스트를 토큰화해 token_ids 컬럼 갱신"""
+    started = time.perf_counter()
+    print("🔧 댓글 토큰 ID 재생성 중...")
+    
+    create_db_and_tables()
+    with Session(engine) as session:
+        count = comment_service.retokenize(session)
+        session.commit()
+    
+    print(f"✅ 재생성 완료: {count}개 | {time.perf_counter() - started:.1f}초")
+
+if __name__ == "__main__":
+    tokenize_comments()
@@ -1,9 +1,13 @@
 """
 DB 스키마 업데이트: 썸네일 및 댓글 테이블 추가
 """
+import os
+import sys
 import sqlite3
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 def update_database_schema():
     """데이터베이스 스키마 업데이트"""
     
@@ -46,6 +50,209 @@ def update_database_schema():
     except sqlite3.Error as e:
         print(f"❌ Comments 테이블 생성 실패: {e}")
     
+    try:
+        # 3. Project 테이블에 updated_at 컬럼 추가 (점수 캐시 버전)
+        print("📝 Project 테이블에 updated_at 컬럼 추가 중...")
+        cursor.execute("""
+            ALTER TABLE project 
+            ADD COLUMN updated_at DATETIME
+        """)
+        print("✅ updated_at 컬럼 추가 완료")
+        
+    except sqlite3.OperationalError as e:
+        if "duplicate column name" in str(e):
+            print("⚠️ updated_at 컬럼이 이미 존재합니다")
+        else:
+            print(f"❌ updated_at 컬럼 추가 실패: {e}")
+    
+    # 4. ProjectResult 테이블에 구성요소 점수 및 버전 스탬프 컬럼 추가
+    project_result_columns = [
+        ("brand_score", "FLOAT"),
+        ("text_score", "FLOAT"),
+        ("image_score", "FLOAT"),
+        ("sentiment_score", "FLOAT"),
+        ("roi_estimate_score", "FLOAT"),
+        ("breakdown", "VARCHAR"),
+        ("project_version", "VARCHAR"),
+        ("channel_version", "VARCHAR"),
+        ("model_version", "VARCHAR"),
+        ("computed_at", "DATETIME"),
+    ]
+    for column_name, column_type in project_result_columns:
+        try:
+            cursor.execute(f"ALTER TABLE projectresult ADD COLUMN {column_name} {column_type}")
+            print(f"✅ projectresult.{column_name} 컬럼 추가 완료")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" in str(e):
+                print(f"⚠️ projectresult.{column_name} 컬럼이 이미 존재합니다")
+            else:
+                print(f"❌ projectresult.{column_name} 컬럼 추가 실패: {e}")
+    
+    # 5. (project_id, channel_id) 유니크 인덱스 (중복 결과 행 정리 후 생성)
+    cursor.execute("""
+        DELETE FROM projectresult
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM projectresult GROUP BY project_id, channel_id
+        )
+    """)
+    print(f"🧹 중복 ProjectResult {cursor.rowcount}건 정리")
+    cursor.execute("DROP INDEX IF EXISTS ix_projectresult_project_channel")
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_projectresult_project_channel
+        ON projectresult (project_id, channel_id)
+    """)
+    
+    try:
+        # 6. AnalysisJob 테이블에 shard_state 컬럼 추가 (멀티 프로세스 분석)
+        cursor.execute("ALTER TABLE analysisjob ADD COLUMN shard_state VARCHAR")
+        print("✅ analysisjob.shard_state 컬럼 추가 완료")
+    except sqlite3.OperationalError as e:
+        if "duplicate column name" in str(e):
+            print("⚠️ analysisjob.shard_state 컬럼이 이미 존재합니다")
+        else:
+            print(f"❌ analysisjob.shard_state 컬럼 추가 실패: {e}")
+    
+    try:
+        # 7. Project 테이블에 brand_image_embedding 컬럼 추가 (브랜드 이미지 CLIP 임베딩)
+        cursor.execute("ALTER TABLE project ADD COLUMN brand_image_embedding BLOB")
+        print("✅ project.brand_image_embedding 컬럼 추가 완료")
+    except sqlite3.OperationalError as e:
+        if "duplicate column name" in str(e):
+            print("⚠️ project.brand_image_embedding 컬럼이 이미 존재합니다")
+        else:
+            print(f"❌ project.brand_image_embedding 컬럼 추가 실패: {e}")
+    
+    try:
+        # 8. AnalysisJob 테이블에 channel_ids 컬럼 추가 (ANN 후보 shortlist 분석)
+        cursor.execute("ALTER TABLE analysisjob ADD COLUMN channel_ids VARCHAR")
+        print("✅ analysisjob.channel_ids 컬럼 추가 완료")
+    except sqlite3.OperationalError as e:
+        if "duplicate column name" in str(e):
+            print("⚠️ analysisjob.channel_ids 컬럼이 이미 존재합니다")
+        else:
+            print(f"❌ analysisjob.channel_ids 컬럼 추가 실패: {e}")
+    
+    try:
+        # 9. 채널 전문 검색 인덱스 (FTS5 + 동기화 트리거) 생성 및 전체 색인
+        from app.core.search_index import SEARCH_INDEX_DDL, REBUILD_SEARCH_INDEX
+        for statement in SEARCH_INDEX_DDL + REBUILD_SEARCH_INDEX:
+            cursor.execute(statement)
+        print("✅ channel_fts 검색 인덱스 생성 완료")
+    except sqlite3.Error as e:
+        print(f"❌ channel_fts 검색 인덱스 생성 실패: {e}")
+    
+    # 10. 프로젝트별 원점수 순위 인덱스 (상위 k개/구간 조회)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_projectresult_project_score
+        ON projectresult (project_id, roi_score DESC)
+    """)
+    print("✅ ix_projectresult_project_score 인덱스 생성 완료")
+    
+    try:
+        # 11. 채널 영상 집계 테이블 생성 (채우기는 scripts/build_channel_stats.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS channelstats (
+                channel_id VARCHAR PRIMARY KEY,
+                video_sample INTEGER NOT NULL DEFAULT 0,
+                avg_views FLOAT,
+                avg_likes FLOAT,
+                avg_comments FLOAT,
+                upload_interval_days FLOAT,
+                engagement_p25 FLOAT,
+                engagement_p50 FLOAT,
+                engagement_p75 FLOAT,
+                recent_videos VARCHAR,
+                updated_at DATETIME,
+                FOREIGN KEY(channel_id) REFERENCES influencer(channel_id)
+            )
+        """)
+        print("✅ channelstats 테이블 생성 완료")
+    except sqlite3.Error as e:
+        print(f"❌ channelstats 테이블 생성 실패: {e}")
+    
+    try:
+        # 12. ChannelStats 테이블에 subscriber_growth_30d 컬럼 추가 (스냅샷 기반 성장률)
+        cursor.execute("ALTER TABLE channelstats ADD COLUMN subscriber_growth_30d FLOAT")
+        print("✅ channelstats.subscriber_growth_30d 컬럼 추가 완료")
+    except sqlite3.OperationalError as e:
+        if "duplicate column name" in str(e):
+            print("⚠️ channelstats.subscriber_growth_30d 컬럼이 이미 존재합니다")
+        else:
+            print(f"❌ channelstats.subscriber_growth_30d 컬럼 추가 실패: {e}")
+    
+    try:
+        # 13. 채널 지표 스냅샷 블록 테이블 생성 (채널 x 월, 델타 인코딩)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS channelsnapshotblock (
+                channel_id VARCHAR NOT NULL,
+                month VARCHAR NOT NULL,
+                resolution VARCHAR NOT NULL DEFAULT 'raw',
+                count INTEGER NOT NULL DEFAULT 0,
+                first_ts INTEGER NOT NULL DEFAULT 0,
+                last_ts INTEGER NOT NULL DEFAULT 0,
+                data BLOB NOT NULL,
+                PRIMARY KEY (channel_id, month),
+                FOREIGN KEY(channel_id) REFERENCES influencer(channel_id)
+            )
+        """)
+        print("✅ channelsnapshotblock 테이블 생성 완료")
+    except sqlite3.Error as e:
+        print(f"❌ channelsnapshotblock 테이블 생성 실패: {e}")
+    
+    try:
+        # 14. 유사 댓글 클러스터 테이블 생성 (채우기는 scripts/build_comment_clusters.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS commentcluster (
+                id INTEGER PRIMARY KEY,
+                channel_id VARCHAR NOT NULL,
+                simhash INTEGER NOT NULL,
+                representative_text VARCHAR NOT NULL,
+                size INTEGER NOT NULL DEFAULT 1,
+                like_count INTEGER NOT NULL DEFAULT 0,
+                first_published_at DATETIME,
+                last_published_at DATETIME,
+                FOREIGN KEY(channel_id) REFERENCES influencer(channel_id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_commentcluster_channel_id ON commentcluster (channel_id)")
+        print("✅ commentcluster 테이블 생성 완료")
+    except sqlite3.Error as e:
+        print(f"❌ commentcluster 테이블 생성 실패: {e}")
+    
+    # 15. Comment 테이블에 YouTube 댓글 ID/작성자/클러스터 컬럼 추가
+    for column, column_type in (
+        ("comment_id", "VARCHAR"),
+        ("author_name", "VARCHAR"),
+        ("cluster_id", "INTEGER REFERENCES commentcluster(id)")
+    ):
+        try:
+            cursor.execute(f"ALTER TABLE comment ADD COLUMN {column} {column_type}")
+            print(f"✅ comment.{column} 컬럼 추가 완료")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" in str(e):
+                print(f"⚠️ comment.{column} 컬럼이 이미 존재합니다")
+            else:
+                print(f"❌ comment.{column} 컬럼 추가 실패: {e}")
+    
+    try:
+        # 16. 댓글 ID 유니크 인덱스 (같은 댓글 중복 저장 방지) + 클러스터 인덱스
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_comment_comment_id ON comment (comment_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_comment_cluster_id ON comment (cluster_id)")
+        print("✅ comment 인덱스 생성 완료")
+    except sqlite3.Error as e:
+        print(f"❌ comment 인덱스 생성 실패 (중복 comment_id 정리 필요): {e}")
+    
+    # 17. 댓글/클러스터 대표 댓글 KoBERT 토큰 ID 컬럼 추가 (채우기는 scripts/tokenize_comments.py)
+    for table in ("comment", "commentcluster"):
+        try:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN token_ids BLOB")
+            print(f"✅ {table}.token_ids 컬럼 추가 완료")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" in str(e):
+                print(f"⚠️ {table}.token_ids 컬럼이 이미 존재합니다")
+            else:
+                print(f"❌ {table}.token_ids 컬럼 추가 실패: {e}")
+    
     # 변경사항 저장
     conn.commit()
     conn.close()